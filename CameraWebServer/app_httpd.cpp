@@ -96,6 +96,24 @@ typedef struct {
 static const char *_STREAM_CONTENT_TYPE = "multipart/x-mixed-replace;boundary=" PART_BOUNDARY;
 static const char *_STREAM_BOUNDARY = "\r\n--" PART_BOUNDARY "\r\n";
 static const char *_STREAM_PART = "Content-Type: image/jpeg\r\nContent-Length: %u\r\nX-Timestamp: %d.%06d\r\n\r\n";
+static const char *_PROFILE_PART = "Content-Type: application/octet-stream\r\nContent-Length: %u\r\nX-Timestamp: %d.%06d\r\n\r\n";
+
+// Header of every /profile part, followed by the R, G and B planes as
+// uint16 column means in 8.8 fixed point (value = mean * 256), little endian.
+#define PROFILE_MAGIC   "SPEC"
+#define PROFILE_VERSION 1
+
+typedef struct __attribute__((packed)) {
+  char magic[4];
+  uint8_t version;
+  uint8_t channels;
+  uint16_t x0;
+  uint16_t y0;
+  uint16_t width;
+  uint16_t height;
+  uint16_t frame_width;
+  uint16_t frame_height;
+} profile_header_t;
 
 httpd_handle_t stream_httpd = NULL;
 httpd_handle_t camera_httpd = NULL;
@@ -1122,6 +1140,144 @@ static esp_err_t win_handler(httpd_req_t *req) {
   return httpd_resp_send(req, NULL, 0);
 }
 
+static esp_err_t profile_handler(httpd_req_t *req) {
+  camera_fb_t *fb = NULL;
+  struct timeval _timestamp;
+  esp_err_t res = ESP_OK;
+  char part_buf[128];
+  uint8_t *rgb_buf = NULL;
+  size_t rgb_len = 0;
+  uint32_t *sums = NULL;
+  uint8_t *payload = NULL;
+  size_t columns_cap = 0;
+
+  // ROI in frame pixels; 0 for x1/y1 means "up to the frame edge"
+  int roi_x0 = 0, roi_y0 = 0, roi_x1 = 0, roi_y1 = 0;
+  size_t query_len = httpd_req_get_url_query_len(req) + 1;
+  if (query_len > 1) {
+    char *query = (char *)malloc(query_len);
+    if (query && httpd_req_get_url_query_str(req, query, query_len) == ESP_OK) {
+      roi_x0 = parse_get_var(query, "x0", 0);
+      roi_y0 = parse_get_var(query, "y0", 0);
+      roi_x1 = parse_get_var(query, "x1", 0);
+      roi_y1 = parse_get_var(query, "y1", 0);
+    }
+    free(query);
+  }
+
+  res = httpd_resp_set_type(req, _STREAM_CONTENT_TYPE);
+  if (res != ESP_OK) {
+    return res;
+  }
+  httpd_resp_set_hdr(req, "Access-Control-Allow-Origin", "*");
+
+#if CONFIG_LED_ILLUMINATOR_ENABLED
+  isStreaming = true;
+  enable_led(true);
+#endif
+
+  while (true) {
+    fb = esp_camera_fb_get();
+    if (!fb) {
+      log_e("Camera capture failed");
+      res = ESP_FAIL;
+      break;
+    }
+    _timestamp.tv_sec = fb->timestamp.tv_sec;
+    _timestamp.tv_usec = fb->timestamp.tv_usec;
+
+    int fw = fb->width;
+    int fh = fb->height;
+    int x0 = roi_x0 < 0 ? 0 : (roi_x0 >= fw ? fw - 1 : roi_x0);
+    int y0 = roi_y0 < 0 ? 0 : (roi_y0 >= fh ? fh - 1 : roi_y0);
+    int x1 = (roi_x1 <= x0 || roi_x1 > fw) ? fw : roi_x1;
+    int y1 = (roi_y1 <= y0 || roi_y1 > fh) ? fh : roi_y1;
+    int w = x1 - x0;
+    int h = y1 - y0;
+
+    size_t needed = (size_t)fw * fh * 3;
+    if (needed > rgb_len) {
+      free(rgb_buf);
+      rgb_buf = (uint8_t *)malloc(needed);
+      rgb_len = rgb_buf ? needed : 0;
+    }
+    if ((size_t)w > columns_cap) {
+      free(sums);
+      free(payload);
+      sums = (uint32_t *)malloc(3 * w * sizeof(uint32_t));
+      payload = (uint8_t *)malloc(sizeof(profile_header_t) + 3 * w * sizeof(uint16_t));
+      columns_cap = (sums && payload) ? w : 0;
+    }
+    if (!rgb_buf || !columns_cap) {
+      esp_camera_fb_return(fb);
+      log_e("profile buffers malloc failed");
+      res = ESP_FAIL;
+      break;
+    }
+
+    // fmt2rgb888 decodes JPEG frames too; the output is in BGR order
+    bool converted = fmt2rgb888(fb->buf, fb->len, fb->format, rgb_buf);
+    esp_camera_fb_return(fb);
+    fb = NULL;
+    if (!converted) {
+      log_e("To rgb888 failed");
+      res = ESP_FAIL;
+      break;
+    }
+
+    memset(sums, 0, 3 * w * sizeof(uint32_t));
+    for (int y = y0; y < y1; y++) {
+      const uint8_t *row = rgb_buf + ((size_t)y * fw + x0) * 3;
+      for (int x = 0; x < w; x++) {
+        sums[x] += row[3 * x + 2];
+        sums[w + x] += row[3 * x + 1];
+        sums[2 * w + x] += row[3 * x];
+      }
+    }
+
+    profile_header_t *header = (profile_header_t *)payload;
+    memcpy(header->magic, PROFILE_MAGIC, 4);
+    header->version = PROFILE_VERSION;
+    header->channels = 3;
+    header->x0 = x0;
+    header->y0 = y0;
+    header->width = w;
+    header->height = h;
+    header->frame_width = fw;
+    header->frame_height = fh;
+    uint16_t *planes = (uint16_t *)(payload + sizeof(profile_header_t));
+    for (int i = 0; i < 3 * w; i++) {
+      planes[i] = (uint16_t)((sums[i] << 8) / h);
+    }
+    size_t payload_len = sizeof(profile_header_t) + 3 * w * sizeof(uint16_t);
+
+    res = httpd_resp_send_chunk(req, _STREAM_BOUNDARY, strlen(_STREAM_BOUNDARY));
+    if (res == ESP_OK) {
+      size_t hlen = snprintf(part_buf, 128, _PROFILE_PART, payload_len, _timestamp.tv_sec, _timestamp.tv_usec);
+      res = httpd_resp_send_chunk(req, (const char *)part_buf, hlen);
+    }
+    if (res == ESP_OK) {
+      res = httpd_resp_send_chunk(req, (const char *)payload, payload_len);
+    }
+    if (res != ESP_OK) {
+      log_e("Send profile failed");
+      break;
+    }
+    log_i("PROFILE: %dx%d @ %d,%d %uB", w, h, x0, y0, (uint32_t)payload_len);
+  }
+
+  free(rgb_buf);
+  free(sums);
+  free(payload);
+
+#if CONFIG_LED_ILLUMINATOR_ENABLED
+  isStreaming = false;
+  enable_led(false);
+#endif
+
+  return res;
+}
+
 static esp_err_t index_handler(httpd_req_t *req) {
   httpd_resp_set_type(req, "text/html");
   httpd_resp_set_hdr(req, "Content-Encoding", "gzip");
@@ -1209,6 +1365,19 @@ void startCameraServer() {
 #endif
   };
 
+  httpd_uri_t profile_uri = {
+    .uri = "/profile",
+    .method = HTTP_GET,
+    .handler = profile_handler,
+    .user_ctx = NULL
+#ifdef CONFIG_HTTPD_WS_SUPPORT
+    ,
+    .is_websocket = true,
+    .handle_ws_control_frames = false,
+    .supported_subprotocol = NULL
+#endif
+  };
+
   httpd_uri_t bmp_uri = {
     .uri = "/bmp",
     .method = HTTP_GET,
@@ -1315,6 +1484,7 @@ void startCameraServer() {
   log_i("Starting stream server on port: '%d'", config.server_port);
   if (httpd_start(&stream_httpd, &config) == ESP_OK) {
     httpd_register_uri_handler(stream_httpd, &stream_uri);
+    httpd_register_uri_handler(stream_httpd, &profile_uri);
   }
 }
 
@@ -14,82 +14,206 @@ ESP32-CAM. Incluye funcionalidades para mostrar el stream, calcular histogramas
 de color y perfiles de intensidad en tiempo real.
 
 Librerías:
-- OpenCV (cv2): Captura y procesamiento del video.
+- OpenCV (cv2): Captura y procesamiento del video (se importa al iniciar el
+  stream).
 - Tkinter: Creación de la interfaz gráfica.
 - Pillow (PIL): Conversión de frames para su uso en Tkinter.
 - NumPy: Procesamiento eficiente de matrices de datos.
-- Matplotlib: Visualización de gráficos en tiempo real.
+- Matplotlib: Visualización de gráficos en tiempo real (se importa al abrir
+  una ventana de análisis).
+- captura (módulo local): Lectura del stream en un hilo en segundo plano.
+- conexion (módulo local): Conexión en segundo plano con detección de
+  estancamientos y reconexión automática.
+- cliente_mjpeg (módulo local): Cliente nativo del stream multipart.
+- perfiles (módulo local): Cálculo único de los perfiles espectrales por frame.
+- graficas (módulo local): Gráficas en tiempo real con blitting.
+- cascada (módulo local): Historial de espectros de memoria fija para la vista
+  de cascada y las series temporales de bandas.
+- enderezado (módulo local): Corrección de inclinación y curvatura de la
+  franja con mapas de remap en caché.
+- publicacion (módulo local): Publicación local de los espectros para otras
+  herramientas.
+- planificador (módulo local): Planificación adaptativa de las vistas de análisis.
+- control_camara (módulo local): Ventana del sensor (ROI) vía /resolution.
+- cliente_perfiles (módulo local): Perfiles calculados en la cámara (/profile).
+- promediado (módulo local): Promediado temporal de los perfiles.
+- calibracion (módulo local): Oscuro/referencia, transmitancia y absorbancia.
+- longitud_onda (módulo local): Calibración píxel → nm y detección de picos.
+- grabacion (módulo local): Grabación del MJPEG crudo y de la serie de perfiles.
+- fuentes (módulo local): Reproducción de grabaciones, carpetas de imágenes o
+  espectros sintéticos en lugar de la cámara.
+- instrumentacion (módulo local): Histogramas de latencia por etapa, fps y
+  contadores del pipeline.
+- multicamara / ventana_multicamara (módulos locales): Varias cámaras a la vez
+  desde un archivo de configuración, con sus espectros superpuestos.
+- arranque (módulo local): Marcas del tiempo de arranque.
 
 Instrucciones:
-1. Configura la dirección IP del ESP32-CAM en la variable `url`.
+1. Escribe en "Fuente" la IP del ESP32-CAM (p. ej. 192.168.100.13) o la URL
+   completa del stream; la variable `url` es solo el valor inicial.
 2. Asegúrate de que las librerías están instaladas.
 3. Ajusta la configuración de la cámara y resolución según las instrucciones.
 4. Ejecuta el programa y utiliza los botones de la interfaz para interactuar 
    con el stream y analizar los datos en tiempo real.
+5. Sin cámara, escribe en "Fuente" una grabación (.mjpeg), una carpeta de
+   imágenes (p. ej. Imagenes_Ejemplo) o "sintetico", y elige el ritmo de
+   reproducción.
+6. Para comparar varias cámaras, pulsa "Multicámara" y elige un archivo de
+   configuración como `camaras_ejemplo.json`.
 ===============================================================================
 """
 
-import cv2
-from tkinter import Tk, Button, Label, Frame, Toplevel, ttk, messagebox
+import arranque
+from tkinter import Tk, Button, Label, Frame, Toplevel, Checkbutton, BooleanVar, Spinbox, Entry, ttk, messagebox, filedialog
 from PIL import Image, ImageTk
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import socket
+import time
 from tkinter import Canvas
+from conexion import MotorReconexion, url_desde_direccion, ESTADO_CONECTADO, LIMITE_ESTANCAMIENTO
+from cliente_mjpeg import ClienteMJPEG
+from perfiles import EtapaAnalisis
+from promediado import PromediadorTemporal, MODOS_PROMEDIO
+from calibracion import CalibracionFotometrica
+from perfiles import reducir_por_bloques, TIPOS_IMAGEN
+from longitud_onda import CalibracionLongitudOnda, detectar_picos
+from ventana_calibracion import abrir_dialogo_longitud_onda
+from grabacion import GrabadorMJPEG, GrabadorPerfiles
+from fuentes import crear_fuente, RITMOS
+from instrumentacion import Instrumentacion
+from graficas import GraficaEnVivo, GraficaCascada
+from cascada import BufferCascada, leer_bandas, columnas_banda
+from enderezado import EnderezadoEspectro
+from publicacion import PublicadorEspectros, codificar_espectro, PUERTO_PUBLICACION
+from planificador import PlanificadorVistas
+from cliente_perfiles import ClientePerfiles, url_perfiles
+from control_camara import url_control, consultar_estado, fijar_ventana, fijar_framesize, calcular_ventana_sensor
+
+arranque.marcar("importaciones")
+
+# OpenCV y Matplotlib son las importaciones más lentas: OpenCV se carga al
+# iniciar el primer stream (cargar_opencv) y Matplotlib al abrir una ventana
+# de análisis, para que la ventana principal aparezca cuanto antes.
+cv2 = None
 
 # Dirección del ESP32-CAM
 url = "http://192.168.100.13:81/stream"
 
+# Carpeta donde se guardan las sesiones grabadas
+CARPETA_GRABACIONES = "Grabaciones"
+
+# Estadísticas del pipeline: refresco del panel y exportación periódica
+PERIODO_ESTADISTICAS_MS = 1000
+PERIODO_EXPORTACION_MS = 5000
+RUTA_ESTADISTICAS = "estadisticas"  # Se escriben estadisticas.json y estadisticas.txt
+
+# Periodo mínimo de refresco de las gráficas de análisis (~33 actualizaciones por segundo)
+PERIODO_MIN_GRAFICAS = 0.03
+
+# Periodo de refresco del estado de la conexión
+PERIODO_CONEXION_MS = 250
+
+# Periodo de consulta de las peticiones de control a la cámara en curso
+PERIODO_CONTROL_MS = 50
+
 # Variables globales
-cap = None
+motor_captura = None
+ultima_secuencia = 0
 streaming = False
 imagen_capturada = None
+frame_actual = None
+frame_recortado = None
+etapa_analisis = EtapaAnalisis(orden="BGR", promediador=PromediadorTemporal())
+calibracion = CalibracionFotometrica()
+calibracion_lambda = CalibracionLongitudOnda()
+cascada = BufferCascada()
+enderezado = EnderezadoEspectro()
 recorte_activo = None
+ventana_sensor = None
 resolucion_original = None
-task_histograma = None
-task_intensidad = None
+planificador_analisis = None
+task_estado_analisis = None
+grabadores = []
+instrumentacion = Instrumentacion()
+ultima_exportacion = 0.0
+roi_sensor_pendiente = False
+publicador = None
+# Un solo hilo para las peticiones de control: se ejecutan en el orden en que se envían
+control_sensor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ControlSensor")
 
 # =============================================================================
-# Funciones para verificar conexión
+# Funciones de gestión del stream
 # =============================================================================
 
-def check_connection(host, port, timeout=2):
-    try:
-        with socket.create_connection((host, port), timeout=timeout):
-            return True
-    except Exception:
-        return False
+def es_camara(fuente):
+    return fuente.startswith(("http://", "https://"))
 
-# =============================================================================
-# Funciones de gestión del stream
-# =============================================================================
+def preparar_apertura(fuente):
+    """
+    Devuelve la función que abre `fuente`. Los controles de Tkinter se leen
+    aquí, en el hilo de la interfaz; la función devuelta se ejecuta en el hilo
+    de captura en cada intento de conexión.
+    """
+    if not es_camara(fuente):
+        # Las fuentes offline se abren de inmediato para avisar si no existen
+        etiquetas = {etiqueta: ritmo for ritmo, etiqueta in RITMOS.items()}
+        ritmo = etiquetas[combo_ritmo.get()]
+        try:
+            fps = float(spin_fps_fuente.get())
+        except ValueError:
+            fps = 30.0
+        try:
+            abiertas = [crear_fuente(fuente, ritmo, fps)]
+        except (OSError, ValueError) as e:
+            raise ConnectionError(f"No se pudo abrir la fuente '{fuente}': {e}")
+        return lambda: abiertas.pop() if abiertas else crear_fuente(fuente, ritmo, fps)
+
+    if modo_perfiles.get():
+        url_stream = url_perfiles(fuente, recorte_activo)
+        return lambda: ClientePerfiles(url_stream).conectar()
+    return lambda: ClienteMJPEG(fuente).conectar()
+
+def cargar_opencv():
+    global cv2
+    if cv2 is None:
+        inicio = time.perf_counter()
+        import cv2
+        print(f"OpenCV cargado en {time.perf_counter() - inicio:.2f} s.")
 
 def start_stream():
-    global cap, streaming, resolucion_original
+    global motor_captura, ultima_secuencia, streaming, url, roi_sensor_pendiente
     if not streaming:
         try:
-            host, port = url.split("//")[1].split(":")[0], int(url.split(":")[-1].split("/")[0])
-            if not check_connection(host, port):
-                raise ConnectionError("No hay conexión con el ESP32-CAM. Verifique el dispositivo y la red.")
-            
-            cap = cv2.VideoCapture(url)
-            if not cap.isOpened():
-                raise ConnectionError("No se pudo abrir el stream del ESP32-CAM. Intente nuevamente.")
-            
+            cargar_opencv()
+            fuente = url_desde_direccion(entrada_fuente.get()) or url
+            abrir = preparar_apertura(fuente)
+            if es_camara(fuente):
+                url = fuente
+
+            # La conexión, los reintentos y la lectura ocurren fuera del hilo de Tkinter
+            instrumentacion.reiniciar()
+            # Las fuentes offline marcan su propio ritmo: una pausa de la grabación no es un estancamiento
+            limite = LIMITE_ESTANCAMIENTO if es_camara(fuente) else None
+            motor_captura = MotorReconexion(abrir, instrumentacion=instrumentacion, limite_estancamiento=limite)
+            motor_captura.iniciar()
+            ultima_secuencia = 0
+            etapa_analisis.reiniciar()
+            cascada.reiniciar()
+            if planificador_analisis is not None:
+                planificador_analisis.reiniciar()
+
             streaming = True
             boton_recorte.config(state="disabled", text="Detenga el Stream para Recortar")
             boton_resolucion.config(state="normal")
             boton_analisis.config(state="normal")
+            # La ventana del sensor se aplica al llegar el primer frame
+            roi_sensor_pendiente = es_camara(fuente) and not modo_perfiles.get()
             update_frame()
-            print("Stream iniciado.")
-            
-            if resolucion_original is None:
-                _, frame = cap.read()
-                if frame is not None:
-                    resolucion_original = (frame.shape[1], frame.shape[0])
+            actualizar_conexion()
+            print(f"Stream iniciado: {fuente}")
 
         except ConnectionError as ce:
             messagebox.showerror("Error de Conexión", str(ce))
@@ -99,36 +223,164 @@ def start_stream():
             print(f"Error inesperado: {e}")
 
 def stop_stream():
-    global cap, streaming
+    global motor_captura, streaming
     if streaming:
         streaming = False
-        if cap is not None:
-            cap.release()
+        if motor_captura is not None:
+            motor_captura.detener()
+            print(f"Frames descartados durante el stream: {motor_captura.frames_descartados}")
+            detener_grabacion()
+            motor_captura = None
+        restaurar_ventana_sensor()
         boton_recorte.config(state="normal", text="Recortar Stream")
         boton_analisis.config(state="disabled")
+        label_conexion.config(text="Estado: Detenido", fg="black")
         print("Stream detenido.")
 
+def actualizar_conexion():
+    if not streaming or motor_captura is None:
+        return
+    color = "dark green" if motor_captura.estado == ESTADO_CONECTADO else "dark orange"
+    label_conexion.config(text=f"Estado: {motor_captura.texto_estado()}", fg=color)
+    root.after(PERIODO_CONEXION_MS, actualizar_conexion)
+
 def update_frame():
-    global cap, streaming, imagen_capturada, recorte_activo
-    if streaming and cap is not None:
-        ret, frame = cap.read()
-        if ret:
-            if recorte_activo:
-                x0, y0, x1, y1 = recorte_activo
-                frame = frame[y0:y1, x0:x1]
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            img = Image.fromarray(frame)
-            imgtk = ImageTk.PhotoImage(image=img)
-            video_label.imgtk = imgtk
-            video_label.configure(image=imgtk)
-            imagen_capturada = img
+    global ultima_secuencia, roi_sensor_pendiente
+    if streaming and motor_captura is not None:
+        capturado = motor_captura.obtener_frame(ultima_secuencia)
+        if capturado is not None:
+            ultima_secuencia = capturado.secuencia
+            if hasattr(capturado.datos, "perfiles"):
+                mostrar_perfil(capturado)
+            else:
+                mostrar_frame(capturado)
+                if roi_sensor_pendiente:
+                    roi_sensor_pendiente = False
+                    aplicar_roi_sensor()
+            instrumentacion.marcar("visualizacion")
+            if planificador_analisis is not None:
+                planificador_analisis.notificar(ultima_secuencia)
+            if publicador is not None and publicador.suscriptores:
+                publicar_espectro(capturado)
+            latencia = motor_captura.latencia(capturado.datos)
+            if latencia is not None:
+                instrumentacion.registrar("latencia_extremo", latencia)
+                label_latencia.config(text=f"Latencia: {latencia * 1000:.0f} ms")
+            if grabadores:
+                escritos = max(grabador.escritos for grabador in grabadores)
+                omitidos = max(grabador.descartados for grabador in grabadores)
+                label_grabacion.config(text=f"Grabando: {escritos} frames ({omitidos} omitidos)")
         root.after(10, update_frame)
 
+def mostrar_frame(capturado):
+    global imagen_capturada, frame_actual, frame_recortado, resolucion_original
+    with instrumentacion.medir("decodificar"):
+        frame = capturado.imagen
+    if resolucion_original is None:
+        resolucion_original = (frame.shape[1], frame.shape[0])
+    with instrumentacion.medir("recorte"):
+        recorte = recorte_para(frame)
+        if recorte:
+            x0, y0, x1, y1 = recorte
+            frame = frame[y0:y1, x0:x1]
+    frame_recortado = frame
+    if enderezado.calibrado:
+        # Los mapas están en caché por ROI: por frame solo se ejecuta el remap
+        with instrumentacion.medir("enderezado"):
+            frame = enderezado.aplicar(frame, origen_roi())
+    frame_actual = frame
+    with instrumentacion.medir("visualizacion"):
+        img = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        imgtk = ImageTk.PhotoImage(image=img)
+        video_label.imgtk = imgtk
+        video_label.configure(image=imgtk)
+    imagen_capturada = img
+
+def mostrar_perfil(capturado):
+    # Modo perfiles: la cámara ya envió el perfil por columna, no hay imagen que mostrar
+    global frame_actual, frame_recortado
+    perfil = capturado.datos
+    etapa_analisis.publicar(capturado.secuencia, perfil.perfiles, perfil.alto, capturado.marca_tiempo, perfil.roi)
+    frame_actual = None
+    frame_recortado = None
+    video_label.imgtk = None
+    video_label.configure(image="", text=f"Modo perfiles: {perfil.perfiles.shape[1]} columnas", fg="white")
+
 def reset_resolution():
     global recorte_activo
     recorte_activo = None
+    restaurar_ventana_sensor()
     print("Resolución original restaurada.")
 
+# =============================================================================
+# ROI en el sensor
+# =============================================================================
+
+def enviar_control(peticion, al_terminar):
+    # La petición HTTP corre en el hilo de control; al_terminar(resultado, error) corre en el de Tkinter
+    futuro = control_sensor.submit(peticion)
+
+    def revisar():
+        if not futuro.done():
+            root.after(PERIODO_CONTROL_MS, revisar)
+            return
+        error = futuro.exception()
+        al_terminar(None if error else futuro.result(), error)
+
+    root.after(PERIODO_CONTROL_MS, revisar)
+
+def aplicar_roi_sensor():
+    if not (roi_sensor.get() and recorte_activo and resolucion_original):
+        return
+    base = url_control(url)
+    recorte = recorte_activo
+    try:
+        parametros, tamano, residual = calcular_ventana_sensor(recorte, resolucion_original)
+    except ValueError as e:
+        print(f"No se pudo aplicar el ROI en el sensor, se recortará por software: {e}")
+        return
+
+    def aplicar():
+        estado = consultar_estado(base)
+        fijar_ventana(base, parametros)
+        return {"base": base, "framesize": estado.get("framesize"), "tamano": tamano, "residual": residual}
+
+    def aplicada(ventana, error):
+        global ventana_sensor
+        if error is not None:
+            print(f"No se pudo aplicar el ROI en el sensor, se recortará por software: {error}")
+            return
+        ventana_sensor = ventana
+        print(f"ROI aplicado en el sensor: {parametros}, recorte residual {residual}")
+        if not streaming or recorte_activo != recorte:
+            # El stream se detuvo o el ROI cambió mientras se aplicaba la ventana
+            restaurar_ventana_sensor()
+
+    enviar_control(aplicar, aplicada)
+
+def restaurar_ventana_sensor():
+    global ventana_sensor
+    if ventana_sensor is None:
+        return
+    ventana, ventana_sensor = ventana_sensor, None
+    if ventana["framesize"] is None:
+        return
+
+    def restaurada(resultado, error):
+        if error is not None:
+            print(f"No se pudo restaurar la ventana completa del sensor: {error}")
+
+    enviar_control(lambda: fijar_framesize(ventana["base"], ventana["framesize"]), restaurada)
+
+def recorte_para(frame):
+    # Mientras la cámara cambia de ventana pueden llegar frames de ambos tamaños
+    tamano = (frame.shape[1], frame.shape[0])
+    if ventana_sensor is not None and tamano == ventana_sensor["tamano"]:
+        return ventana_sensor["residual"]
+    if resolucion_original is None or tamano == resolucion_original:
+        return recorte_activo
+    return None
+
 # =============================================================================
 # Funciones de recorte
 # =============================================================================
@@ -160,6 +412,12 @@ def iniciar_recorte():
             scaled_y0 = int(y0 * original_height / canvas_height)
             scaled_y1 = int(y1 * original_height / canvas_height)
 
+            # La imagen mostrada ya puede estar recortada: se expresa en coordenadas del frame completo
+            if recorte_activo:
+                base_x, base_y = recorte_activo[0], recorte_activo[1]
+                scaled_x0, scaled_x1 = scaled_x0 + base_x, scaled_x1 + base_x
+                scaled_y0, scaled_y1 = scaled_y0 + base_y, scaled_y1 + base_y
+
             recorte_activo = (scaled_x0, scaled_y0, scaled_x1, scaled_y1)
             print(f"Área de recorte seleccionada (escalada): {recorte_activo}")
             ventana_recorte.destroy()
@@ -184,10 +442,21 @@ def iniciar_recorte():
 # Funciones de análisis
 # =============================================================================
 
+def obtener_frame_espectral():
+    # Un solo cálculo de perfiles por frame, compartido por las vistas y la publicación
+    ultimo = etapa_analisis.ultimo
+    if frame_actual is None or (ultimo is not None and ultimo.secuencia == ultima_secuencia):
+        return ultimo
+    with instrumentacion.medir("perfiles"):
+        return etapa_analisis.procesar(ultima_secuencia, frame_actual, roi=recorte_activo)
+
 def abrir_ventanas():
+    global planificador_analisis
     if not streaming:
         print("El stream debe estar iniciado para acceder a esta funcionalidad.")
         return
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
     ventana_tabs = Toplevel(root)
     ventana_tabs.title("Análisis en Tiempo Real")
@@ -196,91 +465,432 @@ def abrir_ventanas():
 
     tab_histograma = ttk.Frame(tabs)
     tab_intensidad = ttk.Frame(tabs)
+    tab_absorbancia = ttk.Frame(tabs)
+    tab_cascada = ttk.Frame(tabs)
     tabs.add(tab_histograma, text="Histograma")
     tabs.add(tab_intensidad, text="Graficar Intensidad")
+    tabs.add(tab_absorbancia, text="Absorbancia")
+    tabs.add(tab_cascada, text="Cascada")
     tabs.pack(expand=1, fill="both")
 
     fig_histograma, ax_histograma = plt.subplots(figsize=(7, 5))
     fig_intensidad, ax_intensidad = plt.subplots(figsize=(7, 5))
+    fig_absorbancia, ax_absorbancia = plt.subplots(figsize=(7, 5))
 
     canvas_histograma = FigureCanvasTkAgg(fig_histograma, master=tab_histograma)
     canvas_histograma.get_tk_widget().pack(fill="both", expand=True)
     canvas_intensidad = FigureCanvasTkAgg(fig_intensidad, master=tab_intensidad)
     canvas_intensidad.get_tk_widget().pack(fill="both", expand=True)
+    canvas_absorbancia = FigureCanvasTkAgg(fig_absorbancia, master=tab_absorbancia)
+    canvas_absorbancia.get_tk_widget().pack(fill="both", expand=True)
+
+    controles_cascada = Frame(tab_cascada)
+    controles_cascada.pack(fill="x", side="top")
+    fig_cascada, (ax_cascada, ax_series) = plt.subplots(2, 1, figsize=(7, 6), gridspec_kw={"height_ratios": [2, 1]})
+    canvas_cascada = FigureCanvasTkAgg(fig_cascada, master=tab_cascada)
+    canvas_cascada.get_tk_widget().pack(fill="both", expand=True)
+
+    grafica_histograma = GraficaEnVivo(
+        fig_histograma, ax_histograma, canvas_histograma,
+        [('red', 'Rojo'), ('green', 'Verde'), ('blue', 'Azul'), ('black', 'Intensidad')],
+        "Histograma Promedio", "Posición X del Stream", "Valor Promedio")
+    grafica_intensidad = GraficaEnVivo(
+        fig_intensidad, ax_intensidad, canvas_intensidad,
+        [('black', 'Intensidad')],
+        "Perfil de Intensidad", "Posición X del Stream", "Intensidad")
+    grafica_absorbancia = GraficaEnVivo(
+        fig_absorbancia, ax_absorbancia, canvas_absorbancia,
+        [('red', 'Rojo'), ('green', 'Verde'), ('blue', 'Azul'), ('black', 'Intensidad')],
+        "Absorbancia (-log10(I/I0))", "Posición X del Stream", "Absorbancia", limites_y=(-0.2, 2.0))
+    grafica_cascada = GraficaCascada(fig_cascada, ax_cascada, ax_series, canvas_cascada)
+    fig_cascada.tight_layout()
+
+    label_picos = Label(ventana_tabs, text="", anchor="w")
+    label_picos.pack(fill="x", side="bottom")
+
+    def eje_x(espectral):
+        # El eje en nm está cacheado por ROI: solo se recalcula si cambia el ROI o la calibración
+        eje = calibracion_lambda.eje(origen_x(), espectral.ancho)
+        return (eje, "Longitud de Onda (nm)") if eje is not None else (None, None)
 
     def actualizar_histograma():
-        global task_histograma
-        if streaming and imagen_capturada:
-            ax_histograma.clear()
-            rgb_array = np.array(imagen_capturada)
-            r_values = np.mean(rgb_array[:, :, 0], axis=0)
-            g_values = np.mean(rgb_array[:, :, 1], axis=0)
-            b_values = np.mean(rgb_array[:, :, 2], axis=0)
-            intensity_values = (r_values + g_values + b_values) / 3
-            x = np.arange(rgb_array.shape[1])
-
-            ax_histograma.plot(x, r_values, color='red', label='Rojo')
-            ax_histograma.plot(x, g_values, color='green', label='Verde')
-            ax_histograma.plot(x, b_values, color='blue', label='Azul')
-            ax_histograma.plot(x, intensity_values, color='black', label='Intensidad')
-
-            ax_histograma.set_title("Histograma Promedio")
-            ax_histograma.set_xlabel("Posición X del Stream")
-            ax_histograma.set_ylabel("Valor Promedio")
-            ax_histograma.legend()
-            ax_histograma.grid(True)
-
-            canvas_histograma.draw()
-
-        task_histograma = root.after(100, actualizar_histograma)
+        espectral = obtener_frame_espectral()
+        if espectral is not None:
+            grafica_histograma.actualizar(
+                (espectral.rojo, espectral.verde, espectral.azul, espectral.intensidad), *eje_x(espectral))
 
     def actualizar_intensidad():
-        global task_intensidad
-        if streaming and imagen_capturada:
-            ax_intensidad.clear()
-            gray_image = imagen_capturada.convert('L')
-            gray_array = np.array(gray_image)
-            intensity_profile = np.mean(gray_array, axis=0)
-            x = np.arange(len(intensity_profile))
+        espectral = obtener_frame_espectral()
+        if espectral is not None:
+            grafica_intensidad.actualizar((espectral.gris,), *eje_x(espectral))
+            picos = detectar_picos(espectral.gris)
+            if calibracion_lambda.calibrada:
+                texto = ", ".join(f"{nm:.1f} nm" for nm in calibracion_lambda.a_nm(picos + origen_x()))
+            else:
+                texto = ", ".join(f"{pico + origen_x():.1f} px" for pico in picos)
+            label_picos.config(text=f"Picos: {texto}")
+
+    def actualizar_absorbancia():
+        espectral = obtener_frame_espectral()
+        if espectral is not None and calibracion.valida_para(recorte_activo, espectral.ancho):
+            grafica_absorbancia.actualizar(calibracion.absorbancia(espectral.perfiles), *eje_x(espectral))
 
-            ax_intensidad.plot(x, intensity_profile, color='black', label='Intensidad')
+    # Cascada: las bandas se guardan en unidades del eje (nm o px del frame completo)
+    estado_cascada = {"bandas": [], "configuracion": None}
 
-            ax_intensidad.set_title("Perfil de Intensidad")
-            ax_intensidad.set_xlabel("Posición X del Stream")
-            ax_intensidad.set_ylabel("Intensidad")
-            ax_intensidad.legend()
-            ax_intensidad.grid(True)
+    def eje_cascada(ancho):
+        eje = calibracion_lambda.eje(origen_x(), ancho)
+        if eje is not None:
+            return eje, "Longitud de Onda (nm)"
+        return origen_x() + np.arange(ancho, dtype=np.float32), "Posición X del Frame (px)"
 
-            canvas_intensidad.draw()
+    def dibujar_cascada():
+        eje, etiqueta = eje_cascada(cascada.ancho)
+        bandas = [(banda, columnas_banda(eje, *banda)) for banda in estado_cascada["bandas"]]
+        bandas = [(banda, columnas) for banda, columnas in bandas if columnas is not None]
+        configuracion = (float(eje[0]), float(eje[-1]), cascada.duracion, etiqueta, tuple(bandas))
+        if configuracion != estado_cascada["configuracion"]:
+            grafica_cascada.configurar(eje[0], eje[-1], cascada.duracion, etiqueta,
+                                       [f"{inicio:g}-{fin:g}" for (inicio, fin), _ in bandas])
+            estado_cascada["configuracion"] = configuracion
+        filas, marcas = cascada.ordenar()
+        series = cascada.series([columnas for _, columnas in bandas], filas)
+        grafica_cascada.actualizar(filas, marcas - time.perf_counter(), series)
 
-        task_intensidad = root.after(100, actualizar_intensidad)
+    def actualizar_cascada():
+        # Se llama con cada frame aunque la pestaña esté oculta, para no perder historia
+        espectral = obtener_frame_espectral()
+        if espectral is None:
+            return
+        fila_nueva = cascada.agregar(espectral.gris, time.perf_counter(), recorte_activo)
+        if pestana_visible(tab_cascada) and (fila_nueva or estado_cascada["configuracion"] is None):
+            dibujar_cascada()
+
+    def aplicar_bandas(event=None):
+        try:
+            estado_cascada["bandas"] = leer_bandas(entrada_bandas.get())
+        except ValueError as e:
+            messagebox.showerror("Bandas", str(e), parent=ventana_tabs)
+            return
+        estado_cascada["configuracion"] = None
+        if cascada.ancho:
+            dibujar_cascada()
+
+    def seguir_picos():
+        espectral = etapa_analisis.ultimo
+        if espectral is None:
+            return
+        picos = detectar_picos(espectral.gris, max_picos=5) + origen_x()
+        if calibracion_lambda.calibrada:
+            picos = calibracion_lambda.a_nm(picos)
+        entrada_bandas.delete(0, "end")
+        entrada_bandas.insert(0, ", ".join(f"{pico:.1f}" for pico in picos))
+        aplicar_bandas()
+
+    def cambiar_intervalo(event=None):
+        try:
+            cascada.configurar(intervalo=float(spin_intervalo.get()))
+        except ValueError:
+            return
+        estado_cascada["configuracion"] = None
+
+    Label(controles_cascada, text="Bandas:").pack(side="left", padx=5)
+    entrada_bandas = Entry(controles_cascada, width=28)
+    entrada_bandas.pack(side="left", padx=5)
+    entrada_bandas.bind("<Return>", aplicar_bandas)
+    Button(controles_cascada, text="Aplicar", command=aplicar_bandas).pack(side="left", padx=5)
+    Button(controles_cascada, text="Seguir Picos", command=seguir_picos).pack(side="left", padx=5)
+    Label(controles_cascada, text="s/fila:").pack(side="left", padx=5)
+    spin_intervalo = Spinbox(controles_cascada, from_=0.1, to=60, increment=0.1, width=5, command=cambiar_intervalo)
+    spin_intervalo.delete(0, "end")
+    spin_intervalo.insert(0, f"{cascada.intervalo:g}")
+    spin_intervalo.bind("<Return>", cambiar_intervalo)
+    spin_intervalo.pack(side="left", padx=5)
+
+    def pestana_visible(tab):
+        return ventana_tabs.winfo_viewable() and tabs.select() == str(tab)
+
+    if planificador_analisis is not None:
+        planificador_analisis.detener()
+    planificador_analisis = PlanificadorVistas(ventana_tabs, periodo_min=PERIODO_MIN_GRAFICAS,
+                                               instrumentacion=instrumentacion)
+    planificador_analisis.registrar("Histograma", actualizar_histograma, lambda: pestana_visible(tab_histograma))
+    planificador_analisis.registrar("Intensidad", actualizar_intensidad, lambda: pestana_visible(tab_intensidad))
+    planificador_analisis.registrar("Absorbancia", actualizar_absorbancia, lambda: pestana_visible(tab_absorbancia))
+    planificador_analisis.registrar("Cascada", actualizar_cascada)
+
+    label_frecuencia = Label(ventana_tabs, text="", anchor="w")
+    label_frecuencia.pack(fill="x", side="bottom")
+
+    def actualizar_estado():
+        global task_estado_analisis
+        if planificador_analisis is not None:
+            label_frecuencia.config(text=planificador_analisis.texto_estado())
+        task_estado_analisis = ventana_tabs.after(500, actualizar_estado)
 
     def on_close():
-        global task_histograma, task_intensidad
-        if task_histograma:
-            root.after_cancel(task_histograma)
-            task_histograma = None
-        if task_intensidad:
-            root.after_cancel(task_intensidad)
-            task_intensidad = None
+        global planificador_analisis, task_estado_analisis
+        if planificador_analisis is not None:
+            planificador_analisis.detener()
+            planificador_analisis = None
+        if task_estado_analisis:
+            ventana_tabs.after_cancel(task_estado_analisis)
+            task_estado_analisis = None
+        grafica_histograma.desconectar()
+        grafica_intensidad.desconectar()
+        grafica_absorbancia.desconectar()
+        grafica_cascada.desconectar()
+        plt.close(fig_histograma)
+        plt.close(fig_intensidad)
+        plt.close(fig_absorbancia)
+        plt.close(fig_cascada)
         ventana_tabs.destroy()
 
     ventana_tabs.protocol("WM_DELETE_WINDOW", on_close)
-    actualizar_histograma()
-    actualizar_intensidad()
+    tabs.bind("<<NotebookTabChanged>>", lambda event: planificador_analisis and planificador_analisis.notificar(ultima_secuencia))
+    actualizar_estado()
+    planificador_analisis.notificar(ultima_secuencia)
+
+def cambiar_promediado(event=None):
+    etiquetas = {etiqueta: modo for modo, etiqueta in MODOS_PROMEDIO.items()}
+    try:
+        n_frames = int(spin_frames_promedio.get())
+    except ValueError:
+        n_frames = 10
+    etapa_analisis.promediador.configurar(modo=etiquetas[combo_promedio.get()], n_frames=n_frames)
+    etapa_analisis.ultimo = None
+    print(f"Promediado temporal: {combo_promedio.get()} (N = {n_frames})")
+
+# =============================================================================
+# Funciones de calibración
+# =============================================================================
+
+def capturar_oscuro():
+    espectral = etapa_analisis.ultimo
+    if not streaming or espectral is None:
+        print("El stream debe estar iniciado para capturar el oscuro.")
+        return
+    calibracion.fijar_oscuro(espectral.perfiles, recorte_activo)
+    print(f"Oscuro capturado ({espectral.ancho} columnas).")
+
+def capturar_referencia():
+    espectral = etapa_analisis.ultimo
+    if not streaming or espectral is None:
+        print("El stream debe estar iniciado para capturar la referencia.")
+        return
+    calibracion.fijar_referencia(espectral.perfiles, recorte_activo)
+    print(f"Referencia (I0) capturada ({espectral.ancho} columnas).")
+
+def perfiles_para_roi(ruta):
+    """
+    Perfiles de una imagen guardada, sobre el ROI activo. Una imagen del
+    tamaño del frame completo se recorta con el ROI; cualquier otra debe tener
+    ya el ancho del ROI (por ejemplo, un recorte guardado antes). No se
+    interpola: cada columna debe corresponder a los mismos píxeles.
+    """
+    with Image.open(ruta) as imagen:
+        if recorte_activo and imagen.size == resolucion_original:
+            return reducir_por_bloques(imagen, recorte_activo)
+        if recorte_activo:
+            ancho_esperado = recorte_activo[2] - recorte_activo[0]
+        else:
+            ancho_esperado = resolucion_original[0] if resolucion_original else imagen.size[0]
+        if imagen.size[0] != ancho_esperado:
+            raise ValueError(f"La imagen mide {imagen.size[0]} px de ancho y el ROI activo {ancho_esperado} px. "
+                             "Use una imagen del frame completo o un recorte del mismo ROI.")
+        return reducir_por_bloques(imagen)
+
+def cargar_referencia():
+    ruta = filedialog.askopenfilename(filetypes=TIPOS_IMAGEN)
+    if ruta:
+        try:
+            calibracion.fijar_referencia(perfiles_para_roi(ruta), recorte_activo)
+            print(f"Referencia (I0) cargada desde {ruta}")
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"No se pudo cargar la referencia: {e}")
+
+def borrar_calibracion():
+    calibracion.limpiar()
+    print("Calibración eliminada.")
+
+def origen_x():
+    # Posición X del ROI dentro del frame completo, base de la calibración en nm
+    return recorte_activo[0] if recorte_activo else 0
+
+def origen_roi():
+    return (recorte_activo[0], recorte_activo[1]) if recorte_activo else (0, 0)
+
+def calibrar_longitud_onda():
+    espectral = etapa_analisis.ultimo
+    picos = detectar_picos(espectral.gris) + origen_x() if espectral is not None else ()
+    abrir_dialogo_longitud_onda(root, calibracion_lambda, picos)
+
+def enderezar_espectro():
+    # Se estima sobre el ROI sin corregir, aunque ya hubiera un enderezado activo
+    if frame_recortado is None:
+        print("El stream debe estar iniciado (con imagen) para enderezar el espectro.")
+        return
+    try:
+        enderezado.calibrar(frame_recortado, origen_roi())
+    except ValueError as e:
+        messagebox.showerror("Enderezar Espectro", str(e))
+        return
+    angulo, flecha = enderezado.describir(origen_x(), origen_x() + frame_recortado.shape[1])
+    # El oscuro, la referencia y el promedio se tomaron con la franja sin corregir
+    calibracion.limpiar()
+    etapa_analisis.reiniciar()
+    print(f"Espectro enderezado: inclinación {angulo:.2f}°, flecha {flecha:.1f} px. "
+          "Vuelva a capturar el oscuro, la referencia y la calibración en nm.")
+
+def quitar_enderezado():
+    enderezado.limpiar()
+    calibracion.limpiar()
+    etapa_analisis.reiniciar()
+    print("Enderezado eliminado.")
+
+# =============================================================================
+# Grabación de sesiones
+# =============================================================================
+
+def recorte_grabacion(frame):
+    # Se llama desde el hilo del grabador: recorte dentro del frame y ROI en el frame completo
+    return recorte_para(frame), recorte_activo
+
+def iniciar_grabacion():
+    global grabadores
+    if not streaming or motor_captura is None:
+        print("El stream debe estar iniciado para grabar.")
+        return
+    os.makedirs(CARPETA_GRABACIONES, exist_ok=True)
+    base = os.path.join(CARPETA_GRABACIONES, datetime.now().strftime("Sesion_%Y-%m-%d_%H-%M-%S"))
+    grabadores = [GrabadorPerfiles(base, recorte_para=recorte_grabacion, enderezado=enderezado)]
+    if not modo_perfiles.get():
+        grabadores.append(GrabadorMJPEG(base))
+    for grabador in grabadores:
+        grabador.iniciar()
+        motor_captura.observadores.append(grabador.agregar_frame)
+    boton_grabar.config(text="Detener Grabación", command=detener_grabacion)
+    print(f"Grabando sesión en {base}.*")
+
+def detener_grabacion():
+    global grabadores
+    for grabador in grabadores:
+        if motor_captura is not None and grabador.agregar_frame in motor_captura.observadores:
+            motor_captura.observadores.remove(grabador.agregar_frame)
+        grabador.detener()
+        print(f"{type(grabador).__name__}: {grabador.escritos} frames guardados, "
+              f"{grabador.descartados} omitidos por disco lento.")
+    grabadores = []
+    boton_grabar.config(text="Grabar Sesión", command=iniciar_grabacion)
+    label_grabacion.config(text="")
+
+# =============================================================================
+# Varias cámaras
+# =============================================================================
+
+def abrir_multicamara():
+    from multicamara import cargar_configuracion
+    from ventana_multicamara import abrir_ventana_multicamara
+
+    ruta = filedialog.askopenfilename(title="Configuración de cámaras", filetypes=[("JSON", "*.json")])
+    if not ruta:
+        return
+    try:
+        camaras, opciones = cargar_configuracion(ruta)
+    except (OSError, ValueError) as e:
+        messagebox.showerror("Error", f"No se pudo cargar la configuración: {e}")
+        return
+    abrir_ventana_multicamara(root, camaras, **opciones)
+
+# =============================================================================
+# Publicación de espectros
+# =============================================================================
+
+def alternar_publicacion():
+    global publicador
+    if publicar.get() and publicador is None:
+        try:
+            publicador = PublicadorEspectros(PUERTO_PUBLICACION).iniciar()
+        except OSError as e:
+            publicar.set(False)
+            messagebox.showerror("Error", f"No se pudo publicar en el puerto {PUERTO_PUBLICACION}: {e}")
+            return
+        print(f"Publicando espectros en {publicador.url}")
+    elif not publicar.get() and publicador is not None:
+        publicador.detener()
+        publicador = None
+        print("Publicación de espectros detenida.")
+    actualizar_publicacion()
+
+def actualizar_publicacion():
+    if publicador is None:
+        label_publicacion.config(text="")
+    else:
+        label_publicacion.config(text=f"{publicador.url}\n{publicador.suscriptores} suscriptores")
+
+def publicar_espectro(capturado):
+    espectral = obtener_frame_espectral()
+    if espectral is None:
+        return
+    with instrumentacion.medir("publicacion"):
+        # La marca de recepción (perf_counter) se pasa a segundos Unix para los suscriptores
+        marca = time.time() - (time.perf_counter() - capturado.marca_tiempo)
+        mismo_roi = calibracion.roi == recorte_activo
+        datos = codificar_espectro(
+            espectral.secuencia, marca, espectral.perfiles, recorte_activo, espectral.alto,
+            calibracion_lambda.eje(origen_x(), espectral.ancho),
+            oscuro=mismo_roi and calibracion.oscuro is not None,
+            referencia=mismo_roi and calibracion.referencia is not None,
+            enderezado=enderezado.calibrado and frame_actual is not None)
+        publicador.publicar(datos, marca)
+
+# =============================================================================
+# Estadísticas del pipeline
+# =============================================================================
+
+def actualizar_estadisticas():
+    global ultima_exportacion
+    if motor_captura is not None:
+        instrumentacion.contadores["descartados"] = motor_captura.frames_descartados
+        instrumentacion.contadores["errores_lectura"] = motor_captura.errores_lectura
+        instrumentacion.contadores["reconexiones"] = motor_captura.reconexiones
+    if grabadores:
+        instrumentacion.contadores["omitidos_grabacion"] = max(grabador.descartados for grabador in grabadores)
+    if publicador is not None:
+        instrumentacion.contadores["suscriptores_desconectados"] = publicador.desconectados_lentos
+        actualizar_publicacion()
+
+    if mostrar_estadisticas.get():
+        label_estadisticas.config(text=instrumentacion.texto_resumen() or "Sin datos")
+        label_estadisticas.place(in_=video_label, x=5, y=5)
+    else:
+        label_estadisticas.place_forget()
+
+    ahora = time.monotonic()
+    if exportar_estadisticas.get() and ahora - ultima_exportacion >= PERIODO_EXPORTACION_MS / 1000:
+        try:
+            instrumentacion.exportar(RUTA_ESTADISTICAS + ".json")
+            instrumentacion.exportar(RUTA_ESTADISTICAS + ".txt")
+        except OSError as e:
+            print(f"No se pudieron exportar las estadísticas: {e}")
+        ultima_exportacion = ahora
+    root.after(PERIODO_ESTADISTICAS_MS, actualizar_estadisticas)
 
 # =============================================================================
 # Cierre del programa
 # =============================================================================
 
 def cerrar_programa():
-    global cap, task_histograma, task_intensidad
-    if task_histograma:
-        root.after_cancel(task_histograma)
-    if task_intensidad:
-        root.after_cancel(task_intensidad)
+    global planificador_analisis
+    if planificador_analisis is not None:
+        planificador_analisis.detener()
+        planificador_analisis = None
     if streaming:
         stop_stream()
+    if publicador is not None:
+        publicador.detener()
+    # La restauración pendiente del sensor termina antes de salir (el hilo de control no es daemon)
+    control_sensor.shutdown(wait=False)
     root.destroy()
     print("Programa cerrado correctamente.")
 
@@ -289,14 +899,33 @@ def cerrar_programa():
 # =============================================================================
 
 def cargar_portada():
-    try:
-        portada = Image.open("templates/portada_Fotónica.png")
-        portada.thumbnail((300, 100))  # Ajusta el tamaño
-        portada_tk = ImageTk.PhotoImage(portada)
+    # La imagen se decodifica y reduce en un hilo; la ventana no la espera
+    resultado = {}
+
+    def leer():
+        try:
+            portada = Image.open("templates/portada_Fotónica.png")
+            portada.thumbnail((300, 100))  # Ajusta el tamaño
+            resultado["imagen"] = portada
+        except Exception as e:
+            resultado["error"] = e
+
+    def mostrar():
+        if hilo.is_alive():
+            root.after(20, mostrar)
+            return
+        if "error" in resultado:
+            print(f"Error al cargar la portada: {resultado['error']}")
+            return
+        # PhotoImage solo puede crearse en el hilo de Tkinter
+        portada_tk = ImageTk.PhotoImage(resultado["imagen"])
         label_portada.config(image=portada_tk)
         label_portada.image = portada_tk
-    except Exception as e:
-        print(f"Error al cargar la portada: {e}")
+        arranque.marcar("portada")
+
+    hilo = threading.Thread(target=leer, name="CargaPortada", daemon=True)
+    hilo.start()
+    root.after(20, mostrar)
 
 # =============================================================================
 # Interfaz gráfica principal
@@ -315,12 +944,29 @@ cargar_portada()
 frame_botones = Frame(root)
 frame_botones.pack(side="left", padx=10, pady=10)
 
+Label(frame_botones, text="Fuente:").pack()
+entrada_fuente = Entry(frame_botones, width=28)
+entrada_fuente.insert(0, url)
+entrada_fuente.pack(pady=2)
+
+combo_ritmo = ttk.Combobox(frame_botones, values=list(RITMOS.values()), state="readonly", width=22)
+combo_ritmo.current(0)
+combo_ritmo.pack(pady=2)
+
+spin_fps_fuente = Spinbox(frame_botones, from_=1, to=240, width=6)
+spin_fps_fuente.delete(0, "end")
+spin_fps_fuente.insert(0, "30")
+spin_fps_fuente.pack(pady=2)
+
 boton_iniciar = Button(frame_botones, text="Iniciar Stream", command=start_stream)
 boton_iniciar.pack(pady=5)
 
 boton_detener = Button(frame_botones, text="Detener Stream", command=stop_stream)
 boton_detener.pack(pady=5)
 
+label_conexion = Label(frame_botones, text="Estado: Detenido", wraplength=200, justify="left")
+label_conexion.pack(pady=2)
+
 boton_recorte = Button(frame_botones, text="Recortar Stream", command=iniciar_recorte, state="disabled")
 boton_recorte.pack(pady=5)
 
@@ -330,7 +976,79 @@ boton_resolucion.pack(pady=5)
 boton_analisis = Button(frame_botones, text="Análisis en Tiempo Real", command=abrir_ventanas, state="disabled")
 boton_analisis.pack(pady=5)
 
+roi_sensor = BooleanVar(value=False)
+check_roi_sensor = Checkbutton(frame_botones, text="ROI en el Sensor", variable=roi_sensor)
+check_roi_sensor.pack(pady=5)
+
+modo_perfiles = BooleanVar(value=False)
+check_modo_perfiles = Checkbutton(frame_botones, text="Modo Perfiles (sin imagen)", variable=modo_perfiles)
+check_modo_perfiles.pack(pady=5)
+
+boton_oscuro = Button(frame_botones, text="Capturar Oscuro", command=capturar_oscuro)
+boton_oscuro.pack(pady=5)
+
+boton_referencia = Button(frame_botones, text="Capturar Referencia", command=capturar_referencia)
+boton_referencia.pack(pady=5)
+
+boton_cargar_referencia = Button(frame_botones, text="Cargar Referencia", command=cargar_referencia)
+boton_cargar_referencia.pack(pady=5)
+
+boton_borrar_calibracion = Button(frame_botones, text="Borrar Calibración", command=borrar_calibracion)
+boton_borrar_calibracion.pack(pady=5)
+
+boton_longitud_onda = Button(frame_botones, text="Calibrar Longitud de Onda", command=calibrar_longitud_onda)
+boton_longitud_onda.pack(pady=5)
+
+boton_enderezar = Button(frame_botones, text="Enderezar Espectro", command=enderezar_espectro)
+boton_enderezar.pack(pady=5)
+
+boton_quitar_enderezado = Button(frame_botones, text="Quitar Enderezado", command=quitar_enderezado)
+boton_quitar_enderezado.pack(pady=5)
+
+combo_promedio = ttk.Combobox(frame_botones, values=list(MODOS_PROMEDIO.values()), state="readonly", width=22)
+combo_promedio.current(0)
+combo_promedio.bind("<<ComboboxSelected>>", cambiar_promediado)
+combo_promedio.pack(pady=5)
+
+spin_frames_promedio = Spinbox(frame_botones, from_=2, to=500, width=6, command=cambiar_promediado)
+spin_frames_promedio.delete(0, "end")
+spin_frames_promedio.insert(0, "10")
+spin_frames_promedio.pack(pady=5)
+
+label_latencia = Label(frame_botones, text="Latencia: -")
+label_latencia.pack(pady=5)
+
+mostrar_estadisticas = BooleanVar(value=False)
+check_estadisticas = Checkbutton(frame_botones, text="Mostrar Estadísticas", variable=mostrar_estadisticas)
+check_estadisticas.pack(pady=5)
+
+exportar_estadisticas = BooleanVar(value=False)
+check_exportar = Checkbutton(frame_botones, text="Exportar Estadísticas", variable=exportar_estadisticas)
+check_exportar.pack(pady=5)
+
+boton_grabar = Button(frame_botones, text="Grabar Sesión", command=iniciar_grabacion)
+boton_grabar.pack(pady=5)
+
+label_grabacion = Label(frame_botones, text="")
+label_grabacion.pack(pady=5)
+
+boton_multicamara = Button(frame_botones, text="Multicámara", command=abrir_multicamara)
+boton_multicamara.pack(pady=5)
+
+publicar = BooleanVar(value=False)
+check_publicar = Checkbutton(frame_botones, text="Publicar Espectros", variable=publicar, command=alternar_publicacion)
+check_publicar.pack(pady=5)
+
+label_publicacion = Label(frame_botones, text="", wraplength=200, justify="left")
+label_publicacion.pack(pady=2)
+
 video_label = Label(root, width=640, height=480, bg="black")
 video_label.pack(side="right", padx=10, pady=10)
 
+# Panel de estadísticas superpuesto al video
+label_estadisticas = Label(root, text="", justify="left", font=("Courier", 8), bg="black", fg="lime")
+
+arranque.marcar("interfaz")
+arranque.medir_primera_ventana(root)
+actualizar_estadisticas()
 root.mainloop()
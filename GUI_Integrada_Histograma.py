@@ -16,7 +16,11 @@ Librerías:
 - Tkinter: Para la creación de la interfaz gráfica.
 - Pillow (PIL): Para manipulación de imágenes y conversión a formatos compatibles.
 - NumPy: Para realizar operaciones matemáticas en matrices de datos.
-- Matplotlib: Para generar gráficos como histogramas y perfiles de intensidad.
+- Matplotlib: Para generar gráficos como histogramas y perfiles de intensidad
+  (se importa al dibujar el primer gráfico, no al abrir el programa).
+- calibracion (módulo local): Oscuro/referencia, transmitancia y absorbancia.
+- longitud_onda (módulo local): Calibración píxel → nm y detección de picos.
+- arranque (módulo local): Marcas del tiempo de arranque.
 
 Instrucciones:
 1. Ejecute el programa y utilice los botones de la interfaz para cargar una 
@@ -26,17 +30,39 @@ Instrucciones:
 3. Genere gráficos como histogramas y perfiles de intensidad utilizando los 
    botones correspondientes.
 4. La interfaz permite restaurar la imagen original en cualquier momento.
+5. Para medir absorbancia, cargue una imagen de referencia (I0) y, si se
+   desea, una imagen de oscuro; luego use "Graficar Absorbancia".
+6. Con "Calibrar Longitud de Onda" asigne la longitud de onda conocida a dos o
+   más picos (por ejemplo, de `espectro_Difraccion.png`); a partir de ese
+   momento las gráficas usan nm en el eje X y marcan los picos detectados.
 
 Nota: El programa está diseñado para trabajar con imágenes en formato PNG, JPG,
-JPEG y BMP. Los gráficos se generan en ventanas emergentes.
+JPEG, BMP y TIFF. La imagen se muestra reducida a 500x500, pero los perfiles se
+calculan siempre sobre los píxeles de resolución completa, en segundo plano.
+Los gráficos se generan en ventanas emergentes.
 ===============================================================================
 """
 
+import arranque
+import threading
 import tkinter as tk
-from tkinter import filedialog
+from tkinter import filedialog, messagebox
 from PIL import Image, ImageTk
 import numpy as np
-import matplotlib.pyplot as plt
+from calibracion import CalibracionFotometrica
+from perfiles import reducir_por_bloques, cargar_perfiles_imagen, vista_previa, TIPOS_IMAGEN
+from longitud_onda import CalibracionLongitudOnda, detectar_picos
+from ventana_calibracion import abrir_dialogo_longitud_onda
+
+arranque.marcar("importaciones")
+
+calibracion = CalibracionFotometrica()
+calibracion_lambda = CalibracionLongitudOnda()
+
+imagen_completa = None      # Imagen a resolución completa (única referencia al archivo abierto)
+recorte_original = None     # Recorte actual (x0, y0, x1, y1) en píxeles de resolución completa
+perfiles_cache = (None, None, None)  # (imagen, recorte, perfiles) del último análisis
+analisis_en_curso = False
 
 # =============================================================================
 # Funciones para manipulación de imágenes
@@ -45,15 +71,24 @@ import matplotlib.pyplot as plt
 def cargar_imagen():
     """
     Abre un cuadro de diálogo para seleccionar una imagen desde el sistema de 
-    archivos. La imagen seleccionada se carga, se escala a un tamaño máximo 
-    de 500x500 píxeles, y se muestra en la interfaz gráfica.
+    archivos. El archivo se abre una sola vez: para mostrarla se reduce a un 
+    tamaño máximo de 500x500 píxeles y la imagen de resolución completa se 
+    conserva para el análisis (los archivos sin compresión no se decodifican).
     """
-    global imagen_original, imagen_actual, imagen_tk
-    ruta_imagen = filedialog.askopenfilename(filetypes=[("Imágenes", "*.png;*.jpg;*.jpeg;*.bmp")])
+    global imagen_original, imagen_actual, imagen_tk, imagen_completa, recorte_original, perfiles_cache
+    if analisis_en_curso:
+        print("Análisis en curso, espere a que termine.")
+        return
+    ruta_imagen = filedialog.askopenfilename(filetypes=TIPOS_IMAGEN)
     if ruta_imagen:
-        imagen_original = Image.open(ruta_imagen)
-        imagen_original.thumbnail((500, 500))
+        if imagen_completa is not None:
+            imagen_completa.close()
+        # Un solo archivo abierto: la vista previa se reduce a partir de la imagen completa
+        imagen_completa = Image.open(ruta_imagen)
+        imagen_original = vista_previa(imagen_completa, (500, 500))
         imagen_actual = imagen_original.copy()
+        recorte_original = (0, 0) + imagen_completa.size
+        perfiles_cache = (None, None, None)
         mostrar_imagen(imagen_actual)
 
 def activar_recorte():
@@ -92,16 +127,20 @@ def terminar_seleccion(event):
     """
     Finaliza el proceso de selección, recortando la imagen cargada según las 
     coordenadas seleccionadas por el usuario. Restaura el estado del cursor 
-    y del botón de recorte.
+    y del botón de recorte. El rectángulo se traduce a coordenadas de la 
+    imagen de resolución completa.
     """
-    global x_inicial, y_inicial, imagen_actual, modo_recorte, rectangulo
+    global x_inicial, y_inicial, imagen_actual, modo_recorte, rectangulo, recorte_original
     if modo_recorte:
         x_final, y_final = event.x, event.y
         if imagen_actual:
-            x0, x1 = sorted([x_inicial, x_final])
-            y0, y1 = sorted([y_inicial, y_final])
-            imagen_actual = imagen_actual.crop((x0, y0, x1, y1))
-            mostrar_imagen(imagen_actual)
+            ancho, alto = imagen_actual.size
+            x0, x1 = sorted([min(max(x, 0), ancho) for x in (x_inicial, x_final)])
+            y0, y1 = sorted([min(max(y, 0), alto) for y in (y_inicial, y_final)])
+            if x1 > x0 and y1 > y0:
+                recorte_original = mapear_a_original((x0, y0, x1, y1))
+                imagen_actual = imagen_actual.crop((x0, y0, x1, y1))
+                mostrar_imagen(imagen_actual)
         modo_recorte = False
         boton_recortar.config(text="Recortar Imagen", state="normal")
         ventana.config(cursor="")
@@ -109,6 +148,18 @@ def terminar_seleccion(event):
             etiqueta_imagen.delete(rectangulo)
         rectangulo = None
 
+def mapear_a_original(seleccion):
+    """
+    Convierte un rectángulo en píxeles de la imagen mostrada (miniatura, 
+    posiblemente ya recortada) a píxeles de la imagen de resolución completa.
+    """
+    ox0, oy0, ox1, oy1 = recorte_original
+    escala_x = (ox1 - ox0) / imagen_actual.size[0]
+    escala_y = (oy1 - oy0) / imagen_actual.size[1]
+    x0, y0, x1, y1 = seleccion
+    return (ox0 + round(x0 * escala_x), oy0 + round(y0 * escala_y),
+            min(ox1, ox0 + round(x1 * escala_x)), min(oy1, oy0 + round(y1 * escala_y)))
+
 def mostrar_imagen(imagen):
     """
     Muestra la imagen proporcionada en el área principal de la interfaz gráfica.
@@ -122,57 +173,251 @@ def restaurar_imagen_original():
     Restaura la imagen original cargada, reemplazando cualquier modificación o 
     recorte realizado previamente.
     """
-    global imagen_actual
+    global imagen_actual, recorte_original
     if imagen_original:
         imagen_actual = imagen_original.copy()
+        recorte_original = (0, 0) + imagen_completa.size
         mostrar_imagen(imagen_actual)
 
 # =============================================================================
 # Funciones para análisis y graficación
 # =============================================================================
 
+def analizar_recorte(al_terminar):
+    """
+    Calcula los perfiles promedio por columna (R, G, B y gris) del recorte 
+    actual a resolución completa y llama a `al_terminar(perfiles)` en el hilo 
+    de Tkinter. La reducción se hace por bloques de filas en un hilo aparte 
+    para no bloquear la interfaz con imágenes grandes, y el resultado se 
+    reutiliza mientras no cambie el recorte.
+    """
+    global analisis_en_curso
+    imagen, recorte, perfiles = perfiles_cache
+    if imagen is imagen_completa and recorte == recorte_original:
+        al_terminar(perfiles)
+        return
+    if analisis_en_curso:
+        print("Análisis en curso, espere a que termine.")
+        return
+
+    analisis_en_curso = True
+    ventana.config(cursor="watch")
+    resultado = {}
+    imagen, recorte = imagen_completa, recorte_original
+
+    def reducir():
+        try:
+            resultado["perfiles"] = reducir_por_bloques(imagen, recorte)
+        except (OSError, ValueError) as e:
+            resultado["error"] = e
+
+    def esperar(hilo):
+        global analisis_en_curso, perfiles_cache
+        if hilo.is_alive():
+            ventana.after(50, esperar, hilo)
+            return
+        analisis_en_curso = False
+        ventana.config(cursor="")
+        if "error" in resultado:
+            print(f"Error al analizar la imagen: {resultado['error']}")
+            return
+        perfiles_cache = (imagen, recorte, resultado["perfiles"])
+        if imagen is imagen_completa and recorte == recorte_original:
+            al_terminar(resultado["perfiles"])
+
+    hilo = threading.Thread(target=reducir, daemon=True)
+    hilo.start()
+    esperar(hilo)
+
+def eje_x(ancho, etiqueta_pixeles):
+    """
+    Devuelve el eje X y su etiqueta: longitudes de onda en nm si hay 
+    calibración, o posiciones en píxeles en caso contrario.
+    """
+    eje = calibracion_lambda.eje(recorte_original[0], ancho)
+    if eje is not None:
+        return eje, 'Longitud de Onda (nm)'
+    return np.arange(ancho), etiqueta_pixeles
+
 def graficar_intensidad():
     """
     Genera un gráfico del perfil de intensidad en escala de grises de la 
     imagen cargada. Calcula el promedio de intensidad para cada columna de 
-    píxeles.
+    píxeles y marca los picos detectados con su posición sub-píxel.
     """
-    if imagen_actual:
-        gray_image = imagen_actual.convert('L')
-        gray_array = np.array(gray_image)
-        intensity_profile = np.mean(gray_array, axis=0)
-        x = np.arange(len(intensity_profile))
+    def dibujar(perfiles):
+        import matplotlib.pyplot as plt
+        intensity_profile = perfiles[3]
+        x, etiqueta_x = eje_x(len(intensity_profile), 'Eje X de la imagen')
+        picos = detectar_picos(intensity_profile)
         plt.figure(figsize=(10, 6))
         plt.plot(x, intensity_profile, color='black')
+        if picos.size:
+            x_picos = np.interp(picos, np.arange(len(x)), x)
+            plt.plot(x_picos, np.interp(picos, np.arange(len(x)), intensity_profile), 'rv')
+            for posicion in x_picos:
+                plt.annotate(f'{posicion:.1f}', (posicion, intensity_profile.max()), ha='center')
         plt.title('Perfil de Intensidad del Espectro')
-        plt.xlabel('Eje X de la imagen')
+        plt.xlabel(etiqueta_x)
         plt.ylabel('Intensidad')
         plt.grid(True)
         plt.show()
 
+    if imagen_actual:
+        analizar_recorte(dibujar)
+
 def mostrar_histograma():
     """
     Genera un histograma promedio de los canales de color (rojo, verde y azul)
     de la imagen cargada, mostrando las intensidades promedio en el eje X.
     """
-    if imagen_actual:
-        rgb_array = np.array(imagen_actual)
-        r_values = np.mean(rgb_array[:, :, 0], axis=0)
-        g_values = np.mean(rgb_array[:, :, 1], axis=0)
-        b_values = np.mean(rgb_array[:, :, 2], axis=0)
-        x = np.arange(rgb_array.shape[1])
+    def dibujar(perfiles):
+        import matplotlib.pyplot as plt
+        r_values, g_values, b_values, _ = perfiles
+        x, etiqueta_x = eje_x(len(r_values), 'Posición en X')
 
         plt.figure(figsize=(10, 6))
         plt.plot(x, r_values, color='red', label='Rojo')
         plt.plot(x, g_values, color='green', label='Verde')
         plt.plot(x, b_values, color='blue', label='Azul')
         plt.title('Histograma Promedio de Colores (R, G, B)')
-        plt.xlabel('Posición en X')
+        plt.xlabel(etiqueta_x)
         plt.ylabel('Valor Promedio')
         plt.legend()
         plt.grid(True)
         plt.show()
 
+    if imagen_actual:
+        analizar_recorte(dibujar)
+
+# =============================================================================
+# Funciones de calibración
+# =============================================================================
+
+def cargar_perfiles_calibracion(ruta, fijar, nombre):
+    """
+    Calcula en un hilo aparte los perfiles de la imagen `ruta` y, ya en el 
+    hilo de Tkinter, los entrega a `fijar` (fijar_oscuro o fijar_referencia).
+    Los errores de lectura se muestran en un cuadro de diálogo.
+    """
+    resultado = {}
+
+    def leer():
+        try:
+            resultado["perfiles"] = cargar_perfiles_imagen(ruta)
+        except (OSError, ValueError) as e:
+            resultado["error"] = e
+
+    def esperar(hilo):
+        if hilo.is_alive():
+            ventana.after(50, esperar, hilo)
+            return
+        ventana.config(cursor="")
+        if "error" in resultado:
+            messagebox.showerror("Error", f"No se pudo cargar {nombre}: {resultado['error']}")
+            return
+        fijar(resultado["perfiles"])
+        print(f"Calibración ({nombre}) leída de {ruta} ({resultado['perfiles'].shape[1]} columnas).")
+
+    ventana.config(cursor="watch")
+    hilo = threading.Thread(target=leer, daemon=True)
+    hilo.start()
+    esperar(hilo)
+
+def cargar_oscuro():
+    """
+    Carga una imagen tomada con la fuente de luz apagada y guarda su perfil 
+    por columna como oscuro de la calibración.
+    """
+    ruta = filedialog.askopenfilename(filetypes=TIPOS_IMAGEN)
+    if ruta:
+        cargar_perfiles_calibracion(ruta, calibracion.fijar_oscuro, "el oscuro")
+
+def cargar_referencia():
+    """
+    Carga una imagen de referencia (I0), por ejemplo 
+    `Imagenes_Ejemplo/recorte_referencia_*.png`, y guarda su perfil por columna.
+    La referencia debe tener el mismo ancho que el recorte analizado: no se 
+    interpola, para que cada columna corresponda a los mismos píxeles.
+    """
+    ruta = filedialog.askopenfilename(filetypes=TIPOS_IMAGEN)
+    if ruta:
+        cargar_perfiles_calibracion(ruta, calibracion.fijar_referencia, "la referencia")
+
+def graficar_absorbancia():
+    """
+    Grafica la absorbancia A = -log10(I/I0) por columna de la imagen cargada 
+    usando la referencia (y el oscuro, si existe) de la calibración.
+    """
+    def dibujar(perfiles):
+        import matplotlib.pyplot as plt
+        if not calibracion.valida_para(None, perfiles.shape[1]):
+            messagebox.showerror("Error", f"El recorte tiene {perfiles.shape[1]} columnas y la referencia "
+                                          f"{calibracion.ancho}. Use una referencia del mismo ancho.")
+            return
+        absorbancia = calibracion.absorbancia(perfiles)
+        x, etiqueta_x = eje_x(absorbancia.shape[1], 'Posición en X')
+
+        plt.figure(figsize=(10, 6))
+        plt.plot(x, absorbancia[0], color='red', label='Rojo')
+        plt.plot(x, absorbancia[1], color='green', label='Verde')
+        plt.plot(x, absorbancia[2], color='blue', label='Azul')
+        plt.plot(x, absorbancia[3], color='black', label='Intensidad')
+        plt.title('Absorbancia (-log10(I/I0))')
+        plt.xlabel(etiqueta_x)
+        plt.ylabel('Absorbancia')
+        plt.legend()
+        plt.grid(True)
+        plt.show()
+
+    if imagen_actual:
+        if not calibracion.calibrada:
+            print("Cargue primero una imagen de referencia (I0).")
+            return
+        analizar_recorte(dibujar)
+
+def calibrar_longitud_onda():
+    """
+    Detecta los picos del perfil de intensidad de la imagen actual y abre el 
+    diálogo para asignarles su longitud de onda conocida.
+    """
+    if imagen_actual:
+        analizar_recorte(lambda perfiles: abrir_dialogo_longitud_onda(
+            ventana, calibracion_lambda, detectar_picos(perfiles[3]) + recorte_original[0]))
+    else:
+        abrir_dialogo_longitud_onda(ventana, calibracion_lambda)
+
+def cargar_portada():
+    """
+    Decodifica y reduce la portada en un hilo para no retrasar la primera
+    ventana; el PhotoImage se crea después en el hilo de Tkinter.
+    """
+    resultado = {}
+
+    def leer():
+        try:
+            portada = Image.open("templates/portada_Fotónica.png")
+            portada.thumbnail((800, 100))
+            resultado["imagen"] = portada
+        except Exception as e:
+            resultado["error"] = e
+
+    def mostrar():
+        if hilo.is_alive():
+            ventana.after(20, mostrar)
+            return
+        if "error" in resultado:
+            print(f"Error al cargar la portada: {resultado['error']}")
+            return
+        portada_tk = ImageTk.PhotoImage(resultado["imagen"])
+        label_portada.config(image=portada_tk)
+        label_portada.image = portada_tk
+        arranque.marcar("portada")
+
+    hilo = threading.Thread(target=leer, name="CargaPortada", daemon=True)
+    hilo.start()
+    ventana.after(20, mostrar)
+
 # =============================================================================
 # Configuración de la interfaz gráfica
 # =============================================================================
@@ -182,12 +427,10 @@ ventana.title("Cargar y Recortar Imagen Visualmente")
 ventana.geometry("800x700")
 ventana.minsize(600, 700)
 
-# Carga de imágenes de portada y logo
-portada = Image.open("templates/portada_Fotónica.png")
-portada.thumbnail((800, 100))
-portada_tk = ImageTk.PhotoImage(portada)
-label_portada = tk.Label(ventana, image=portada_tk)
+# Portada: se carga en segundo plano
+label_portada = tk.Label(ventana)
 label_portada.pack(pady=10)
+cargar_portada()
 
 frame_botones = tk.Frame(ventana)
 frame_botones.place(relx=1.0, rely=0.25, anchor="ne")
@@ -208,6 +451,18 @@ boton_graficar.pack(pady=5)
 boton_histograma = tk.Button(frame_botones, text="Mostrar Histograma", command=mostrar_histograma)
 boton_histograma.pack(pady=5)
 
+boton_oscuro = tk.Button(frame_botones, text="Cargar Oscuro", command=cargar_oscuro)
+boton_oscuro.pack(pady=5)
+
+boton_referencia = tk.Button(frame_botones, text="Cargar Referencia", command=cargar_referencia)
+boton_referencia.pack(pady=5)
+
+boton_absorbancia = tk.Button(frame_botones, text="Graficar Absorbancia", command=graficar_absorbancia)
+boton_absorbancia.pack(pady=5)
+
+boton_longitud_onda = tk.Button(frame_botones, text="Calibrar Longitud de Onda", command=calibrar_longitud_onda)
+boton_longitud_onda.pack(pady=5)
+
 # Área para mostrar la imagen cargada
 etiqueta_imagen = tk.Canvas(ventana, width=500, height=500)
 etiqueta_imagen.pack(pady=(20, 0))
@@ -220,4 +475,6 @@ etiqueta_imagen.bind("<ButtonRelease-1>", terminar_seleccion)
 rectangulo = None  # Inicialización del rectángulo de selección
 
 # Ejecutar la interfaz
+arranque.marcar("interfaz")
+arranque.medir_primera_ventana(ventana)
 ventana.mainloop()
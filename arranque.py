@@ -0,0 +1,177 @@
+"""
+===============================================================================
+Proyecto: Espectrofotómetro Digital En Tiempo Real Para Uso Didáctico
+Descripción:
+Medición del tiempo de arranque de las interfaces. Las interfaces importan
+este módulo antes que cualquier otro y marcan con `marcar()` el fin de las
+importaciones y de la construcción de la ventana; `medir_primera_ventana()`
+registra cuándo se muestra la ventana principal.
+
+Si la variable de entorno ESPECTRO_MEDIR_ARRANQUE está definida, la
+interfaz imprime sus marcas en una línea JSON y se cierra sola. Ejecutado
+directamente, este módulo lanza cada interfaz (o cada ejecutable de
+PyInstaller) varias veces en ese modo y reporta las medianas, el costo de
+importar las librerías pesadas y si se superó el presupuesto de arranque.
+
+Uso:
+    python arranque.py
+    python arranque.py --presupuesto 3 --salida arranque.json
+    python arranque.py --programas dist/ESP32_CAM_GUI_DINAMICA.exe dist/GUI_Integrada_Histograma.exe
+
+Librerías:
+- subprocess: Ejecución de cada interfaz en un proceso nuevo.
+===============================================================================
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+_INICIO = time.perf_counter()
+
+VARIABLE_MEDICION = "ESPECTRO_MEDIR_ARRANQUE"
+PREFIJO_RESULTADO = "ARRANQUE "
+
+# Tiempo que la interfaz sigue abierta tras mostrarse, para registrar cargas asíncronas
+ESPERA_CIERRE_MS = 1000
+
+PROGRAMAS = ("ESP32_CAM_GUI_DINAMICA.py", "GUI_Integrada_Histograma.py")
+LIBRERIAS_PESADAS = ("numpy", "PIL.ImageTk", "cv2", "matplotlib.pyplot", "matplotlib.backends.backend_tkagg")
+
+marcas = {}
+marcas_reloj = {}
+
+# =============================================================================
+# Marcas dentro de la interfaz
+# =============================================================================
+
+def marcar(nombre):
+    """Registra los segundos transcurridos desde que se importó este módulo."""
+    if nombre not in marcas:
+        marcas[nombre] = round(time.perf_counter() - _INICIO, 4)
+
+def medir_primera_ventana(root):
+    """
+    Marca "primera_ventana" cuando `root` se muestra por primera vez. En modo
+    medición imprime el resultado y cierra la interfaz poco después.
+    """
+    def mostrada(event):
+        if event.widget is not root or "primera_ventana" in marcas:
+            return
+        root.update_idletasks()
+        marcar("primera_ventana")
+        # Reloj de pared para que el proceso que lanzó la interfaz calcule el total
+        marcas_reloj["primera_ventana"] = time.time()
+        if os.environ.get(VARIABLE_MEDICION):
+            root.after(ESPERA_CIERRE_MS, terminar)
+
+    def terminar():
+        resultado = {
+            "marcas": marcas,
+            "cargadas": [nombre for nombre in LIBRERIAS_PESADAS if nombre in sys.modules],
+            "reloj_ventana": marcas_reloj["primera_ventana"],
+        }
+        print(PREFIJO_RESULTADO + json.dumps(resultado), flush=True)
+        root.destroy()
+
+    root.bind("<Map>", mostrada, add="+")
+
+# =============================================================================
+# Banco de pruebas de arranque
+# =============================================================================
+
+def _mediana(valores):
+    valores = sorted(valores)
+    mitad = len(valores) // 2
+    return valores[mitad] if len(valores) % 2 else (valores[mitad - 1] + valores[mitad]) / 2
+
+def medir_importacion(modulo):
+    """Segundos que tarda `import modulo` en un intérprete nuevo."""
+    codigo = f"import time; t = time.perf_counter(); import {modulo}; print(time.perf_counter() - t)"
+    salida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, timeout=120)
+    if salida.returncode != 0:
+        return None
+    return round(float(salida.stdout.strip().splitlines()[-1]), 4)
+
+def medir_programa(programa, timeout=120):
+    """
+    Lanza `programa` (script .py o ejecutable) en modo medición. Devuelve el
+    tiempo total desde el lanzamiento hasta la primera ventana, medido desde
+    fuera (incluye el arranque del intérprete o la descompresión del
+    ejecutable), y las marcas internas.
+    """
+    programa = os.path.abspath(programa)
+    comando = [sys.executable, programa] if programa.endswith(".py") else [programa]
+    entorno = dict(os.environ, **{VARIABLE_MEDICION: "1"})
+    inicio = time.time()
+    proceso = subprocess.Popen(comando, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                               env=entorno, cwd=os.path.dirname(programa))
+    try:
+        for linea in proceso.stdout:
+            if linea.startswith(PREFIJO_RESULTADO):
+                resultado = json.loads(linea[len(PREFIJO_RESULTADO):])
+                resultado["total"] = round(resultado.pop("reloj_ventana") - inicio, 4)
+                proceso.wait(timeout)
+                return resultado
+        proceso.wait(timeout)
+    except subprocess.TimeoutExpired:
+        proceso.kill()
+        return {"error": f"Sin respuesta en {timeout} s"}
+    error = proceso.stderr.read().strip().splitlines()
+    return {"error": error[-1] if error else f"Terminó con código {proceso.returncode}"}
+
+def ejecutar(programas, repeticiones):
+    informe = {
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "importaciones": {modulo: medir_importacion(modulo) for modulo in LIBRERIAS_PESADAS},
+        "programas": {},
+    }
+    for programa in programas:
+        corridas = [medir_programa(programa) for _ in range(repeticiones)]
+        validas = [corrida for corrida in corridas if "error" not in corrida]
+        if not validas:
+            informe["programas"][programa] = {"error": corridas[-1]["error"]}
+            continue
+        nombres = set().union(*(corrida["marcas"] for corrida in validas))
+        informe["programas"][programa] = {
+            "repeticiones": len(validas),
+            "total": _mediana([corrida["total"] for corrida in validas]),
+            "marcas": {nombre: _mediana([corrida["marcas"][nombre] for corrida in validas
+                                         if nombre in corrida["marcas"]]) for nombre in sorted(nombres)},
+            "cargadas": validas[-1]["cargadas"],
+        }
+    return informe
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mide el tiempo de arranque de las interfaces.")
+    parser.add_argument("--programas", nargs="+", default=list(PROGRAMAS),
+                        help="Scripts .py o ejecutables de PyInstaller a medir.")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--presupuesto", type=float, help="Segundos máximos hasta la primera ventana.")
+    parser.add_argument("--salida", help="Archivo JSON de resultados.")
+    args = parser.parse_args()
+
+    informe = ejecutar(args.programas, args.repeticiones)
+    for modulo, segundos in informe["importaciones"].items():
+        print(f"import {modulo:<36} {'no disponible' if segundos is None else f'{segundos * 1000:7.0f} ms'}")
+    excedidos = 0
+    for programa, datos in informe["programas"].items():
+        if "error" in datos:
+            print(f"{programa}: error: {datos['error']}")
+            excedidos += 1
+            continue
+        detalle = ", ".join(f"{nombre} {segundos:.2f} s" for nombre, segundos in datos["marcas"].items())
+        print(f"{programa}: primera ventana en {datos['total']:.2f} s ({detalle})")
+        print(f"    librerías cargadas al mostrarse: {', '.join(datos['cargadas']) or 'ninguna'}")
+        if args.presupuesto is not None and datos["total"] > args.presupuesto:
+            print(f"    excede el presupuesto de {args.presupuesto:.2f} s")
+            excedidos += 1
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(informe, f, indent=2, ensure_ascii=False)
+        print(f"Resultados guardados en {args.salida}")
+    sys.exit(1 if excedidos else 0)
@@ -0,0 +1,315 @@
+"""
+===============================================================================
+Proyecto: Espectrofotómetro Digital En Tiempo Real Para Uso Didáctico
+Descripción:
+Banco de pruebas de rendimiento del recorrido frame → gráfica, sin interfaz.
+Mide por separado cada etapa de update_frame() y de las vistas de análisis
+(decodificación JPEG, recorte, enderezado, cvtColor, Image.fromarray,
+ImageTk.PhotoImage, copias con np.array, medias por columna y dibujo con
+Matplotlib) sobre frames sintéticos de QVGA a UXGA y con varios tamaños de ROI.
+También mide los fps de extremo a extremo contra el servidor MJPEG simulado.
+
+Los resultados se guardan en JSON para compararlos entre versiones:
+    python benchmark.py --salida resultados.json
+    python benchmark.py --salida nuevos.json --comparar resultados.json
+
+Librerías:
+- OpenCV (cv2), NumPy, Pillow (PIL): Etapas medidas.
+- Matplotlib (backend Agg): Dibujo completo y con blitting.
+===============================================================================
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from enderezado import EnderezadoEspectro
+from perfiles import calcular_perfiles
+from servidor_simulado import generar_espectro_sintetico
+
+RESOLUCIONES = {
+    "QVGA": (320, 240),
+    "VGA": (640, 480),
+    "SVGA": (800, 600),
+    "XGA": (1024, 768),
+    "SXGA": (1280, 1024),
+    "UXGA": (1600, 1200),
+}
+
+# ROI como fracciones (x0, y0, x1, y1) del frame
+ROIS = {
+    "completo": (0.0, 0.0, 1.0, 1.0),
+    "franja": (0.0, 0.4, 1.0, 0.6),
+    "centro": (0.25, 0.25, 0.75, 0.75),
+}
+
+# Una etapa se marca como regresión si su mediana empeora más que este factor
+UMBRAL_REGRESION = 1.2
+
+# =============================================================================
+# Medición
+# =============================================================================
+
+def medir(funcion, repeticiones=50, calentamiento=5):
+    """Ejecuta `funcion` y devuelve estadísticas de su duración en ms."""
+    for _ in range(calentamiento):
+        funcion()
+    tiempos = np.empty(repeticiones, dtype=np.float64)
+    for i in range(repeticiones):
+        inicio = time.perf_counter_ns()
+        funcion()
+        tiempos[i] = (time.perf_counter_ns() - inicio) / 1e6
+    return {
+        "repeticiones": repeticiones,
+        "mediana_ms": round(float(np.median(tiempos)), 4),
+        "p95_ms": round(float(np.percentile(tiempos, 95)), 4),
+        "min_ms": round(float(tiempos.min()), 4),
+        "media_ms": round(float(tiempos.mean()), 4),
+    }
+
+def recorte_en_pixeles(fracciones, ancho, alto):
+    fx0, fy0, fx1, fy1 = fracciones
+    return int(fx0 * ancho), int(fy0 * alto), max(int(fx1 * ancho), 1), max(int(fy1 * alto), 1)
+
+def _crear_tk():
+    # ImageTk necesita un intérprete de Tk con pantalla; sin ella la etapa se omite
+    try:
+        from tkinter import Tk, TclError
+        try:
+            raiz = Tk()
+            raiz.withdraw()
+            return raiz
+        except TclError:
+            return None
+    except ImportError:
+        return None
+
+# =============================================================================
+# Etapas por frame
+# =============================================================================
+
+def medir_etapas(nombre_resolucion, ancho, alto, nombre_roi, repeticiones, raiz_tk):
+    """Mide cada etapa de update_frame() y de las vistas para un tamaño y ROI."""
+    imagen = generar_espectro_sintetico(ancho, alto, rng=np.random.default_rng(0))
+    ok, jpeg = cv2.imencode(".jpg", imagen, [cv2.IMWRITE_JPEG_QUALITY, 80])
+    jpeg = np.frombuffer(jpeg.tobytes(), dtype=np.uint8)
+    x0, y0, x1, y1 = recorte_en_pixeles(ROIS[nombre_roi], ancho, alto)
+    roi = imagen[y0:y1, x0:x1]
+    rgb = cv2.cvtColor(roi, cv2.COLOR_BGR2RGB)
+    pil = Image.fromarray(rgb)
+    # Franja inclinada 3° y ligeramente curvada; los mapas se construyen fuera de la medición
+    enderezado = EnderezadoEspectro()
+    enderezado.coeficientes = np.array([1e-4, np.tan(np.radians(3)), y0 + (y1 - y0) / 2 - np.tan(np.radians(3)) * x0])
+    enderezado.mapas((x0, y0), x1 - x0, y1 - y0)
+
+    etapas = {
+        "decodificar_jpeg": lambda: cv2.imdecode(jpeg, cv2.IMREAD_COLOR),
+        "recorte_vista": lambda: imagen[y0:y1, x0:x1],
+        "recorte_copia": lambda: np.ascontiguousarray(imagen[y0:y1, x0:x1]),
+        "cvtColor_bgr2rgb": lambda: cv2.cvtColor(roi, cv2.COLOR_BGR2RGB),
+        "image_fromarray": lambda: Image.fromarray(rgb),
+        "np_array_copia": lambda: np.array(pil),
+        "medias_columna_pil": lambda: np.mean(np.array(pil.convert("L")), axis=0),
+        "perfiles_vectorizados": lambda: calcular_perfiles(roi, "BGR"),
+        "enderezado_remap": lambda: enderezado.aplicar(roi, (x0, y0)),
+    }
+    if raiz_tk is not None:
+        from PIL import ImageTk
+        etapas["imagetk_photoimage"] = lambda: ImageTk.PhotoImage(image=pil, master=raiz_tk)
+
+    resultados = []
+    for etapa, funcion in etapas.items():
+        resultado = {"etapa": etapa, "resolucion": nombre_resolucion, "roi": nombre_roi,
+                     "tamano": [x1 - x0, y1 - y0]}
+        resultado.update(medir(funcion, repeticiones))
+        resultados.append(resultado)
+    return resultados
+
+def medir_graficas(ancho, repeticiones):
+    """Dibujo completo (canvas.draw) frente a blitting de GraficaEnVivo."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from graficas import GraficaEnVivo
+
+    perfiles = calcular_perfiles(generar_espectro_sintetico(ancho, 16, ruido=0), "BGR")
+    series = [("red", "Rojo"), ("green", "Verde"), ("blue", "Azul"), ("black", "Gris")]
+    resultados = []
+
+    fig, ax = plt.subplots(figsize=(8, 5))
+    canvas = FigureCanvasAgg(fig)
+    lineas = [ax.plot(np.arange(ancho), fila, color=color)[0] for fila, (color, _) in zip(perfiles, series)]
+
+    def dibujo_completo():
+        for linea, fila in zip(lineas, perfiles):
+            linea.set_ydata(fila)
+        canvas.draw()
+
+    resultado = {"etapa": "matplotlib_draw_completo", "ancho": ancho}
+    resultado.update(medir(dibujo_completo, repeticiones))
+    resultados.append(resultado)
+    plt.close(fig)
+
+    fig, ax = plt.subplots(figsize=(8, 5))
+    canvas = FigureCanvasAgg(fig)
+    grafica = GraficaEnVivo(fig, ax, canvas, series, "Perfil", "Posición X", "Intensidad")
+    grafica.actualizar(perfiles)
+    canvas.draw()
+    resultado = {"etapa": "matplotlib_blit", "ancho": ancho}
+    resultado.update(medir(lambda: grafica.actualizar(perfiles), repeticiones))
+    resultados.append(resultado)
+    grafica.desconectar()
+    plt.close(fig)
+    return resultados
+
+# =============================================================================
+# Extremo a extremo
+# =============================================================================
+
+def medir_extremo_a_extremo(nombre_resolucion, ancho, alto, nombre_roi, segundos):
+    """
+    fps del recorrido completo (red local → cliente MJPEG → motor de captura →
+    decodificación → recorte → perfiles) contra el servidor simulado emitiendo
+    lo más rápido posible.
+    """
+    from captura import MotorCaptura
+    from cliente_mjpeg import ClienteMJPEG
+    from perfiles import EtapaAnalisis
+    from servidor_simulado import ServidorMJPEGSimulado
+
+    x0, y0, x1, y1 = recorte_en_pixeles(ROIS[nombre_roi], ancho, alto)
+    with ServidorMJPEGSimulado(fps=0, ancho=ancho, alto=alto) as servidor:
+        cliente = ClienteMJPEG(servidor.url).conectar()
+        motor = MotorCaptura(cliente)
+        etapa = EtapaAnalisis(orden="BGR")
+        motor.iniciar()
+        secuencia = procesados = 0
+        inicio = time.perf_counter()
+        while time.perf_counter() - inicio < segundos:
+            capturado = motor.esperar_frame(secuencia, timeout=0.5)
+            if capturado is None:
+                continue
+            secuencia = capturado.secuencia
+            etapa.procesar(secuencia, capturado.imagen[y0:y1, x0:x1], capturado.marca_tiempo)
+            procesados += 1
+        duracion = time.perf_counter() - inicio
+        motor.detener()
+        cliente.release()
+    return {
+        "resolucion": nombre_resolucion,
+        "roi": nombre_roi,
+        "segundos": round(duracion, 3),
+        "fps_recibidos": round(motor.secuencia / duracion, 2),
+        "fps_procesados": round(procesados / duracion, 2),
+        "frames_descartados": motor.frames_descartados,
+        "mbps": round(cliente.bytes_recibidos * 8 / duracion / 1e6, 2),
+    }
+
+# =============================================================================
+# Informe
+# =============================================================================
+
+def version_codigo():
+    try:
+        salida = subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True,
+                                text=True, timeout=5, cwd=os.path.dirname(os.path.abspath(__file__)))
+        return salida.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def entorno():
+    import matplotlib
+    return {
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "procesador": platform.processor() or platform.machine(),
+        "nucleos": os.cpu_count(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "pillow": Image.__version__,
+        "matplotlib": matplotlib.__version__,
+    }
+
+def _clave(resultado):
+    return (resultado["etapa"], resultado.get("resolucion"), resultado.get("roi"), resultado.get("ancho"))
+
+def comparar(actual, anterior):
+    """
+    Compara las medianas de dos informes y devuelve una lista de
+    (clave, mediana_anterior, mediana_actual, razón), ordenada de peor a mejor.
+    """
+    previas = {_clave(r): r["mediana_ms"] for r in anterior.get("etapas", [])}
+    filas = []
+    for resultado in actual["etapas"]:
+        clave = _clave(resultado)
+        if clave in previas and previas[clave] > 0:
+            filas.append((clave, previas[clave], resultado["mediana_ms"], resultado["mediana_ms"] / previas[clave]))
+    return sorted(filas, key=lambda fila: fila[3], reverse=True)
+
+def ejecutar(resoluciones, rois, repeticiones, segundos_extremo, extremo_a_extremo=True):
+    raiz_tk = _crear_tk()
+    informe = {
+        "version": version_codigo(),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "entorno": entorno(),
+        "etapas": [],
+        "extremo_a_extremo": [],
+    }
+    try:
+        for nombre_resolucion in resoluciones:
+            ancho, alto = RESOLUCIONES[nombre_resolucion]
+            for nombre_roi in rois:
+                print(f"Etapas: {nombre_resolucion} ({ancho}x{alto}), ROI {nombre_roi}")
+                informe["etapas"] += medir_etapas(nombre_resolucion, ancho, alto, nombre_roi, repeticiones, raiz_tk)
+            informe["etapas"] += medir_graficas(ancho, max(10, repeticiones // 2))
+            if extremo_a_extremo:
+                for nombre_roi in rois:
+                    print(f"Extremo a extremo: {nombre_resolucion}, ROI {nombre_roi}")
+                    informe["extremo_a_extremo"].append(
+                        medir_extremo_a_extremo(nombre_resolucion, ancho, alto, nombre_roi, segundos_extremo))
+    finally:
+        if raiz_tk is not None:
+            raiz_tk.destroy()
+    if raiz_tk is None:
+        print("Sin pantalla: se omitió la etapa ImageTk.PhotoImage.")
+    return informe
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mide el rendimiento de cada etapa del pipeline.")
+    parser.add_argument("--salida", default="benchmark.json", help="Archivo JSON de resultados.")
+    parser.add_argument("--resoluciones", nargs="+", choices=list(RESOLUCIONES), default=list(RESOLUCIONES))
+    parser.add_argument("--rois", nargs="+", choices=list(ROIS), default=list(ROIS))
+    parser.add_argument("--repeticiones", type=int, default=50)
+    parser.add_argument("--segundos", type=float, default=3.0, help="Duración de cada medición de extremo a extremo.")
+    parser.add_argument("--sin-extremo", action="store_true", help="Omite las mediciones contra el servidor simulado.")
+    parser.add_argument("--comparar", help="Informe JSON anterior para detectar regresiones.")
+    args = parser.parse_args()
+
+    informe = ejecutar(args.resoluciones, args.rois, args.repeticiones, args.segundos, not args.sin_extremo)
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(informe, f, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {args.salida}")
+
+    for resultado in informe["extremo_a_extremo"]:
+        print(f"{resultado['resolucion']:>5} {resultado['roi']:>9}: "
+              f"{resultado['fps_procesados']:7.1f} fps procesados, {resultado['fps_recibidos']:7.1f} fps recibidos")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            anterior = json.load(f)
+        regresiones = 0
+        for clave, previa, actual, razon in comparar(informe, anterior):
+            marca = "  <-- regresión" if razon > UMBRAL_REGRESION else ""
+            regresiones += bool(marca)
+            etiqueta = " ".join(str(parte) for parte in clave if parte is not None)
+            print(f"{etiqueta:<50} {previa:9.3f} ms -> {actual:9.3f} ms ({razon:5.2f}x){marca}")
+        print(f"{regresiones} etapas más lentas que {UMBRAL_REGRESION}x respecto a {args.comparar}")
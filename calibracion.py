@@ -0,0 +1,137 @@
+"""
+===============================================================================
+Proyecto: Espectrofotómetro Digital En Tiempo Real Para Uso Didáctico
+Descripción:
+Calibración fotométrica con frame oscuro (dark) y frame de referencia (I0).
+Los perfiles por columna del oscuro y de la referencia se guardan una sola vez
+para el ROI actual; a partir de ellos se precalculan el denominador
+(I0 - oscuro) y su recíproco, de modo que la transmitancia
+T = (I - oscuro) / (I0 - oscuro) y la absorbancia A = -log10(T) de cada frame
+se obtienen en un único paso vectorizado. Las columnas sin señal de referencia
+o con T <= 0 se marcan como NaN en lugar de producir divisiones entre cero.
+
+El oscuro, la referencia y la muestra deben tener el mismo ancho: cada
+columna corresponde a unos píxeles (y longitudes de onda) concretos, así que
+un perfil de otro ancho se rechaza en lugar de interpolarse.
+
+Librerías:
+- NumPy: Operaciones vectorizadas sobre los perfiles.
+===============================================================================
+"""
+
+import numpy as np
+
+# Señal mínima de referencia (en niveles de 0-255) para considerar válida una columna
+SENAL_MINIMA = 1.0
+
+# =============================================================================
+# Calibración fotométrica
+# =============================================================================
+
+class CalibracionFotometrica:
+    """
+    Guarda los perfiles de oscuro y referencia y calcula transmitancia y
+    absorbancia. `roi` identifica la región en la que se tomaron; los
+    perfiles de otro ROI o de otro ancho no se calibran con ellos.
+    """
+
+    def __init__(self, senal_minima=SENAL_MINIMA):
+        self.senal_minima = senal_minima
+        self.oscuro = None
+        self.referencia = None
+        self.roi = None
+        self._ancho = None
+        self._oscuro_ancho = None
+        self._inverso = None
+        self._invalidas = None
+        self._transmitancia = None
+        self._absorbancia = None
+
+    @property
+    def calibrada(self):
+        return self.referencia is not None
+
+    @property
+    def ancho(self):
+        """Columnas del oscuro o la referencia guardados, o None."""
+        for perfiles in (self.referencia, self.oscuro):
+            if perfiles is not None:
+                return perfiles.shape[1]
+        return None
+
+    def fijar_oscuro(self, perfiles, roi=None):
+        perfiles = np.array(perfiles, dtype=np.float32)
+        if roi != self.roi or perfiles.shape[1] != self.ancho:
+            # La referencia de otro ROI (u otro ancho) deja de ser válida
+            self.referencia = None
+            self.roi = roi
+        self.oscuro = perfiles
+        self._ancho = None
+
+    def fijar_referencia(self, perfiles, roi=None):
+        perfiles = np.array(perfiles, dtype=np.float32)
+        if roi != self.roi or perfiles.shape[1] != self.ancho:
+            self.oscuro = None
+            self.roi = roi
+        self.referencia = perfiles
+        self._ancho = None
+
+    def limpiar(self):
+        self.oscuro = None
+        self.referencia = None
+        self.roi = None
+        self._ancho = None
+
+    def valida_para(self, roi, ancho=None):
+        """Indica si la calibración se tomó en el mismo ROI (y, si se indica, con el mismo ancho)."""
+        return self.calibrada and self.roi == roi and (ancho is None or ancho == self.ancho)
+
+    def _preparar(self, forma):
+        """Precalcula oscuro, 1 / (I0 - oscuro) y máscara para la forma de la muestra."""
+        if self._ancho == forma:
+            return
+        canales, ancho = forma
+        if ancho != self.referencia.shape[1]:
+            raise ValueError(f"La muestra tiene {ancho} columnas y la referencia {self.referencia.shape[1]}; "
+                             "la calibración debe tomarse en el mismo ROI.")
+        referencia = self.referencia[:canales]
+        if self.oscuro is not None:
+            oscuro = self.oscuro[:canales]
+        else:
+            oscuro = np.zeros((canales, ancho), dtype=np.float32)
+        denominador = referencia - oscuro
+        self._invalidas = denominador < self.senal_minima
+        self._inverso = np.zeros_like(denominador)
+        np.divide(1.0, denominador, out=self._inverso, where=~self._invalidas)
+        self._oscuro_ancho = oscuro
+        self._transmitancia = np.empty((canales, ancho), dtype=np.float32)
+        self._absorbancia = np.empty((canales, ancho), dtype=np.float32)
+        self._ancho = forma
+
+    def transmitancia(self, perfiles):
+        """
+        T = (I - oscuro) / (I0 - oscuro) por canal y columna. Devuelve un buffer
+        interno reutilizado en cada llamada, o None si no hay referencia. Lanza
+        ValueError si `perfiles` no tiene el ancho de la referencia.
+        """
+        if not self.calibrada:
+            return None
+        self._preparar(perfiles.shape)
+        t = self._transmitancia
+        np.subtract(perfiles, self._oscuro_ancho, out=t)
+        t *= self._inverso
+        t[self._invalidas] = np.nan
+        return t
+
+    def absorbancia(self, perfiles):
+        """A = -log10(T); las columnas con T <= 0 o sin referencia quedan en NaN."""
+        t = self.transmitancia(perfiles)
+        if t is None:
+            return None
+        a = self._absorbancia
+        a.fill(np.nan)
+        with np.errstate(invalid="ignore"):
+            positivas = t > 0
+        np.log10(t, out=a, where=positivas)
+        np.negative(a, out=a, where=positivas)
+        return a
@@ -0,0 +1,213 @@
+"""
+===============================================================================
+Proyecto: Espectrofotómetro Digital En Tiempo Real Para Uso Didáctico
+Descripción:
+Motor de captura en segundo plano para el stream de la ESP32-CAM. Un hilo
+dedicado lee continuamente de la fuente de video y deposita cada frame en un
+buffer circular pequeño que solo conserva los frames más recientes. La interfaz
+gráfica y las ventanas de análisis consultan el buffer cuando están listas,
+usando el número de secuencia para saber si hay un frame nuevo.
+
+Librerías:
+- threading: Hilo de captura y sincronización del buffer.
+===============================================================================
+"""
+
+import threading
+import time
+
+# =============================================================================
+# Estructuras de datos
+# =============================================================================
+
+class FrameCapturado:
+    """
+    Frame entregado por el motor de captura junto con su número de secuencia y
+    el instante (time.perf_counter) en el que fue recibido. Si la fuente entrega
+    datos comprimidos (por ejemplo cliente_mjpeg.FrameJPEG), la imagen se
+    decodifica solo cuando un consumidor accede a `imagen`.
+    """
+
+    __slots__ = ("secuencia", "marca_tiempo", "datos")
+
+    def __init__(self, secuencia, marca_tiempo, datos):
+        self.secuencia = secuencia
+        self.marca_tiempo = marca_tiempo
+        self.datos = datos
+
+    @property
+    def imagen(self):
+        if hasattr(self.datos, "decodificar"):
+            return self.datos.decodificar()
+        return self.datos
+
+    @property
+    def marca_dispositivo(self):
+        """X-Timestamp de la cámara en segundos, si la fuente lo proporciona."""
+        return getattr(self.datos, "marca_dispositivo", None)
+
+class BufferUltimoFrame:
+    """
+    Buffer circular de capacidad fija que guarda únicamente los frames más
+    recientes. Los frames que se sobrescriben sin haber sido entregados a
+    ningún consumidor se contabilizan como descartados.
+    """
+
+    def __init__(self, capacidad=2):
+        if capacidad < 1:
+            raise ValueError("La capacidad del buffer debe ser al menos 1.")
+        self._ranuras = [None] * capacidad
+        self._capacidad = capacidad
+        self._lock = threading.Lock()
+        self._nuevo_frame = threading.Condition(self._lock)
+        self._secuencia = 0
+        self._ultima_entregada = 0
+        self._descartados = 0
+
+    @property
+    def secuencia(self):
+        """Número de secuencia del frame más reciente (0 si aún no hay frames)."""
+        return self._secuencia
+
+    @property
+    def frames_descartados(self):
+        """Cantidad de frames que nunca llegaron a ningún consumidor."""
+        with self._lock:
+            return self._descartados + max(0, self._secuencia - self._ultima_entregada - 1)
+
+    def publicar(self, imagen, marca_tiempo=None):
+        """
+        Inserta un frame nuevo en el buffer y devuelve su número de secuencia.
+        """
+        if marca_tiempo is None:
+            marca_tiempo = time.perf_counter()
+        with self._lock:
+            self._secuencia += 1
+            frame = FrameCapturado(self._secuencia, marca_tiempo, imagen)
+            self._ranuras[self._secuencia % self._capacidad] = frame
+            self._nuevo_frame.notify_all()
+            return self._secuencia
+
+    def obtener_ultimo(self, ultima_secuencia=0):
+        """
+        Devuelve el frame más reciente si su secuencia es mayor que
+        `ultima_secuencia`; en caso contrario devuelve None.
+        """
+        with self._lock:
+            return self._entregar(ultima_secuencia)
+
+    def esperar_nuevo(self, ultima_secuencia=0, timeout=None):
+        """
+        Bloquea hasta que exista un frame con secuencia mayor que
+        `ultima_secuencia` o hasta que expire `timeout`.
+        """
+        with self._lock:
+            self._nuevo_frame.wait_for(lambda: self._secuencia > ultima_secuencia, timeout)
+            return self._entregar(ultima_secuencia)
+
+    def limpiar(self):
+        """Vacía el buffer conservando el contador de secuencia."""
+        with self._lock:
+            self._ranuras = [None] * self._capacidad
+            self._ultima_entregada = self._secuencia
+
+    def _entregar(self, ultima_secuencia):
+        if self._secuencia <= ultima_secuencia:
+            return None
+        frame = self._ranuras[self._secuencia % self._capacidad]
+        if frame is None:
+            return None
+        if frame.secuencia > self._ultima_entregada:
+            self._descartados += frame.secuencia - self._ultima_entregada - 1
+            self._ultima_entregada = frame.secuencia
+        return frame
+
+# =============================================================================
+# Motor de captura
+# =============================================================================
+
+class MotorCaptura:
+    """
+    Lee frames de una fuente compatible con cv2.VideoCapture (método read() que
+    devuelve (ret, frame)) en un hilo propio y los publica en un
+    BufferUltimoFrame. La fuente nunca se lee desde el hilo de Tkinter.
+
+    `observadores` es una lista de funciones observador(secuencia, frame) que
+    se llaman desde el hilo de captura con cada frame recibido, antes de que
+    pueda ser sobrescrito en el buffer. Deben ser rápidas y no bloquear (por
+    ejemplo, encolar el frame para un grabador).
+
+    Si se indica `instrumentacion` (instrumentacion.Instrumentacion), se
+    registra la duración de cada lectura como etapa "captura" y cada frame
+    recibido como evento "captura".
+    """
+
+    def __init__(self, fuente, capacidad=2, espera_error=0.05, instrumentacion=None):
+        self.fuente = fuente
+        self.buffer = BufferUltimoFrame(capacidad)
+        self.espera_error = espera_error
+        self.instrumentacion = instrumentacion
+        self.errores_lectura = 0
+        self.observadores = []
+        self._detener = threading.Event()
+        self._hilo = None
+
+    @property
+    def activo(self):
+        return self._hilo is not None and self._hilo.is_alive()
+
+    @property
+    def secuencia(self):
+        return self.buffer.secuencia
+
+    @property
+    def frames_descartados(self):
+        return self.buffer.frames_descartados
+
+    def iniciar(self):
+        """Arranca el hilo de captura si no está en ejecución."""
+        if self.activo:
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._bucle_captura, name="MotorCaptura", daemon=True)
+        self._hilo.start()
+
+    def detener(self, timeout=1.0):
+        """Solicita la detención del hilo y espera a que termine."""
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+            self._hilo = None
+
+    def obtener_frame(self, ultima_secuencia=0):
+        """Devuelve el frame más reciente no visto o None."""
+        return self.buffer.obtener_ultimo(ultima_secuencia)
+
+    def esperar_frame(self, ultima_secuencia=0, timeout=None):
+        """Bloquea hasta recibir un frame nuevo o hasta que expire `timeout`."""
+        return self.buffer.esperar_nuevo(ultima_secuencia, timeout)
+
+    def _bucle_captura(self):
+        while not self._detener.is_set():
+            inicio = time.perf_counter()
+            try:
+                ret, frame = self.fuente.read()
+            except Exception as e:
+                print(f"Error en el hilo de captura: {e}")
+                ret, frame = False, None
+            if ret and frame is not None:
+                self._publicar(frame, inicio)
+            else:
+                self.errores_lectura += 1
+                self._detener.wait(self.espera_error)
+
+    def _publicar(self, frame, inicio):
+        """Publica un frame leído; `inicio` es el instante en que empezó su lectura."""
+        if self.instrumentacion is not None:
+            fin = time.perf_counter()
+            self.instrumentacion.registrar("captura", fin - inicio)
+            self.instrumentacion.marcar("captura", fin)
+        secuencia = self.buffer.publicar(frame, getattr(frame, "marca_recepcion", None))
+        for observador in list(self.observadores):
+            observador(secuencia, frame)
+        return secuencia
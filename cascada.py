@@ -0,0 +1,171 @@
+"""
+===============================================================================
+Proyecto: Espectrofotómetro Digital En Tiempo Real Para Uso Didáctico
+Descripción:
+Historial de espectros para la vista de cascada (espectrograma). Los perfiles
+por columna se acumulan en un anillo preasignado de `filas` x ancho float32:
+cada fila es el promedio de los frames recibidos durante `intervalo`
+segundos, así que la memoria queda fija sin importar cuánto dure la sesión
+(600 filas de 0.5 s son 5 minutos de historia). Las series temporales de
+bandas o picos se calculan a partir de las mismas filas, por lo que una banda
+elegida a mitad de la sesión muestra también su historia anterior.
+
+Librerías:
+- NumPy: Anillo preasignado y promedios por banda.
+===============================================================================
+"""
+
+import numpy as np
+
+FILAS_CASCADA = 600
+INTERVALO_FILA = 0.5
+
+# Semiancho por defecto de una banda indicada con un solo valor (px o nm)
+SEMIANCHO_BANDA = 2.0
+
+# =============================================================================
+# Anillo de perfiles
+# =============================================================================
+
+class BufferCascada:
+    """
+    Anillo de perfiles de un canal (por ejemplo, la luminancia). `agregar()`
+    acumula frames y cierra una fila cada `intervalo` segundos; `ordenar()`
+    copia las filas en orden cronológico (la más antigua primero) en un
+    arreglo preasignado que se puede pasar directamente a imshow. Las filas
+    todavía vacías son NaN.
+    """
+
+    def __init__(self, filas=FILAS_CASCADA, intervalo=INTERVALO_FILA):
+        self.filas = filas
+        self.intervalo = intervalo
+        self.ancho = None
+        self.clave = None
+        self.indice = 0
+        self.llenas = 0
+        self._datos = None
+        self._ordenadas = None
+        self._marcas = np.full(filas, np.nan)
+        self._marcas_ordenadas = np.empty(filas)
+        self._suma = None
+        self._conteo = 0
+        self._inicio_fila = None
+
+    @property
+    def duracion(self):
+        return self.filas * self.intervalo
+
+    def configurar(self, filas=None, intervalo=None):
+        """Cambia el tamaño o el intervalo y descarta la historia."""
+        if filas is not None and int(filas) != self.filas:
+            self.filas = max(2, int(filas))
+            self._marcas = np.full(self.filas, np.nan)
+            self._marcas_ordenadas = np.empty(self.filas)
+            self.ancho = None
+        if intervalo is not None:
+            self.intervalo = max(1e-3, float(intervalo))
+        self.reiniciar()
+
+    def reiniciar(self, ancho=None, clave=None):
+        if ancho is not None and ancho != self.ancho:
+            self._datos = np.empty((self.filas, ancho), dtype=np.float32)
+            self._ordenadas = np.empty((self.filas, ancho), dtype=np.float32)
+            self._suma = np.zeros(ancho, dtype=np.float32)
+            self.ancho = ancho
+        if self._datos is not None:
+            self._datos.fill(np.nan)
+            self._suma.fill(0.0)
+        self._marcas.fill(np.nan)
+        self.clave = clave
+        self.indice = 0
+        self.llenas = 0
+        self._conteo = 0
+        self._inicio_fila = None
+
+    def agregar(self, perfil, marca, clave=None):
+        """
+        Acumula un perfil tomado en el instante `marca` (s). `clave`
+        identifica el ROI y la calibración: si cambia, o cambia el ancho, la
+        historia se reinicia. Devuelve True si se cerró una fila.
+        """
+        if len(perfil) != self.ancho or clave != self.clave:
+            self.reiniciar(len(perfil), clave)
+        if self._inicio_fila is None:
+            self._inicio_fila = marca
+        self._suma += perfil
+        self._conteo += 1
+        if marca - self._inicio_fila < self.intervalo:
+            return False
+
+        np.multiply(self._suma, 1.0 / self._conteo, out=self._datos[self.indice])
+        self._marcas[self.indice] = marca
+        self.indice = (self.indice + 1) % self.filas
+        self.llenas = min(self.llenas + 1, self.filas)
+        self._suma.fill(0.0)
+        self._conteo = 0
+        self._inicio_fila = marca
+        return True
+
+    def ordenar(self):
+        """Devuelve (filas, marcas) en orden cronológico, en buffers reutilizados."""
+        if self._datos is None:
+            return None, None
+        antiguas = self.filas - self.indice
+        self._ordenadas[:antiguas] = self._datos[self.indice:]
+        self._ordenadas[antiguas:] = self._datos[:self.indice]
+        self._marcas_ordenadas[:antiguas] = self._marcas[self.indice:]
+        self._marcas_ordenadas[antiguas:] = self._marcas[:self.indice]
+        return self._ordenadas, self._marcas_ordenadas
+
+    def series(self, bandas, filas_ordenadas=None):
+        """
+        Promedio de cada banda (columna_inicial, columna_final) en cada fila,
+        en orden cronológico. `filas_ordenadas` evita volver a ordenar si ya
+        se llamó a ordenar().
+        """
+        if filas_ordenadas is None:
+            filas_ordenadas, _ = self.ordenar()
+        if filas_ordenadas is None:
+            return []
+        return [filas_ordenadas[:, c0:c1].mean(axis=1) for c0, c1 in bandas]
+
+# =============================================================================
+# Bandas
+# =============================================================================
+
+def leer_bandas(texto, semiancho=SEMIANCHO_BANDA):
+    """
+    Interpreta una lista separada por comas de bandas "inicio-fin" o de
+    centros "valor" (banda de ±`semiancho`). Devuelve pares (inicio, fin).
+    """
+    bandas = []
+    for entrada in texto.replace(";", ",").split(","):
+        entrada = entrada.strip()
+        if not entrada:
+            continue
+        try:
+            if "-" in entrada:
+                inicio, fin = (float(valor) for valor in entrada.split("-", 1))
+            else:
+                centro = float(entrada)
+                inicio, fin = centro - semiancho, centro + semiancho
+        except ValueError:
+            raise ValueError(f"Banda no válida: '{entrada}'")
+        bandas.append((min(inicio, fin), max(inicio, fin)))
+    return bandas
+
+def columnas_banda(eje, inicio, fin):
+    """
+    Columnas (c0, c1) del ROI cuyo valor en `eje` (nm o píxeles del frame
+    completo, creciente o decreciente) cae en [inicio, fin]. Si la banda es
+    más angosta que una columna se usa la columna más cercana; si queda
+    fuera del eje devuelve None.
+    """
+    dentro = np.flatnonzero((eje >= inicio) & (eje <= fin))
+    if dentro.size:
+        return int(dentro[0]), int(dentro[-1]) + 1
+    centro = (inicio + fin) / 2
+    if not min(eje[0], eje[-1]) <= centro <= max(eje[0], eje[-1]):
+        return None
+    columna = int(np.argmin(np.abs(eje - centro)))
+    return columna, columna + 1
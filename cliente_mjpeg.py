@@ -0,0 +1,488 @@
+"""
+===============================================================================
+Proyecto: Espectrofotómetro Digital En Tiempo Real Para Uso Didáctico
+Descripción:
+Cliente nativo para el stream MJPEG multipart de la ESP32-CAM. Interpreta
+directamente el formato que escribe `stream_handler` en el firmware
+(CameraWebServer/app_httpd.cpp): cada parte viene precedida por el boundary y
+por las cabeceras Content-Length y X-Timestamp. Las cabeceras se analizan sobre
+un buffer preasignado usando memoryviews, el JPEG de cada parte se lee con una
+única lectura del tamaño indicado y la decodificación solo ocurre cuando un
+consumidor la solicita.
+
+El cliente expone la misma interfaz mínima que cv2.VideoCapture (read(),
+isOpened(), release()) para poder usarse con captura.MotorCaptura. Para
+atender varias cámaras desde un mismo bucle de asyncio existe además
+ClienteMJPEGAsincrono, que interpreta el mismo formato sobre StreamReader.
+
+Librerías:
+- socket: Conexión HTTP directa con la cámara.
+- asyncio: Variante asíncrona del cliente.
+- OpenCV (cv2) y NumPy: Decodificación diferida de los JPEG. OpenCV se
+  importa con el primer frame decodificado, no al importar este módulo.
+===============================================================================
+"""
+
+import asyncio
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+TAM_BUFFER = 64 * 1024
+LIMITE_LINEA = 1024
+
+# =============================================================================
+# Frame JPEG con decodificación diferida
+# =============================================================================
+
+class FrameJPEG:
+    """
+    Parte JPEG recibida del stream. Conserva los bytes comprimidos, la marca de
+    tiempo del dispositivo (X-Timestamp, en segundos) y el instante local de
+    recepción (time.perf_counter). La imagen BGR se decodifica una sola vez y
+    únicamente cuando se llama a decodificar(); si varios hilos la piden a la
+    vez (la interfaz y un grabador), uno decodifica y los demás esperan el
+    resultado.
+    """
+
+    __slots__ = ("datos", "marca_dispositivo", "marca_recepcion", "_imagen", "_lock")
+
+    def __init__(self, datos, marca_dispositivo, marca_recepcion):
+        self.datos = datos
+        self.marca_dispositivo = marca_dispositivo
+        self.marca_recepcion = marca_recepcion
+        self._imagen = None
+        self._lock = threading.Lock()
+
+    def decodificar(self):
+        if self._imagen is None:
+            with self._lock:
+                if self._imagen is None:
+                    import cv2
+                    self._imagen = cv2.imdecode(np.frombuffer(self.datos, dtype=np.uint8), cv2.IMREAD_COLOR)
+        return self._imagen
+
+# =============================================================================
+# Lectura de bajo nivel sobre el socket
+# =============================================================================
+
+class _FlujoSocket:
+    """
+    Buffer de recepción preasignado sobre un socket. Permite leer líneas y
+    bloques de tamaño exacto sin crear copias intermedias.
+    """
+
+    def __init__(self, sock, tam_buffer=TAM_BUFFER):
+        self._sock = sock
+        self._buffer = bytearray(tam_buffer)
+        self._vista = memoryview(self._buffer)
+        self._inicio = 0
+        self._fin = 0
+
+    @property
+    def disponibles(self):
+        return self._fin - self._inicio
+
+    def rellenar(self):
+        """Recibe más datos del socket, compactando el buffer si es necesario."""
+        if self._inicio == self._fin:
+            self._inicio = self._fin = 0
+        elif self._fin == len(self._buffer):
+            pendiente = self._fin - self._inicio
+            self._vista[:pendiente] = self._vista[self._inicio:self._fin]
+            self._inicio, self._fin = 0, pendiente
+        n = self._sock.recv_into(self._vista[self._fin:])
+        if n == 0:
+            raise ConnectionError("La cámara cerró la conexión.")
+        self._fin += n
+
+    def buscar(self, patron, limite):
+        """Posición relativa de `patron` dentro de los próximos `limite` bytes, o -1."""
+        pos = self._buffer.find(patron, self._inicio, min(self._fin, self._inicio + limite))
+        return -1 if pos < 0 else pos - self._inicio
+
+    def consumir(self, n, destino=None):
+        """Descarta (o copia en `destino`) los siguientes `n` bytes ya recibidos."""
+        if destino is not None:
+            destino[:n] = self._vista[self._inicio:self._inicio + n]
+        self._inicio += n
+
+    def extraer(self, n):
+        """Devuelve como bytes los siguientes `n` bytes ya recibidos."""
+        datos = bytes(self._vista[self._inicio:self._inicio + n])
+        self._inicio += n
+        return datos
+
+    def leer_linea(self):
+        while True:
+            pos = self.buscar(b"\n", self.disponibles)
+            if pos >= 0:
+                return self.extraer(pos + 1)
+            if self.disponibles >= LIMITE_LINEA:
+                raise ValueError("Línea de cabecera demasiado larga en el stream.")
+            self.rellenar()
+
+    def leer_en(self, destino):
+        """Llena por completo el memoryview `destino`."""
+        total = len(destino)
+        copiados = min(total, self.disponibles)
+        self.consumir(copiados, destino)
+        while copiados < total:
+            n = self._sock.recv_into(destino[copiados:])
+            if n == 0:
+                raise ConnectionError("La cámara cerró la conexión.")
+            copiados += n
+
+class _CuerpoHTTP:
+    """
+    Cuerpo de la respuesta HTTP. El servidor de la ESP32 envía el stream con
+    Transfer-Encoding: chunked (una llamada a httpd_resp_send_chunk por bloque),
+    así que aquí se resuelve esa capa de forma transparente.
+    """
+
+    def __init__(self, flujo, fragmentado):
+        self._flujo = flujo
+        self._fragmentado = fragmentado
+        self._restante = 0
+
+    def _abrir_fragmento(self):
+        # El CRLF que cierra cada fragmento llega como una línea vacía
+        while self._restante == 0:
+            linea = self._flujo.leer_linea().strip()
+            if not linea:
+                continue
+            self._restante = int(linea.split(b";", 1)[0], 16)
+            if self._restante == 0:
+                raise ConnectionError("El stream terminó.")
+
+    def leer_linea(self):
+        if not self._fragmentado:
+            return self._flujo.leer_linea()
+        partes = []
+        longitud = 0
+        while True:
+            self._abrir_fragmento()
+            if self._flujo.disponibles == 0:
+                self._flujo.rellenar()
+            ventana = min(self._restante, self._flujo.disponibles)
+            pos = self._flujo.buscar(b"\n", ventana)
+            n = pos + 1 if pos >= 0 else ventana
+            partes.append(self._flujo.extraer(n))
+            self._restante -= n
+            longitud += n
+            if pos >= 0:
+                return b"".join(partes)
+            if longitud >= LIMITE_LINEA:
+                raise ValueError("Línea de cabecera demasiado larga en el stream.")
+
+    def leer_en(self, destino):
+        if not self._fragmentado:
+            self._flujo.leer_en(destino)
+            return
+        copiados = 0
+        total = len(destino)
+        while copiados < total:
+            self._abrir_fragmento()
+            n = min(self._restante, total - copiados)
+            self._flujo.leer_en(destino[copiados:copiados + n])
+            self._restante -= n
+            copiados += n
+
+# =============================================================================
+# Cliente MJPEG
+# =============================================================================
+
+class ClienteMJPEG:
+    """
+    Cliente del endpoint /stream de la ESP32-CAM. Cada llamada a leer_parte()
+    devuelve un FrameJPEG con los bytes de la parte y su X-Timestamp.
+    """
+
+    def __init__(self, url, timeout=5.0, tam_buffer=TAM_BUFFER):
+        self.url = url
+        self.timeout = timeout
+        self.tam_buffer = tam_buffer
+        self.boundary = None
+        self.partes_recibidas = 0
+        self.bytes_recibidos = 0
+        self.desfase_reloj = None
+        self.ultimo_error = None
+        self._sock = None
+        self._cuerpo = None
+
+    # -- Interfaz compatible con cv2.VideoCapture ---------------------------
+
+    def isOpened(self):
+        return self._sock is not None
+
+    def read(self):
+        try:
+            return True, self.leer_parte()
+        except (OSError, ValueError) as e:
+            self.ultimo_error = e
+            if self._sock is None:
+                # release() desde otro hilo: el error de lectura es esperado
+                return False, None
+            print(f"Error leyendo el stream MJPEG: {e}")
+            self.release()
+            return False, None
+
+    def release(self):
+        # Puede llamarse a la vez desde el hilo de lectura y desde otro hilo
+        sock, self._sock = self._sock, None
+        self._cuerpo = None
+        if sock is not None:
+            try:
+                # shutdown() desbloquea un recv en curso en otro hilo; close() solo no lo hace
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    # -- Conexión ----------------------------------------------------------
+
+    def conectar(self):
+        """Abre la conexión HTTP y valida la respuesta multipart."""
+        partes = urlsplit(self.url)
+        host = partes.hostname
+        puerto = partes.port or 80
+        ruta = partes.path or "/"
+        if partes.query:
+            ruta += "?" + partes.query
+
+        self._sock = socket.create_connection((host, puerto), timeout=self.timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        peticion = f"GET {ruta} HTTP/1.1\r\nHost: {host}:{puerto}\r\nConnection: keep-alive\r\n\r\n"
+        self._sock.sendall(peticion.encode("ascii"))
+
+        flujo = _FlujoSocket(self._sock, self.tam_buffer)
+        estado = flujo.leer_linea().decode("latin-1").split()
+        if len(estado) < 2 or estado[1] != "200":
+            self.release()
+            raise ConnectionError(f"Respuesta inesperada del stream: {' '.join(estado)}")
+
+        cabeceras = self._leer_cabeceras(flujo.leer_linea)
+        tipo = cabeceras.get("content-type", "")
+        if "boundary=" not in tipo:
+            self.release()
+            raise ConnectionError(f"El stream no es multipart: {tipo}")
+        self.boundary = b"--" + tipo.split("boundary=", 1)[1].strip().strip('"').encode("latin-1")
+        fragmentado = cabeceras.get("transfer-encoding", "").lower() == "chunked"
+        self._cuerpo = _CuerpoHTTP(flujo, fragmentado)
+        return self
+
+    @staticmethod
+    def _leer_cabeceras(leer_linea):
+        cabeceras = {}
+        while True:
+            linea = leer_linea().strip()
+            if not linea:
+                return cabeceras
+            nombre, _, valor = linea.decode("latin-1").partition(":")
+            cabeceras[nombre.strip().lower()] = valor.strip()
+
+    # -- Lectura de partes -------------------------------------------------
+
+    def leer_parte(self):
+        """
+        Lee la siguiente parte completa del stream. No reconecta: si el
+        cliente no está conectado (o release() lo cerró desde otro hilo) lanza
+        ConnectionError y la reconexión queda a cargo de quien lo usa
+        (conexion.MotorReconexion).
+        """
+        cuerpo = self._cuerpo
+        if cuerpo is None:
+            raise ConnectionError("El cliente MJPEG no está conectado.")
+
+        while cuerpo.leer_linea().strip() != self.boundary:
+            pass
+        cabeceras = self._leer_cabeceras(cuerpo.leer_linea)
+
+        if "content-length" not in cabeceras:
+            raise ValueError("La parte del stream no incluye Content-Length.")
+        longitud = int(cabeceras["content-length"])
+        datos = bytearray(longitud)
+        cuerpo.leer_en(memoryview(datos))
+        marca_recepcion = time.perf_counter()
+
+        marca_dispositivo = None
+        if "x-timestamp" in cabeceras:
+            marca_dispositivo = float(cabeceras["x-timestamp"])
+            desfase = marca_recepcion - marca_dispositivo
+            if self.desfase_reloj is None or desfase < self.desfase_reloj:
+                self.desfase_reloj = desfase
+
+        self.partes_recibidas += 1
+        self.bytes_recibidos += longitud
+        return self._crear_frame(datos, marca_dispositivo, marca_recepcion)
+
+    def _crear_frame(self, datos, marca_dispositivo, marca_recepcion):
+        return FrameJPEG(datos, marca_dispositivo, marca_recepcion)
+
+    def latencia(self, frame, instante=None):
+        """
+        Latencia captura→`instante` (por defecto, ahora) en segundos. Los
+        relojes de la cámara y del PC no están sincronizados, así que el valor
+        es relativo al frame más rápido observado (desfase mínimo).
+        """
+        if frame.marca_dispositivo is None or self.desfase_reloj is None:
+            return None
+        if instante is None:
+            instante = time.perf_counter()
+        return instante - frame.marca_dispositivo - self.desfase_reloj
+
+# =============================================================================
+# Cliente MJPEG asíncrono
+# =============================================================================
+
+class _CuerpoAsincrono:
+    """
+    Cuerpo de la respuesta leído con asyncio. Resuelve la capa chunked
+    acumulando cada fragmento en un buffer, del que se extraen líneas y
+    bloques de tamaño exacto.
+    """
+
+    def __init__(self, lector, fragmentado):
+        self._lector = lector
+        self._fragmentado = fragmentado
+        self._buffer = bytearray()
+
+    async def _rellenar(self):
+        if not self._fragmentado:
+            datos = await self._lector.read(TAM_BUFFER)
+            if not datos:
+                raise ConnectionError("La cámara cerró la conexión.")
+            self._buffer += datos
+            return
+        # El CRLF que cierra cada fragmento llega como una línea vacía
+        linea = b""
+        while not linea:
+            linea = await self._lector.readline()
+            if not linea:
+                raise ConnectionError("La cámara cerró la conexión.")
+            linea = linea.strip()
+        tamano = int(linea.split(b";", 1)[0], 16)
+        if tamano == 0:
+            raise ConnectionError("El stream terminó.")
+        self._buffer += await self._lector.readexactly(tamano)
+
+    async def leer_linea(self):
+        inicio = 0
+        while True:
+            pos = self._buffer.find(b"\n", inicio)
+            if pos >= 0:
+                linea = bytes(self._buffer[:pos + 1])
+                del self._buffer[:pos + 1]
+                return linea
+            if len(self._buffer) >= LIMITE_LINEA:
+                raise ValueError("Línea de cabecera demasiado larga en el stream.")
+            inicio = len(self._buffer)
+            await self._rellenar()
+
+    async def leer(self, n):
+        while len(self._buffer) < n:
+            await self._rellenar()
+        datos = self._buffer[:n]
+        del self._buffer[:n]
+        return datos
+
+class ClienteMJPEGAsincrono:
+    """
+    Versión asíncrona de ClienteMJPEG para usar varias cámaras en un mismo
+    bucle de eventos. `leer_parte()` es una corrutina que devuelve un
+    FrameJPEG; `latencia()` funciona igual que en el cliente síncrono.
+    """
+
+    def __init__(self, url, timeout=5.0):
+        self.url = url
+        self.timeout = timeout
+        self.boundary = None
+        self.partes_recibidas = 0
+        self.bytes_recibidos = 0
+        self.desfase_reloj = None
+        self._escritor = None
+        self._cuerpo = None
+
+    latencia = ClienteMJPEG.latencia
+
+    def isOpened(self):
+        return self._escritor is not None
+
+    async def conectar(self):
+        partes = urlsplit(self.url)
+        host = partes.hostname
+        puerto = partes.port or 80
+        ruta = partes.path or "/"
+        if partes.query:
+            ruta += "?" + partes.query
+
+        lector, self._escritor = await asyncio.wait_for(asyncio.open_connection(host, puerto), self.timeout)
+        peticion = f"GET {ruta} HTTP/1.1\r\nHost: {host}:{puerto}\r\nConnection: keep-alive\r\n\r\n"
+        self._escritor.write(peticion.encode("ascii"))
+        await self._escritor.drain()
+
+        estado = (await asyncio.wait_for(lector.readline(), self.timeout)).decode("latin-1").split()
+        if len(estado) < 2 or estado[1] != "200":
+            await self.cerrar()
+            raise ConnectionError(f"Respuesta inesperada del stream: {' '.join(estado)}")
+        cabeceras = await self._leer_cabeceras(lector.readline)
+        tipo = cabeceras.get("content-type", "")
+        if "boundary=" not in tipo:
+            await self.cerrar()
+            raise ConnectionError(f"El stream no es multipart: {tipo}")
+        self.boundary = b"--" + tipo.split("boundary=", 1)[1].strip().strip('"').encode("latin-1")
+        fragmentado = cabeceras.get("transfer-encoding", "").lower() == "chunked"
+        self._cuerpo = _CuerpoAsincrono(lector, fragmentado)
+        return self
+
+    async def cerrar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+            try:
+                await self._escritor.wait_closed()
+            except OSError:
+                pass
+        self._escritor = None
+        self._cuerpo = None
+
+    @staticmethod
+    async def _leer_cabeceras(leer_linea):
+        cabeceras = {}
+        while True:
+            linea = (await leer_linea()).strip()
+            if not linea:
+                return cabeceras
+            nombre, _, valor = linea.decode("latin-1").partition(":")
+            cabeceras[nombre.strip().lower()] = valor.strip()
+
+    async def leer_parte(self):
+        """Lee la siguiente parte completa del stream. Sin conexión lanza ConnectionError."""
+        cuerpo = self._cuerpo
+        if cuerpo is None:
+            raise ConnectionError("El cliente MJPEG no está conectado.")
+
+        while (await cuerpo.leer_linea()).strip() != self.boundary:
+            pass
+        cabeceras = await self._leer_cabeceras(cuerpo.leer_linea)
+        if "content-length" not in cabeceras:
+            raise ValueError("La parte del stream no incluye Content-Length.")
+        longitud = int(cabeceras["content-length"])
+        datos = await cuerpo.leer(longitud)
+        marca_recepcion = time.perf_counter()
+
+        marca_dispositivo = None
+        if "x-timestamp" in cabeceras:
+            marca_dispositivo = float(cabeceras["x-timestamp"])
+            desfase = marca_recepcion - marca_dispositivo
+            if self.desfase_reloj is None or desfase < self.desfase_reloj:
+                self.desfase_reloj = desfase
+
+        self.partes_recibidas += 1
+        self.bytes_recibidos += longitud
+        return FrameJPEG(datos, marca_dispositivo, marca_recepcion)
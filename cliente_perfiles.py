@@ -0,0 +1,101 @@
+"""
+===============================================================================
+Proyecto: Espectrofotómetro Digital En Tiempo Real Para Uso Didáctico
+Descripción:
+Cliente del endpoint /profile del firmware. En este modo la ESP32-CAM calcula
+en el propio dispositivo el perfil promedio por columna (R, G, B) dentro de
+un ROI y lo transmite como arreglos binarios compactos, con el mismo formato
+multipart y la misma cabecera X-Timestamp que /stream. El PC recibe los
+perfiles directamente, sin decodificar ninguna imagen.
+
+Formato de cada parte (little endian):
+- Cabecera de 18 bytes: magic "SPEC", versión (u8), canales (u8), x0, y0,
+  ancho, alto, ancho del frame y alto del frame (u16 cada uno).
+- Planos R, G y B de `ancho` valores u16 en punto fijo 8.8 (media * 256).
+
+Librerías:
+- NumPy: Conversión de los arreglos binarios.
+- cliente_mjpeg (módulo local): Lectura del stream multipart.
+===============================================================================
+"""
+
+import struct
+from urllib.parse import urlsplit, urlunsplit, urlencode
+
+import numpy as np
+
+from cliente_mjpeg import ClienteMJPEG
+from perfiles import PESOS_GRIS
+
+MAGIC_PERFIL = b"SPEC"
+VERSION_PERFIL = 1
+CABECERA_PERFIL = struct.Struct("<4sBBHHHHHH")
+
+# =============================================================================
+# Codificación del formato binario
+# =============================================================================
+
+class FramePerfil:
+    """
+    Perfil recibido del dispositivo. `perfiles` es un arreglo float32 (4, ancho)
+    con las filas R, G, B y gris, igual que perfiles.calcular_perfiles().
+    """
+
+    __slots__ = ("perfiles", "roi", "alto", "tamano_frame", "marca_dispositivo", "marca_recepcion")
+
+    def __init__(self, perfiles, roi, alto, tamano_frame, marca_dispositivo=None, marca_recepcion=None):
+        self.perfiles = perfiles
+        self.roi = roi
+        self.alto = alto
+        self.tamano_frame = tamano_frame
+        self.marca_dispositivo = marca_dispositivo
+        self.marca_recepcion = marca_recepcion
+
+def codificar_perfil(rgb, x0=0, y0=0, alto=1, tamano_frame=None):
+    """
+    Codifica perfiles R, G, B (arreglo (3, ancho) de medias en 0-255) en el
+    formato binario de /profile.
+    """
+    rgb = np.asarray(rgb, dtype=np.float32)
+    ancho = rgb.shape[1]
+    if tamano_frame is None:
+        tamano_frame = (x0 + ancho, y0 + alto)
+    cabecera = CABECERA_PERFIL.pack(MAGIC_PERFIL, VERSION_PERFIL, 3, x0, y0, ancho, alto, *tamano_frame)
+    planos = np.clip(np.round(rgb * 256), 0, 65535).astype("<u2")
+    return cabecera + planos.tobytes()
+
+def decodificar_perfil(datos):
+    """Convierte una parte binaria de /profile en (perfiles, roi, alto, tamano_frame)."""
+    magic, version, canales, x0, y0, ancho, alto, ancho_frame, alto_frame = CABECERA_PERFIL.unpack_from(datos)
+    if magic != MAGIC_PERFIL or version != VERSION_PERFIL or canales != 3:
+        raise ValueError("Parte de perfil con formato desconocido.")
+    planos = np.frombuffer(datos, dtype="<u2", count=3 * ancho, offset=CABECERA_PERFIL.size)
+
+    perfiles = np.empty((4, ancho), dtype=np.float32)
+    np.multiply(planos.reshape(3, ancho), 1.0 / 256, out=perfiles[:3], casting="unsafe")
+    np.dot(PESOS_GRIS, perfiles[:3], out=perfiles[3])
+    roi = (x0, y0, x0 + ancho, y0 + alto)
+    return perfiles, roi, alto, (ancho_frame, alto_frame)
+
+# =============================================================================
+# Cliente
+# =============================================================================
+
+def url_perfiles(url_stream, recorte=None):
+    """URL de /profile en el mismo servidor que `url_stream`, con el ROI opcional."""
+    partes = urlsplit(url_stream)
+    consulta = ""
+    if recorte:
+        x0, y0, x1, y1 = recorte
+        consulta = urlencode({"x0": x0, "y0": y0, "x1": x1, "y1": y1})
+    return urlunsplit((partes.scheme, partes.netloc, "/profile", consulta, ""))
+
+class ClientePerfiles(ClienteMJPEG):
+    """
+    Variante de ClienteMJPEG para /profile: cada parte se convierte en un
+    FramePerfil en lugar de un FrameJPEG.
+    """
+
+    def _crear_frame(self, datos, marca_dispositivo, marca_recepcion):
+        perfiles, roi, alto, tamano_frame = decodificar_perfil(datos)
+        return FramePerfil(perfiles, roi, alto, tamano_frame, marca_dispositivo, marca_recepcion)
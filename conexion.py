@@ -0,0 +1,241 @@
+"""
+===============================================================================
+Proyecto: Espectrofotómetro Digital En Tiempo Real Para Uso Didáctico
+Descripción:
+Gestión de la conexión con la fuente de video en segundo plano. El motor de
+reconexión abre la fuente, la lee y, si la conexión falla o deja de llegar
+frames (estancamiento), la cierra y vuelve a intentarlo con una espera que
+crece exponencialmente hasta un máximo. Todo ocurre fuera del hilo de
+Tkinter: la interfaz solo consulta el estado, el último error y el tiempo
+hasta el primer frame de cada conexión.
+
+El buffer del último frame y los observadores se conservan entre
+reconexiones, así que las vistas de análisis y los grabadores siguen
+funcionando sin reiniciarse.
+
+Librerías:
+- threading: Hilos de lectura y de vigilancia.
+===============================================================================
+"""
+
+import os
+import re
+import threading
+import time
+
+from captura import MotorCaptura
+
+PUERTO_STREAM = 81
+RUTA_STREAM = "/stream"
+
+# Sin frames durante este tiempo (s) la conexión se considera estancada
+LIMITE_ESTANCAMIENTO = 3.0
+ESPERA_INICIAL = 0.5
+ESPERA_MAXIMA = 10.0
+FACTOR_ESPERA = 2.0
+
+ESTADO_DETENIDO = "Detenido"
+ESTADO_CONECTANDO = "Conectando"
+ESTADO_ESPERANDO = "Esperando frames"
+ESTADO_CONECTADO = "Conectado"
+ESTADO_ESTANCADO = "Sin frames"
+ESTADO_REINTENTANDO = "Reintentando"
+
+_DIRECCION = re.compile(r"^(\d{1,3}(\.\d{1,3}){3}|[\w-]+\.local)(:\d+)?$")
+
+# =============================================================================
+# Dirección de la cámara
+# =============================================================================
+
+def url_desde_direccion(texto, puerto=PUERTO_STREAM):
+    """
+    Completa una dirección escrita en la interfaz: "192.168.1.20" o
+    "esp32cam.local:81" se convierten en la URL del stream. Las URL completas
+    y las rutas de fuentes offline se devuelven sin cambios.
+    """
+    texto = texto.strip()
+    if os.path.exists(texto) or not _DIRECCION.match(texto):
+        return texto
+    if ":" not in texto:
+        texto = f"{texto}:{puerto}"
+    return f"http://{texto}{RUTA_STREAM}"
+
+# =============================================================================
+# Motor de captura con reconexión
+# =============================================================================
+
+class MotorReconexion(MotorCaptura):
+    """
+    MotorCaptura que administra su propia fuente. `abrir` es una función sin
+    argumentos que devuelve la fuente ya conectada (o lanza OSError /
+    ValueError); se llama desde el hilo de captura en cada intento.
+
+    - `limite_estancamiento`: segundos sin frames tras los que se cierra la
+      fuente y se reconecta. None desactiva la vigilancia, para fuentes que
+      marcan su propio ritmo (las grabaciones pueden tener pausas largas).
+    - `espera_inicial`, `factor_espera`, `espera_maxima`: espera entre
+      intentos fallidos consecutivos (backoff exponencial).
+
+    `estado`, `ultimo_error`, `tiempo_primer_frame` y `proximo_intento` pueden
+    consultarse desde la interfaz en cualquier momento.
+    """
+
+    def __init__(self, abrir, capacidad=2, instrumentacion=None, limite_estancamiento=LIMITE_ESTANCAMIENTO,
+                 espera_inicial=ESPERA_INICIAL, espera_maxima=ESPERA_MAXIMA, factor_espera=FACTOR_ESPERA):
+        super().__init__(None, capacidad, instrumentacion=instrumentacion)
+        self.abrir = abrir
+        self.limite_estancamiento = limite_estancamiento
+        self.espera_inicial = espera_inicial
+        self.espera_maxima = espera_maxima
+        self.factor_espera = factor_espera
+        self.estado = ESTADO_DETENIDO
+        self.ultimo_error = None
+        self.tiempo_primer_frame = None
+        self.proximo_intento = None
+        self.conexiones = 0
+        self.reconexiones = 0
+        self.estancamientos = 0
+        self._hubo_sesion = False
+        self._fallos_seguidos = 0
+        self._inicio_intento = None
+        self._ultimo_frame = None
+        self._motivo_cierre = None
+        self._lock_fuente = threading.Lock()
+        self._vigilante = None
+
+    def iniciar(self):
+        if self.activo:
+            return
+        super().iniciar()
+        if self.limite_estancamiento is None:
+            return
+        self._vigilante = threading.Thread(target=self._bucle_vigilancia, name="VigilanteConexion", daemon=True)
+        self._vigilante.start()
+
+    def detener(self, timeout=1.0):
+        self._detener.set()
+        self._cerrar_fuente()
+        super().detener(timeout)
+        if self._vigilante is not None:
+            self._vigilante.join(timeout)
+            self._vigilante = None
+        self.estado = ESTADO_DETENIDO
+
+    def latencia(self, frame):
+        """Latencia del frame según la fuente actual, o None si no se puede medir."""
+        fuente = self.fuente
+        if fuente is None or not hasattr(fuente, "latencia"):
+            return None
+        return fuente.latencia(frame)
+
+    def segundos_sin_frames(self):
+        referencia = self._ultimo_frame or self._inicio_intento
+        return None if referencia is None else time.perf_counter() - referencia
+
+    def texto_estado(self):
+        """Descripción breve del estado para mostrar en la interfaz."""
+        if self.estado == ESTADO_CONECTADO:
+            texto = ESTADO_CONECTADO
+            if self.tiempo_primer_frame is not None:
+                texto += f" (primer frame en {self.tiempo_primer_frame:.2f} s)"
+            if self.reconexiones:
+                texto += f", {self.reconexiones} reconexiones"
+            return texto
+        if self.estado == ESTADO_REINTENTANDO and self.proximo_intento is not None:
+            restante = max(0.0, self.proximo_intento - time.perf_counter())
+            return f"{ESTADO_REINTENTANDO} en {restante:.1f} s: {self.ultimo_error}"
+        if self.estado == ESTADO_ESTANCADO:
+            return f"{ESTADO_ESTANCADO} desde hace {self.segundos_sin_frames() or 0:.1f} s"
+        return self.estado
+
+    # -- Hilo de captura ---------------------------------------------------
+
+    def _bucle_captura(self):
+        while not self._detener.is_set():
+            self._sesion()
+            if self._detener.is_set():
+                break
+            espera = min(self.espera_maxima, self.espera_inicial * self.factor_espera ** (self._fallos_seguidos - 1))
+            self.estado = ESTADO_REINTENTANDO
+            self.proximo_intento = time.perf_counter() + espera
+            self._detener.wait(espera)
+
+    def _sesion(self):
+        """Abre la fuente y la lee hasta que falle, se estanque o se detenga el motor."""
+        self.estado = ESTADO_CONECTANDO
+        self._inicio_intento = time.perf_counter()
+        self._ultimo_frame = None
+        self._motivo_cierre = None
+        try:
+            fuente = self.abrir()
+        except (OSError, ValueError) as e:
+            self._registrar_fallo(e)
+            return
+        with self._lock_fuente:
+            self.fuente = fuente
+        if self._detener.is_set():
+            self._cerrar_fuente()
+            return
+        self.conexiones += 1
+        self.estado = ESTADO_ESPERANDO
+
+        while not self._detener.is_set():
+            inicio = time.perf_counter()
+            error = None
+            try:
+                ret, frame = fuente.read()
+            except Exception as e:
+                ret, frame, error = False, None, e
+            if not ret or frame is None:
+                if self._detener.is_set():
+                    break
+                self.errores_lectura += 1
+                error = self._motivo_cierre or error or getattr(fuente, "ultimo_error", None)
+                self._registrar_fallo(error or ConnectionError("La fuente dejó de entregar frames."))
+                break
+            if self._ultimo_frame is None:
+                self._primer_frame()
+            self._ultimo_frame = time.perf_counter()
+            self._publicar(frame, inicio)
+        self._cerrar_fuente()
+
+    def _primer_frame(self):
+        # Solo cuenta como reconexión si antes hubo una sesión que entregó frames
+        if self._hubo_sesion:
+            self.reconexiones += 1
+        self._hubo_sesion = True
+        self.tiempo_primer_frame = time.perf_counter() - self._inicio_intento
+        self._fallos_seguidos = 0
+        self.ultimo_error = None
+        self.estado = ESTADO_CONECTADO
+        if self.instrumentacion is not None:
+            self.instrumentacion.registrar("primer_frame", self.tiempo_primer_frame)
+        print(f"Conexión establecida: primer frame en {self.tiempo_primer_frame:.2f} s.")
+
+    def _registrar_fallo(self, error):
+        self._fallos_seguidos += 1
+        self.ultimo_error = str(error) or type(error).__name__
+        print(f"Conexión perdida o fallida ({self._fallos_seguidos} seguidas): {self.ultimo_error}")
+
+    def _cerrar_fuente(self):
+        with self._lock_fuente:
+            fuente, self.fuente = self.fuente, None
+        if fuente is not None:
+            fuente.release()
+
+    # -- Hilo de vigilancia ------------------------------------------------
+
+    def _bucle_vigilancia(self):
+        periodo = max(0.05, self.limite_estancamiento / 4)
+        while not self._detener.wait(periodo):
+            if self.estado not in (ESTADO_ESPERANDO, ESTADO_CONECTADO):
+                continue
+            sin_frames = self.segundos_sin_frames()
+            if sin_frames is not None and sin_frames > self.limite_estancamiento:
+                self.estancamientos += 1
+                self.estado = ESTADO_ESTANCADO
+                self._motivo_cierre = TimeoutError(f"Sin frames durante {sin_frames:.1f} s")
+                if self.instrumentacion is not None:
+                    self.instrumentacion.contadores["estancamientos"] = self.estancamientos
+                # Cerrar la fuente desbloquea la lectura en curso del hilo de captura
+                self._cerrar_fuente()
@@ -0,0 +1,122 @@
+"""
+===============================================================================
+Proyecto: Espectrofotómetro Digital En Tiempo Real Para Uso Didáctico
+Descripción:
+Control de la ESP32-CAM a través del servidor web del firmware (puerto 80):
+consulta de /status, cambio de framesize con /control y configuración de la
+ventana del sensor con /resolution (`win_handler` en app_httpd.cpp). Permite
+recortar el ROI directamente en el sensor para que la cámara solo transmita
+la franja espectral, reduciendo el ancho de banda Wi-Fi y el costo de
+decodificación.
+
+Para el OV2640 `set_res_raw` interpreta los parámetros como:
+sx = modo del sensor (0 UXGA, 1 SVGA, 2 CIF), offx/offy = origen de la
+ventana, tx/ty = tamaño de la ventana y ox/oy = tamaño de salida, todos en
+múltiplos de 4 píxeles.
+
+Librerías:
+- urllib: Peticiones HTTP a la cámara.
+===============================================================================
+"""
+
+import json
+from urllib.parse import urlsplit, urlencode
+from urllib.request import urlopen
+
+# Modos del OV2640: (ancho, alto, modo) de mayor a menor resolución
+MODOS_OV2640 = ((1600, 1200, 0), (800, 600, 1), (400, 296, 2))
+ALINEACION_VENTANA = 4
+
+# =============================================================================
+# Peticiones HTTP
+# =============================================================================
+
+def url_control(url_stream):
+    """Deriva la URL del servidor de control (puerto 80) a partir de la del stream."""
+    partes = urlsplit(url_stream)
+    return f"{partes.scheme or 'http'}://{partes.hostname}"
+
+def _peticion(url, timeout):
+    with urlopen(url, timeout=timeout) as respuesta:
+        return respuesta.read()
+
+def consultar_estado(url_base, timeout=2):
+    """Devuelve el JSON de /status como diccionario."""
+    return json.loads(_peticion(f"{url_base}/status", timeout))
+
+def fijar_framesize(url_base, framesize, timeout=2):
+    """Restaura un framesize; el firmware reconfigura la ventana completa del sensor."""
+    _peticion(f"{url_base}/control?{urlencode({'var': 'framesize', 'val': int(framesize)})}", timeout)
+
+def fijar_ventana(url_base, parametros, timeout=2):
+    """Envía los parámetros de ventana a /resolution."""
+    _peticion(f"{url_base}/resolution?{urlencode(parametros)}", timeout)
+
+# =============================================================================
+# Cálculo de la ventana del sensor
+# =============================================================================
+
+def _alinear_abajo(valor):
+    return (valor // ALINEACION_VENTANA) * ALINEACION_VENTANA
+
+def _alinear_arriba(valor):
+    return -(-valor // ALINEACION_VENTANA) * ALINEACION_VENTANA
+
+def modo_sensor(resolucion):
+    """Modo del OV2640 (el más pequeño que contiene al frame) de un frame de tamaño `resolucion`."""
+    for ancho_modo, alto_modo, modo in reversed(MODOS_OV2640):
+        if resolucion[0] <= ancho_modo:
+            return ancho_modo, alto_modo, modo
+    return MODOS_OV2640[0]
+
+def calcular_ventana_sensor(recorte, resolucion):
+    """
+    Convierte un recorte (x0, y0, x1, y1) expresado en píxeles de un frame
+    completo de tamaño `resolucion` en parámetros para /resolution.
+
+    Devuelve (parametros, tamano_salida, recorte_residual): la ventana del
+    sensor se alinea a múltiplos de 4, así que `recorte_residual` es el
+    recorte por software que queda por aplicar sobre los frames de tamaño
+    `tamano_salida` que enviará la cámara.
+    """
+    ancho, alto = resolucion
+    ancho_modo, alto_modo, modo = modo_sensor(resolucion)
+    escala_x = ancho_modo / ancho
+    escala_y = alto_modo / alto
+
+    x0, y0, x1, y1 = recorte
+    x0, x1 = max(0, min(x0, x1)), min(ancho, max(x0, x1))
+    y0, y1 = max(0, min(y0, y1)), min(alto, max(y0, y1))
+    if x1 - x0 < 1 or y1 - y0 < 1:
+        raise ValueError("El recorte está vacío.")
+
+    # Ventana en coordenadas del modo del sensor, alineada hacia afuera
+    off_x = _alinear_abajo(int(x0 * escala_x))
+    off_y = _alinear_abajo(int(y0 * escala_y))
+    fin_x = min(ancho_modo, _alinear_arriba(int(round(x1 * escala_x))))
+    fin_y = min(alto_modo, _alinear_arriba(int(round(y1 * escala_y))))
+    tam_x = max(ALINEACION_VENTANA, fin_x - off_x)
+    tam_y = max(ALINEACION_VENTANA, fin_y - off_y)
+
+    # Salida con la misma densidad de píxeles que el frame original
+    salida_x = max(ALINEACION_VENTANA, _alinear_arriba(int(round(tam_x / escala_x))))
+    salida_y = max(ALINEACION_VENTANA, _alinear_arriba(int(round(tam_y / escala_y))))
+    salida_x = min(salida_x, tam_x)
+    salida_y = min(salida_y, tam_y)
+
+    parametros = {
+        "sx": modo, "sy": 0, "ex": 0, "ey": 0,
+        "offx": off_x, "offy": off_y,
+        "tx": tam_x, "ty": tam_y,
+        "ox": salida_x, "oy": salida_y,
+        "scale": 0, "binning": 0,
+    }
+
+    # Lo que sobra de la alineación se recorta por software
+    factor_x = salida_x / tam_x
+    factor_y = salida_y / tam_y
+    rx0 = int(round((x0 * escala_x - off_x) * factor_x))
+    ry0 = int(round((y0 * escala_y - off_y) * factor_y))
+    rx1 = min(salida_x, rx0 + max(1, int(round((x1 - x0) * escala_x * factor_x))))
+    ry1 = min(salida_y, ry0 + max(1, int(round((y1 - y0) * escala_y * factor_y))))
+    return parametros, (salida_x, salida_y), (rx0, ry0, rx1, ry1)
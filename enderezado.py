@@ -0,0 +1,157 @@
+"""
+===============================================================================
+Proyecto: Espectrofotómetro Digital En Tiempo Real Para Uso Didáctico
+Descripción:
+Corrección de inclinación y curvatura de la franja del espectro. Con la
+montura impresa la franja de difracción suele quedar unos grados fuera de la
+horizontal, y el promedio por columna mezcla longitudes de onda vecinas. La
+calibración localiza el centro de la franja en cada columna y ajusta un
+polinomio y(x) (inclinación y curvatura) en coordenadas del frame completo.
+
+A partir de ese polinomio se construyen, una sola vez por ROI, los mapas de
+cv2.remap que muestrean cada columna de salida a lo largo de la normal a la
+franja: la franja queda horizontal y centrada, y la columna de salida x
+conserva la posición X del frame completo, así que la calibración en nm sigue
+expresada en las mismas coordenadas. Los mapas se guardan en caché (en
+formato de punto fijo) hasta que cambien el ROI, el tamaño del frame o la
+calibración; por frame solo se ejecuta el remap.
+
+Librerías:
+- NumPy: Localización de la franja y ajuste polinomial.
+- OpenCV (cv2): Conversión de mapas y remuestreo (se importa al usarse).
+===============================================================================
+"""
+
+import numpy as np
+
+# Una columna participa en el ajuste si su pico supera esta fracción del rango de la imagen
+UMBRAL_RELATIVO = 0.2
+# Mínimo de columnas con señal para estimar la geometría
+COLUMNAS_MINIMAS = 10
+GRADO_CURVATURA = 2
+
+# =============================================================================
+# Estimación de la geometría de la franja
+# =============================================================================
+
+def centros_franja(imagen, umbral_relativo=UMBRAL_RELATIVO):
+    """
+    Fila central (sub-píxel) de la franja en cada columna de `imagen` y el
+    peso de cada columna. Se usa el centroide de la parte de la columna por
+    encima de la mitad de su máximo, que no se desplaza con el fondo. Devuelve
+    (columnas, centros, pesos) solo para las columnas con señal.
+    """
+    gris = imagen.mean(axis=2, dtype=np.float32) if imagen.ndim == 3 else imagen.astype(np.float32)
+    fondo = np.median(gris)
+    maximos = gris.max(axis=0)
+    senal = maximos - fondo
+    rango = senal.max()
+    if rango <= 0:
+        return np.empty(0), np.empty(0), np.empty(0)
+
+    validas = np.flatnonzero(senal > umbral_relativo * rango)
+    columnas = gris[:, validas]
+    recortadas = np.clip(columnas - (fondo + maximos[validas]) / 2, 0, None)
+    masa = recortadas.sum(axis=0)
+    filas = np.arange(gris.shape[0], dtype=np.float32)
+    centros = (filas @ recortadas) / np.maximum(masa, 1e-6)
+    return validas.astype(np.float64), centros.astype(np.float64), senal[validas].astype(np.float64)
+
+def estimar_geometria(imagen, origen=(0, 0), grado=GRADO_CURVATURA, umbral_relativo=UMBRAL_RELATIVO):
+    """
+    Ajusta el centro de la franja y(x) de `imagen` (un ROI que empieza en
+    `origen` dentro del frame completo) y devuelve los coeficientes del
+    polinomio en coordenadas del frame completo.
+    """
+    columnas, centros, pesos = centros_franja(imagen, umbral_relativo)
+    if columnas.size < max(COLUMNAS_MINIMAS, grado + 2):
+        raise ValueError("No se encontró la franja del espectro en el ROI.")
+    x0, y0 = origen
+    return np.polyfit(columnas + x0, centros + y0, grado, w=np.sqrt(pesos))
+
+def construir_mapas(coeficientes, origen, ancho, alto):
+    """
+    Mapas (mapa_x, mapa_y) float32 de tamaño (alto, ancho) en coordenadas del
+    ROI: la columna x de salida recorre la normal a la franja en x, con la
+    fila central sobre la franja.
+    """
+    x0, y0 = origen
+    x = np.arange(ancho, dtype=np.float64)
+    centro = np.polyval(coeficientes, x + x0) - y0
+    pendiente = np.polyval(np.polyder(coeficientes), x + x0)
+    norma = np.hypot(1.0, pendiente)
+    desplazamiento = np.arange(alto, dtype=np.float64)[:, None] - (alto - 1) / 2
+    mapa_x = x + desplazamiento * (-pendiente / norma)
+    mapa_y = centro + desplazamiento * (1.0 / norma)
+    return mapa_x.astype(np.float32), mapa_y.astype(np.float32)
+
+# =============================================================================
+# Corrección con mapas en caché
+# =============================================================================
+
+class EnderezadoEspectro:
+    """
+    Calibración geométrica de la franja. `calibrar()` estima el polinomio a
+    partir de un ROI sin corregir; `aplicar()` devuelve cada frame remuestreado
+    a lo largo del eje de dispersión, reutilizando los mapas mientras no
+    cambien el ROI, el tamaño del frame ni la calibración.
+
+    `aplicar()` se puede llamar desde otros hilos (por ejemplo, el del
+    grabador de perfiles): la caché se reemplaza de una sola vez y cada
+    llamada trabaja con los coeficientes que leyó al empezar.
+    """
+
+    def __init__(self):
+        self.coeficientes = None
+        self._cache = None  # (clave, coeficientes, mapas)
+
+    @property
+    def calibrado(self):
+        return self.coeficientes is not None
+
+    def calibrar(self, imagen, origen=(0, 0), grado=GRADO_CURVATURA):
+        self.coeficientes = estimar_geometria(imagen, origen, grado)
+        return self.coeficientes
+
+    def limpiar(self):
+        self.coeficientes = None
+        self._cache = None
+
+    def describir(self, x_inicio, x_fin):
+        """Inclinación (grados) en el centro y flecha (px) de la franja entre x_inicio y x_fin."""
+        x = np.array([x_inicio, (x_inicio + x_fin) / 2, x_fin], dtype=np.float64)
+        y = np.polyval(self.coeficientes, x)
+        angulo = np.degrees(np.arctan(np.polyval(np.polyder(self.coeficientes), x[1])))
+        flecha = y[1] - (y[0] + y[2]) / 2
+        return float(angulo), float(flecha)
+
+    def mapas(self, origen, ancho, alto):
+        """
+        Mapas de punto fijo para cv2.remap; se construyen una vez por ROI y
+        calibración. Devuelve None si no hay calibración.
+        """
+        coeficientes = self.coeficientes
+        if coeficientes is None:
+            return None
+        clave = (tuple(origen), ancho, alto)
+        cache = self._cache
+        if cache is not None and cache[0] == clave and cache[1] is coeficientes:
+            return cache[2]
+        import cv2
+
+        mapa_x, mapa_y = construir_mapas(coeficientes, origen, ancho, alto)
+        mapas = cv2.convertMaps(mapa_x, mapa_y, cv2.CV_16SC2)
+        self._cache = (clave, coeficientes, mapas)
+        return mapas
+
+    def aplicar(self, imagen, origen=(0, 0)):
+        """
+        Frame `imagen` (el ROI que empieza en `origen`) con la franja
+        enderezada. Sin calibración devuelve la misma `imagen`.
+        """
+        mapas = self.mapas(origen, imagen.shape[1], imagen.shape[0])
+        if mapas is None:
+            return imagen
+        import cv2
+
+        return cv2.remap(imagen, mapas[0], mapas[1], cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
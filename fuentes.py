@@ -0,0 +1,277 @@
+"""
+===============================================================================
+Proyecto: Espectrofotómetro Digital En Tiempo Real Para Uso Didáctico
+Descripción:
+Fuentes de frames intercambiables con la cámara. Todas tienen la misma
+interfaz que cliente_mjpeg.ClienteMJPEG (isOpened/read/release, compatible con
+cv2.VideoCapture) y entregan cliente_mjpeg.FrameJPEG, así que el motor de
+captura, el recorte, el análisis y las gráficas funcionan sin cambios:
+
+- FuenteGrabacion: una sesión grabada con grabacion.GrabadorMJPEG.
+- FuenteCarpeta: una carpeta o patrón glob de imágenes (p. ej. Imagenes_Ejemplo).
+- FuenteSintetica: el generador de espectros de servidor_simulado.
+
+Cada fuente puede reproducirse a tiempo real (según las marcas de tiempo
+grabadas), a una frecuencia fija o tan rápido como sea posible, lo que permite
+medir los límites de rendimiento sin una ESP32-CAM.
+
+Uso:
+    python fuentes.py sintetico --ritmo maximo --segundos 10
+    python fuentes.py Grabaciones/Sesion_2024-11-21_10-00-00.mjpeg --ritmo tiempo_real
+
+Librerías:
+- OpenCV (cv2): Codificación JPEG de imágenes que no lo son (importación
+  diferida).
+- NumPy: Marcas de tiempo de las grabaciones.
+===============================================================================
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from cliente_mjpeg import ClienteMJPEG, FrameJPEG
+from grabacion import leer_indice_mjpeg
+from procesamiento_lote import listar_imagenes
+
+RITMO_TIEMPO_REAL = "tiempo_real"
+RITMO_FIJO = "fijo"
+RITMO_MAXIMO = "maximo"
+
+RITMOS = {
+    RITMO_TIEMPO_REAL: "Tiempo real",
+    RITMO_FIJO: "Frecuencia fija",
+    RITMO_MAXIMO: "Lo más rápido posible",
+}
+
+FUENTE_SINTETICA = "sintetico"
+
+# =============================================================================
+# Fuente base
+# =============================================================================
+
+class FuenteOffline:
+    """
+    Reproduce una lista de partes JPEG con marcas de tiempo. Las subclases
+    llenan `_partes` (bytes JPEG) y `_marcas` (segundos desde el inicio, o None
+    si la fuente no tiene tiempos propios).
+
+    - `ritmo`: RITMO_TIEMPO_REAL, RITMO_FIJO o RITMO_MAXIMO. Sin marcas
+      propias, el tiempo real equivale a la frecuencia fija.
+    - `fps`: frecuencia para RITMO_FIJO.
+    - `bucle`: al terminar, vuelve a empezar; si es False, read() devuelve
+      (False, None) al final.
+    """
+
+    def __init__(self, ritmo=RITMO_TIEMPO_REAL, fps=30.0, bucle=True):
+        if ritmo not in RITMOS:
+            raise ValueError(f"Ritmo de reproducción desconocido: {ritmo}")
+        self.ritmo = ritmo
+        self.fps = fps
+        self.bucle = bucle
+        self.partes_entregadas = 0
+        self._partes = []
+        self._marcas = None
+        self._abierta = False
+        self._indice = 0
+        self._inicio = None
+        self._desfase = 0.0
+
+    def conectar(self):
+        if len(self._partes) == 0:
+            raise OSError("La fuente no contiene frames.")
+        self._abierta = True
+        self._indice = 0
+        self._inicio = None
+        return self
+
+    def isOpened(self):
+        return self._abierta
+
+    def release(self):
+        self._abierta = False
+
+    def read(self):
+        if not self._abierta:
+            return False, None
+        if self._indice >= len(self._partes):
+            if not self.bucle:
+                return False, None
+            # Cada vuelta continúa el tiempo de la anterior
+            self._desfase += self._duracion()
+            self._indice = 0
+        marca = self._marca(self._indice)
+        self._esperar(marca)
+        frame = FrameJPEG(self._leer_parte(self._indice), marca, time.perf_counter())
+        self._indice += 1
+        self.partes_entregadas += 1
+        return True, frame
+
+    def latencia(self, frame, instante=None):
+        """Tiempo desde que la fuente entregó el frame (no hay retraso de red)."""
+        if instante is None:
+            instante = time.perf_counter()
+        return instante - frame.marca_recepcion
+
+    def _leer_parte(self, indice):
+        return self._partes[indice]
+
+    def _marca(self, indice):
+        if self._marcas is not None and self.ritmo == RITMO_TIEMPO_REAL:
+            return self._desfase + self._marcas[indice]
+        return self._desfase + indice / self.fps
+
+    def _duracion(self):
+        if self._marcas is not None and self.ritmo == RITMO_TIEMPO_REAL:
+            paso = np.median(np.diff(self._marcas)) if len(self._marcas) > 1 else 1.0 / self.fps
+            return self._marcas[-1] + paso
+        return len(self._partes) / self.fps
+
+    def _esperar(self, marca):
+        if self.ritmo == RITMO_MAXIMO:
+            return
+        ahora = time.perf_counter()
+        if self._inicio is None:
+            self._inicio = ahora - marca
+        espera = self._inicio + marca - ahora
+        if espera > 0:
+            time.sleep(espera)
+
+# =============================================================================
+# Fuentes concretas
+# =============================================================================
+
+class FuenteGrabacion(FuenteOffline):
+    """
+    Reproduce `<base>.mjpeg` usando su índice `<base>.mjpeg.idx`. Los bytes de
+    cada frame se leen del archivo bajo demanda, sin cargar la grabación
+    completa en memoria.
+    """
+
+    def __init__(self, ruta_mjpeg, ritmo=RITMO_TIEMPO_REAL, fps=30.0, bucle=True):
+        super().__init__(ritmo, fps, bucle)
+        self.ruta = ruta_mjpeg
+        self.indice = leer_indice_mjpeg(ruta_mjpeg + ".idx")
+        self._partes = self.indice
+        marcas = self.indice["marca_dispositivo"]
+        if np.isnan(marcas).any():
+            marcas = self.indice["marca_recepcion"]
+        if len(marcas) and not np.isnan(marcas).any():
+            self._marcas = marcas - marcas[0]
+        self._archivo = None
+
+    def conectar(self):
+        super().conectar()
+        self._archivo = open(self.ruta, "rb")
+        return self
+
+    def release(self):
+        super().release()
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
+
+    def _leer_parte(self, indice):
+        registro = self.indice[indice]
+        self._archivo.seek(int(registro["desplazamiento"]))
+        return self._archivo.read(int(registro["longitud"]))
+
+class FuenteCarpeta(FuenteOffline):
+    """
+    Reproduce las imágenes de un directorio o patrón glob en orden alfabético.
+    Las imágenes que no son JPEG se codifican una sola vez al abrir la fuente,
+    para que el pipeline reciba lo mismo que envía la cámara.
+    """
+
+    def __init__(self, entrada, ritmo=RITMO_FIJO, fps=10.0, bucle=True, calidad=95):
+        import cv2
+
+        super().__init__(ritmo, fps, bucle)
+        self.rutas = listar_imagenes([entrada])
+        for ruta in self.rutas:
+            if ruta.lower().endswith((".jpg", ".jpeg")):
+                with open(ruta, "rb") as f:
+                    self._partes.append(f.read())
+                continue
+            imagen = cv2.imread(ruta, cv2.IMREAD_COLOR)
+            if imagen is None:
+                print(f"No se pudo leer {ruta}, se omite.")
+                continue
+            ok, datos = cv2.imencode(".jpg", imagen, [cv2.IMWRITE_JPEG_QUALITY, calidad])
+            if ok:
+                self._partes.append(datos.tobytes())
+
+class FuenteSintetica(FuenteOffline):
+    """Emite en bucle los espectros sintéticos de servidor_simulado."""
+
+    def __init__(self, ancho=640, alto=480, ritmo=RITMO_FIJO, fps=30.0, cantidad=30, calidad=80):
+        super().__init__(ritmo, fps, bucle=True)
+        # Importación diferida: servidor_simulado arrastra http.server
+        from servidor_simulado import generar_jpegs_sinteticos
+        self._partes = generar_jpegs_sinteticos(ancho, alto, cantidad, calidad)
+
+def crear_fuente(especificacion, ritmo=RITMO_TIEMPO_REAL, fps=30.0):
+    """
+    Crea la fuente indicada por `especificacion`:
+
+    - "http://..." : la ESP32-CAM (cliente_mjpeg.ClienteMJPEG).
+    - "*.mjpeg"    : una grabación con índice.
+    - "sintetico" o "sintetico:ANCHOxALTO" : el generador sintético.
+    - otra ruta    : una carpeta o patrón glob de imágenes.
+
+    La fuente devuelta ya está conectada.
+    """
+    if especificacion.startswith(("http://", "https://")):
+        return ClienteMJPEG(especificacion).conectar()
+    if especificacion.startswith(FUENTE_SINTETICA):
+        ancho, alto = 640, 480
+        if ":" in especificacion:
+            ancho, alto = (int(valor) for valor in especificacion.split(":", 1)[1].lower().split("x"))
+        return FuenteSintetica(ancho, alto, ritmo, fps).conectar()
+    if especificacion.lower().endswith(".mjpeg"):
+        return FuenteGrabacion(especificacion, ritmo, fps).conectar()
+    if os.path.isdir(especificacion) or any(c in especificacion for c in "*?["):
+        return FuenteCarpeta(especificacion, ritmo, fps).conectar()
+    raise ValueError(f"Fuente no reconocida: {especificacion}")
+
+# =============================================================================
+# Medición de rendimiento sin interfaz
+# =============================================================================
+
+if __name__ == "__main__":
+    from captura import MotorCaptura
+    from perfiles import EtapaAnalisis
+
+    parser = argparse.ArgumentParser(description="Reproduce una fuente a través del pipeline de análisis.")
+    parser.add_argument("fuente", help="URL, grabación .mjpeg, carpeta/glob de imágenes o 'sintetico[:ANCHOxALTO]'.")
+    parser.add_argument("--ritmo", choices=list(RITMOS), default=RITMO_MAXIMO)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--segundos", type=float, default=5.0)
+    parser.add_argument("--recorte", type=int, nargs=4, metavar=("X0", "Y0", "X1", "Y1"))
+    args = parser.parse_args()
+
+    fuente = crear_fuente(args.fuente, args.ritmo, args.fps)
+    motor = MotorCaptura(fuente)
+    etapa = EtapaAnalisis(orden="BGR")
+    motor.iniciar()
+    secuencia = analizados = 0
+    inicio = time.perf_counter()
+    while time.perf_counter() - inicio < args.segundos:
+        capturado = motor.esperar_frame(secuencia, timeout=0.5)
+        if capturado is None:
+            continue
+        secuencia = capturado.secuencia
+        imagen = capturado.imagen
+        if args.recorte:
+            x0, y0, x1, y1 = args.recorte
+            imagen = imagen[y0:y1, x0:x1]
+        etapa.procesar(secuencia, imagen, capturado.marca_tiempo, args.recorte)
+        analizados += 1
+    duracion = time.perf_counter() - inicio
+    motor.detener()
+    fuente.release()
+    print(f"Recibidos: {motor.secuencia} ({motor.secuencia / duracion:.1f} fps), "
+          f"analizados: {analizados} ({analizados / duracion:.1f} fps), "
+          f"descartados: {motor.frames_descartados}")
@@ -0,0 +1,374 @@
+"""
+===============================================================================
+Proyecto: Espectrofotómetro Digital En Tiempo Real Para Uso Didáctico
+Descripción:
+Grabación de sesiones del stream en dos archivos:
+
+- `<base>.mjpeg` + `<base>.mjpeg.idx`: las partes JPEG tal como llegan de la
+  cámara, concatenadas sin decodificar ni recomprimir, y un índice binario con
+  la secuencia, el desplazamiento en bytes, el tamaño y las marcas de tiempo
+  de cada frame.
+- `<base>.espectros`: serie temporal de los perfiles por columna. Tiene una
+  cabecera fija seguida de registros de tamaño constante, de modo que se puede
+  abrir con numpy.memmap sin cargarla completa. El archivo crece por bloques y
+  si el ROI o el enderezado cambian se abre un segmento nuevo
+  (`<base>_002.espectros`, ...). La cabecera indica si los perfiles se
+  calcularon sobre la franja enderezada.
+
+Cada grabador escribe desde su propio hilo, alimentado por una cola acotada.
+El hilo de captura solo encola referencias; si el disco se atrasa y la cola se
+llena, el frame se omite de la grabación (y se cuenta) pero la visualización
+en vivo nunca se detiene.
+
+Librerías:
+- threading, queue: Hilos de escritura y colas acotadas.
+- struct: Cabeceras e índice binarios.
+- NumPy: Registros de la serie espectral y lectura con memmap.
+===============================================================================
+"""
+
+import queue
+import struct
+import threading
+import time
+
+import numpy as np
+
+from perfiles import calcular_perfiles
+
+# Índice de la grabación MJPEG: cabecera y un registro por frame
+MAGIC_INDICE = b"EIDX"
+VERSION_INDICE = 1
+CABECERA_INDICE = struct.Struct("<4sHH")
+DTYPE_INDICE = np.dtype([
+    ("secuencia", "<u8"),
+    ("desplazamiento", "<u8"),
+    ("longitud", "<u4"),
+    ("marca_dispositivo", "<f8"),
+    ("marca_recepcion", "<f8"),
+])
+
+# Serie espectral: cabecera de 64 bytes y registros de tamaño fijo
+MAGIC_SERIE = b"ESPS"
+VERSION_SERIE = 1
+CABECERA_SERIE = struct.Struct("<4sHHIiiiiQI")
+TAMANO_CABECERA_SERIE = 64
+
+# Banderas de la cabecera de la serie (los archivos anteriores tienen 0 en ese campo)
+BANDERA_SERIE_ENDEREZADO = 1
+REGISTROS_POR_BLOQUE = 256
+
+# =============================================================================
+# Escritor en segundo plano
+# =============================================================================
+
+class EscritorEnSegundoPlano:
+    """
+    Hilo de escritura alimentado por una cola acotada. `agregar()` nunca
+    bloquea: si la cola está llena devuelve False y cuenta el elemento como
+    descartado. Las subclases implementan `_escribir_lote()`, que devuelve
+    cuántos elementos del lote se escribieron realmente, y `_cerrar()`.
+    """
+
+    def __init__(self, capacidad=256, tamano_lote=32):
+        self._cola = queue.Queue(maxsize=capacidad)
+        self.tamano_lote = tamano_lote
+        self.escritos = 0
+        self.descartados = 0
+        self.error = None
+        self._detener = threading.Event()
+        self._hilo = None
+
+    @property
+    def activo(self):
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def iniciar(self):
+        if self.activo:
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._bucle, name=type(self).__name__, daemon=True)
+        self._hilo.start()
+
+    def detener(self, timeout=5.0):
+        """Termina de escribir lo pendiente en la cola y cierra los archivos."""
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+            self._hilo = None
+
+    def agregar(self, elemento):
+        if self.error is not None or self._detener.is_set():
+            return False
+        try:
+            self._cola.put_nowait(elemento)
+            return True
+        except queue.Full:
+            self.descartados += 1
+            return False
+
+    def _bucle(self):
+        try:
+            while True:
+                try:
+                    lote = [self._cola.get(timeout=0.1)]
+                except queue.Empty:
+                    if self._detener.is_set():
+                        break
+                    continue
+                while len(lote) < self.tamano_lote:
+                    try:
+                        lote.append(self._cola.get_nowait())
+                    except queue.Empty:
+                        break
+                self.escritos += self._escribir_lote(lote)
+        except (OSError, ValueError) as e:
+            self.error = e
+            print(f"Error de escritura en {type(self).__name__}: {e}")
+        finally:
+            self._cerrar()
+
+    def _escribir_lote(self, lote):
+        raise NotImplementedError
+
+    def _cerrar(self):
+        pass
+
+def _desfase_epoca():
+    # Las marcas de recepción usan time.perf_counter; se guardan como tiempo Unix
+    return time.time() - time.perf_counter()
+
+def _o_nan(valor):
+    return float("nan") if valor is None else float(valor)
+
+# =============================================================================
+# Grabación MJPEG
+# =============================================================================
+
+class GrabadorMJPEG(EscritorEnSegundoPlano):
+    """
+    Escribe los bytes JPEG de cada frame (cliente_mjpeg.FrameJPEG) en
+    `<base>.mjpeg` y su entrada de índice en `<base>.mjpeg.idx`. Los frames sin
+    bytes JPEG (por ejemplo, perfiles o imágenes ya decodificadas) se ignoran.
+    """
+
+    def __init__(self, ruta_base, capacidad=256):
+        super().__init__(capacidad)
+        self.ruta = ruta_base + ".mjpeg"
+        self.ruta_indice = self.ruta + ".idx"
+        self._datos = open(self.ruta, "wb")
+        self._indice = open(self.ruta_indice, "wb")
+        self._indice.write(CABECERA_INDICE.pack(MAGIC_INDICE, VERSION_INDICE, 0))
+        self._desplazamiento = 0
+        self._desfase = _desfase_epoca()
+        self._registros = np.zeros(self.tamano_lote, dtype=DTYPE_INDICE)
+
+    def agregar_frame(self, secuencia, frame):
+        if isinstance(getattr(frame, "datos", None), (bytes, bytearray)):
+            return self.agregar((secuencia, frame))
+        return False
+
+    def _escribir_lote(self, lote):
+        registros = self._registros[:len(lote)]
+        for i, (secuencia, frame) in enumerate(lote):
+            self._datos.write(frame.datos)
+            recepcion = frame.marca_recepcion
+            registros[i] = (secuencia, self._desplazamiento, len(frame.datos),
+                            _o_nan(frame.marca_dispositivo),
+                            _o_nan(None if recepcion is None else recepcion + self._desfase))
+            self._desplazamiento += len(frame.datos)
+        self._datos.flush()
+        self._indice.write(registros.tobytes())
+        self._indice.flush()
+        return len(lote)
+
+    def _cerrar(self):
+        self._datos.close()
+        self._indice.close()
+
+def leer_indice_mjpeg(ruta_indice):
+    """Devuelve el índice de una grabación como arreglo estructurado de NumPy."""
+    with open(ruta_indice, "rb") as f:
+        magic, version, _ = CABECERA_INDICE.unpack(f.read(CABECERA_INDICE.size))
+    if magic != MAGIC_INDICE or version != VERSION_INDICE:
+        raise ValueError(f"{ruta_indice} no es un índice de grabación válido.")
+    return np.fromfile(ruta_indice, dtype=DTYPE_INDICE, offset=CABECERA_INDICE.size)
+
+def leer_jpeg(ruta_mjpeg, registro):
+    """Lee los bytes JPEG de un registro del índice."""
+    with open(ruta_mjpeg, "rb") as f:
+        f.seek(int(registro["desplazamiento"]))
+        return f.read(int(registro["longitud"]))
+
+# =============================================================================
+# Serie temporal de perfiles
+# =============================================================================
+
+def dtype_serie(canales, ancho):
+    return np.dtype([
+        ("secuencia", "<u8"),
+        ("marca_dispositivo", "<f8"),
+        ("marca_recepcion", "<f8"),
+        ("perfiles", "<f4", (canales, ancho)),
+    ])
+
+class ArchivoSerieEspectral:
+    """
+    Archivo de registros de tamaño fijo con los perfiles de un ROI. El archivo
+    se extiende de REGISTROS_POR_BLOQUE en REGISTROS_POR_BLOQUE registros y la
+    cabecera guarda cuántos son válidos, así que un lector puede abrirlo con
+    memmap incluso mientras se sigue grabando.
+    """
+
+    def __init__(self, ruta, canales, ancho, roi=None, banderas=0):
+        self.ruta = ruta
+        self.canales = canales
+        self.ancho = ancho
+        self.roi = tuple(roi) if roi else (0, 0, ancho, 0)
+        self.banderas = banderas
+        self.dtype = dtype_serie(canales, ancho)
+        self.registros = 0
+        self._capacidad = 0
+        self._archivo = open(ruta, "wb+")
+        self._escribir_cabecera()
+
+    def _escribir_cabecera(self):
+        cabecera = CABECERA_SERIE.pack(MAGIC_SERIE, VERSION_SERIE, self.canales, self.ancho,
+                                       *self.roi, self.registros, self.banderas)
+        self._archivo.seek(0)
+        self._archivo.write(cabecera.ljust(TAMANO_CABECERA_SERIE, b"\0"))
+
+    def agregar(self, registros):
+        if self.registros + len(registros) > self._capacidad:
+            bloques = -(-(self.registros + len(registros)) // REGISTROS_POR_BLOQUE)
+            self._capacidad = bloques * REGISTROS_POR_BLOQUE
+            self._archivo.truncate(TAMANO_CABECERA_SERIE + self._capacidad * self.dtype.itemsize)
+        self._archivo.seek(TAMANO_CABECERA_SERIE + self.registros * self.dtype.itemsize)
+        self._archivo.write(registros.tobytes())
+        self.registros += len(registros)
+        self._escribir_cabecera()
+        self._archivo.flush()
+
+    def cerrar(self):
+        # Se recorta el espacio reservado que no llegó a usarse
+        self._archivo.truncate(TAMANO_CABECERA_SERIE + self.registros * self.dtype.itemsize)
+        self._archivo.close()
+
+def leer_cabecera_serie(ruta):
+    """Cabecera de un archivo `.espectros` como diccionario."""
+    with open(ruta, "rb") as f:
+        campos = CABECERA_SERIE.unpack(f.read(CABECERA_SERIE.size))
+    magic, version, canales, ancho, x0, y0, x1, y1, registros, banderas = campos
+    if magic != MAGIC_SERIE or version != VERSION_SERIE:
+        raise ValueError(f"{ruta} no es una serie espectral válida.")
+    return {"canales": canales, "ancho": ancho, "roi": (x0, y0, x1, y1), "registros": registros,
+            "enderezado": bool(banderas & BANDERA_SERIE_ENDEREZADO)}
+
+def abrir_serie_espectral(ruta, modo="r"):
+    """
+    Abre un archivo `.espectros` con numpy.memmap. Devuelve (registros, roi),
+    donde `registros` es un arreglo estructurado con los campos secuencia,
+    marca_dispositivo, marca_recepcion y perfiles (canales, ancho). El resto
+    de la cabecera (por ejemplo, si la franja estaba enderezada) se obtiene
+    con leer_cabecera_serie().
+    """
+    cabecera = leer_cabecera_serie(ruta)
+    canales, ancho, registros = cabecera["canales"], cabecera["ancho"], cabecera["registros"]
+    x0, y0, x1, y1 = cabecera["roi"]
+    if registros == 0:
+        return np.zeros(0, dtype=dtype_serie(canales, ancho)), (x0, y0, x1, y1)
+    serie = np.memmap(ruta, dtype=dtype_serie(canales, ancho), mode=modo,
+                      offset=TAMANO_CABECERA_SERIE, shape=(registros,))
+    return serie, (x0, y0, x1, y1)
+
+class GrabadorPerfiles(EscritorEnSegundoPlano):
+    """
+    Calcula y guarda los perfiles de cada frame en `<base>.espectros`. Los
+    perfiles que ya vienen calculados (cliente_perfiles.FramePerfil) se guardan
+    tal cual; las imágenes se reducen en el hilo de escritura, fuera del hilo
+    de captura y del de Tkinter. Los frames JPEG comparten su decodificación
+    con la interfaz (FrameJPEG.decodificar()), así que un frame que la vista
+    en vivo ya decodificó no se vuelve a decodificar aquí.
+
+    `recorte_para(imagen)` devuelve (recorte_local, roi) para una imagen: el
+    rectángulo a reducir dentro de esa imagen y el ROI en coordenadas del
+    frame completo que se anota en la cabecera del segmento. Si se indica
+    `enderezado` (enderezado.EnderezadoEspectro), el recorte se endereza con
+    los mismos mapas que la vista en vivo antes de reducirlo. Los perfiles se
+    guardan por frame, sin el promediado temporal de la interfaz.
+    """
+
+    def __init__(self, ruta_base, recorte_para=None, orden="BGR", capacidad=256, enderezado=None):
+        super().__init__(capacidad)
+        self.ruta_base = ruta_base
+        self.recorte_para = recorte_para
+        self.orden = orden
+        self.enderezado = enderezado
+        self.segmentos = []
+        self._archivo = None
+        self._clave = None
+        self._desfase = _desfase_epoca()
+
+    def agregar_frame(self, secuencia, frame):
+        return self.agregar((secuencia, frame))
+
+    def _perfiles(self, frame):
+        """Devuelve (perfiles, roi, banderas) de un frame, o (None, None, 0)."""
+        if hasattr(frame, "perfiles"):
+            x0, y0 = frame.roi[:2]
+            return frame.perfiles, (x0, y0, x0 + frame.perfiles.shape[1], y0 + frame.alto), 0
+        imagen = frame.decodificar() if hasattr(frame, "decodificar") else frame
+        if imagen is None:
+            return None, None, 0
+        recorte, roi = self.recorte_para(imagen) if self.recorte_para else (None, None)
+        if recorte:
+            x0, y0, x1, y1 = recorte
+            imagen = imagen[y0:y1, x0:x1]
+        banderas = 0
+        if self.enderezado is not None:
+            enderezada = self.enderezado.aplicar(imagen, roi[:2] if roi else (0, 0))
+            if enderezada is not imagen:
+                imagen, banderas = enderezada, BANDERA_SERIE_ENDEREZADO
+        return calcular_perfiles(imagen, self.orden), roi, banderas
+
+    def _nuevo_segmento(self, perfiles, roi, banderas):
+        if self._archivo is not None:
+            self._archivo.cerrar()
+        sufijo = "" if not self.segmentos else f"_{len(self.segmentos) + 1:03d}"
+        ruta = f"{self.ruta_base}{sufijo}.espectros"
+        self._archivo = ArchivoSerieEspectral(ruta, perfiles.shape[0], perfiles.shape[1], roi, banderas)
+        self.segmentos.append(ruta)
+
+    def _escribir_lote(self, lote):
+        pendientes = []
+        escritos = 0
+        for secuencia, frame in lote:
+            perfiles, roi, banderas = self._perfiles(frame)
+            if perfiles is None:
+                continue
+            clave = (perfiles.shape, tuple(roi) if roi else None, banderas)
+            if clave != self._clave:
+                if pendientes:
+                    self._volcar(self._archivo, pendientes)
+                    escritos += len(pendientes)
+                    pendientes = []
+                self._nuevo_segmento(perfiles, roi, banderas)
+                self._clave = clave
+            recepcion = getattr(frame, "marca_recepcion", None)
+            pendientes.append((secuencia, _o_nan(getattr(frame, "marca_dispositivo", None)),
+                               _o_nan(None if recepcion is None else recepcion + self._desfase), perfiles))
+        if pendientes:
+            self._volcar(self._archivo, pendientes)
+            escritos += len(pendientes)
+        return escritos
+
+    def _volcar(self, archivo, pendientes):
+        registros = np.empty(len(pendientes), dtype=archivo.dtype)
+        for i, (secuencia, dispositivo, recepcion, perfiles) in enumerate(pendientes):
+            registros[i] = (secuencia, dispositivo, recepcion, perfiles)
+        archivo.agregar(registros)
+
+    def _cerrar(self):
+        if self._archivo is not None:
+            self._archivo.cerrar()
+            self._archivo = None
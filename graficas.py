@@ -0,0 +1,237 @@
+"""
+===============================================================================
+Proyecto: Espectrofotómetro Digital En Tiempo Real Para Uso Didáctico
+Descripción:
+Gráficas en tiempo real con Matplotlib usando blitting. Los ejes, títulos,
+leyenda y cuadrícula se dibujan una sola vez y se guardan como fondo; en cada
+actualización solo se cambian los datos Y de las líneas persistentes y se
+redibujan esas líneas sobre el fondo guardado. El arreglo del eje X se
+reconstruye únicamente cuando cambia el ancho del ROI. Si los datos salen de
+los límites Y (absorbancia, datos promediados o corregidos), los límites se
+amplían y se redibuja el fondo una vez. La cascada espectral actualiza una
+sola imagen de imshow en sitio con set_data, también con blitting.
+
+Tras el blit no se llama a canvas.flush_events(): las gráficas se actualizan
+desde callbacks de Tkinter y ese llamado vuelve a entrar en el bucle de
+eventos; Tk pinta la región copiada en su siguiente ciclo.
+
+Librerías:
+- Matplotlib: Dibujo de las líneas y manejo del canvas.
+- NumPy: Construcción del eje X.
+===============================================================================
+"""
+
+import numpy as np
+
+# Margen relativo que se añade al ampliar los límites Y
+MARGEN_LIMITES = 0.1
+
+# =============================================================================
+# Gráfica con blitting
+# =============================================================================
+
+def limites_ampliados(limites, valores):
+    """
+    Límites (inferior, superior) que contienen a `limites` y a los valores
+    finitos de `valores` (secuencia de arreglos), con un margen. Devuelve
+    None si los datos ya caben.
+    """
+    minimo, maximo = limites
+    for y in valores:
+        y = np.asarray(y)
+        if y.size == 0:
+            continue
+        finitos = y[np.isfinite(y)]
+        if finitos.size:
+            minimo = min(minimo, float(finitos.min()))
+            maximo = max(maximo, float(finitos.max()))
+    if minimo >= limites[0] and maximo <= limites[1]:
+        return None
+    margen = (maximo - minimo) * MARGEN_LIMITES
+    inferior = minimo - margen if minimo < limites[0] else limites[0]
+    superior = maximo + margen if maximo > limites[1] else limites[1]
+    return inferior, superior
+
+class GraficaEnVivo:
+    """
+    Gráfica de líneas que se actualiza en sitio. `series` es una lista de
+    tuplas (color, etiqueta), una por línea. `limites_y` son los límites
+    iniciales; se amplían solos si los datos se salen de ellos y vuelven a
+    los indicados con establecer_limites_y().
+    """
+
+    def __init__(self, fig, ax, canvas, series, titulo, etiqueta_x, etiqueta_y, limites_y=(0, 255)):
+        self.fig = fig
+        self.ax = ax
+        self.canvas = canvas
+        self.limites_y = tuple(limites_y)
+        self.limites_actuales = self.limites_y
+        self.etiqueta_x = etiqueta_x
+        self.ancho = None
+        self.x = None
+        self._eje_propio = False
+        self._fondo = None
+
+        self.lineas = [
+            ax.plot([], [], color=color, label=etiqueta, animated=True)[0]
+            for color, etiqueta in series
+        ]
+        ax.set_title(titulo)
+        ax.set_xlabel(etiqueta_x)
+        ax.set_ylabel(etiqueta_y)
+        ax.set_ylim(*limites_y)
+        ax.legend(loc="upper right")
+        ax.grid(True)
+
+        # Cada redibujado completo (cambio de tamaño, nuevo eje X) renueva el fondo
+        self._conexion = canvas.mpl_connect("draw_event", self._guardar_fondo)
+
+    def _guardar_fondo(self, event=None):
+        self._fondo = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._dibujar_lineas()
+
+    def _dibujar_lineas(self):
+        for linea in self.lineas:
+            self.ax.draw_artist(linea)
+
+    def establecer_eje_x(self, x, etiqueta_x=None, propio=True):
+        """Fija un eje X propio (por ejemplo, longitudes de onda) y redibuja el fondo."""
+        self.x = x
+        self.ancho = len(x)
+        self._eje_propio = propio
+        for linea in self.lineas:
+            linea.set_data(self.x, np.zeros(self.ancho, dtype=np.float32))
+        if self.ancho > 1:
+            self.ax.set_xlim(self.x[0], self.x[-1])
+        self.ax.set_xlabel(etiqueta_x if etiqueta_x is not None else self.etiqueta_x)
+        self.canvas.draw()
+
+    def establecer_limites_y(self, limites_y):
+        if tuple(limites_y) != self.limites_y or self.limites_actuales != self.limites_y:
+            self.limites_y = tuple(limites_y)
+            self.limites_actuales = self.limites_y
+            self.ax.set_ylim(*limites_y)
+            self.canvas.draw()
+
+    def actualizar(self, valores, x=None, etiqueta_x=None):
+        """
+        Actualiza las líneas con `valores` (una secuencia de arreglos del mismo
+        ancho, en el orden de `series`). `x` permite usar un eje propio; se
+        compara por identidad, así que debe pasarse el mismo arreglo cacheado
+        mientras no cambie.
+        """
+        ancho = len(valores[0])
+        if x is not None:
+            if x is not self.x:
+                self.establecer_eje_x(x, etiqueta_x)
+        elif ancho != self.ancho or self._eje_propio:
+            self.establecer_eje_x(np.arange(ancho), propio=False)
+
+        for linea, y in zip(self.lineas, valores):
+            linea.set_ydata(y)
+
+        # Datos fuera de los límites: se amplían y el redibujado renueva el fondo
+        nuevos = limites_ampliados(self.limites_actuales, valores)
+        if nuevos is not None:
+            self.limites_actuales = nuevos
+            self.ax.set_ylim(*nuevos)
+            self.canvas.draw()
+            return
+
+        if self._fondo is None:
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self._fondo)
+        self._dibujar_lineas()
+        self.canvas.blit(self.fig.bbox)
+
+    def desconectar(self):
+        self.canvas.mpl_disconnect(self._conexion)
+
+# =============================================================================
+# Cascada espectral con blitting
+# =============================================================================
+
+class GraficaCascada:
+    """
+    Cascada (espectrograma) en `ax_cascada` y series temporales de bandas en
+    `ax_series`. La imagen y las líneas se crean una vez y solo cambian sus
+    datos; los ejes se redibujan únicamente al cambiar el eje X, la duración
+    o las bandas, o cuando una banda sale de los límites de `ax_series`.
+    """
+
+    def __init__(self, fig, ax_cascada, ax_series, canvas, limites=(0, 255), mapa="inferno"):
+        self.fig = fig
+        self.ax_cascada = ax_cascada
+        self.ax_series = ax_series
+        self.canvas = canvas
+        self.limites = tuple(limites)
+        self.limites_series = self.limites
+        self.lineas = []
+        self._fondo = None
+
+        self.imagen = ax_cascada.imshow(np.full((2, 2), np.nan, dtype=np.float32), aspect="auto",
+                                        origin="lower", cmap=mapa, vmin=limites[0], vmax=limites[1],
+                                        interpolation="nearest", animated=True)
+        fig.colorbar(self.imagen, ax=ax_cascada, label="Intensidad")
+        ax_cascada.set_title("Cascada Espectral")
+        ax_cascada.set_ylabel("Tiempo (s)")
+        ax_series.set_xlabel("Tiempo (s)")
+        ax_series.set_ylabel("Intensidad de la Banda")
+        ax_series.set_ylim(*limites)
+        ax_series.grid(True)
+
+        self._conexion = canvas.mpl_connect("draw_event", self._guardar_fondo)
+
+    def _guardar_fondo(self, event=None):
+        self._fondo = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._dibujar_artistas()
+
+    def _dibujar_artistas(self):
+        self.ax_cascada.draw_artist(self.imagen)
+        for linea in self.lineas:
+            self.ax_series.draw_artist(linea)
+
+    def configurar(self, x0, x1, duracion, etiqueta_x, etiquetas_bandas=()):
+        """Fija el rango del eje X, la duración visible y una línea por banda, y redibuja el fondo."""
+        self.imagen.set_extent((x0, x1, -duracion, 0))
+        self.ax_cascada.set_xlim(x0, x1)
+        self.ax_cascada.set_ylim(-duracion, 0)
+        self.ax_cascada.set_xlabel(etiqueta_x)
+        self.ax_series.set_xlim(-duracion, 0)
+        for linea in self.lineas:
+            linea.remove()
+        self.lineas = [self.ax_series.plot([], [], label=etiqueta, animated=True)[0]
+                       for etiqueta in etiquetas_bandas]
+        if self.lineas:
+            self.ax_series.legend(loc="upper left")
+        elif self.ax_series.get_legend() is not None:
+            self.ax_series.get_legend().remove()
+        self.canvas.draw()
+
+    def actualizar(self, filas, tiempos, series=()):
+        """
+        `filas` es el arreglo (n, ancho) en orden cronológico, `tiempos` los
+        segundos relativos a ahora de cada fila y `series` un arreglo (n,)
+        por banda.
+        """
+        self.imagen.set_data(filas)
+        for linea, serie in zip(self.lineas, series):
+            linea.set_data(tiempos, serie)
+
+        nuevos = limites_ampliados(self.limites_series, series)
+        if nuevos is not None:
+            self.limites_series = nuevos
+            self.ax_series.set_ylim(*nuevos)
+            self.canvas.draw()
+            return
+
+        if self._fondo is None:
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self._fondo)
+        self._dibujar_artistas()
+        self.canvas.blit(self.fig.bbox)
+
+    def desconectar(self):
+        self.canvas.mpl_disconnect(self._conexion)
@@ -0,0 +1,250 @@
+"""
+===============================================================================
+Proyecto: Espectrofotómetro Digital En Tiempo Real Para Uso Didáctico
+Descripción:
+Instrumentación ligera del pipeline en vivo. Cada etapa (captura,
+decodificación, recorte, perfiles, visualización, gráficas) alimenta un
+histograma de latencias de tamaño fijo con cubetas logarítmicas, de modo que
+registrar una medición cuesta una búsqueda binaria y un incremento, sin
+guardar las muestras. Además se miden las frecuencias (fps) de eventos con una
+ventana de marcas de tiempo y se llevan contadores (frames descartados, etc.).
+
+El estado completo se resume en un diccionario (instantánea) que se puede
+exportar periódicamente en JSON o en texto.
+
+Librerías:
+- bisect: Ubicación de cada medición en su cubeta.
+- json: Exportación de instantáneas.
+===============================================================================
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+# Cubetas de 1 µs a 10 s, 10 por década
+CUBETAS_POR_DECADA = 10
+LATENCIA_MINIMA = 1e-6
+DECADAS = 7
+
+PERCENTILES = (50, 90, 99)
+
+# =============================================================================
+# Histograma de latencias
+# =============================================================================
+
+class HistogramaLatencia:
+    """
+    Histograma de duraciones (en segundos) con cubetas logarítmicas fijas.
+    Los percentiles se estiman con el centro geométrico de la cubeta, con un
+    error relativo menor al 13 %.
+    """
+
+    def __init__(self):
+        total = CUBETAS_POR_DECADA * DECADAS
+        self.limites = [LATENCIA_MINIMA * 10 ** (i / CUBETAS_POR_DECADA) for i in range(1, total + 1)]
+        self.conteos = [0] * (total + 1)
+        self.total = 0
+        self.suma = 0.0
+        self.maximo = 0.0
+
+    def registrar(self, segundos):
+        self.conteos[bisect.bisect_left(self.limites, segundos)] += 1
+        self.total += 1
+        self.suma += segundos
+        if segundos > self.maximo:
+            self.maximo = segundos
+
+    def percentil(self, p):
+        """Estimación del percentil `p` (0-100) en segundos, o None si está vacío."""
+        conteos = self.conteos
+        total = self.total
+        if total == 0:
+            return None
+        return self._percentil(p, conteos, total, self.maximo)
+
+    def _percentil(self, p, conteos, total, maximo):
+        objetivo = p / 100 * total
+        acumulado = 0
+        for indice, conteo in enumerate(conteos):
+            acumulado += conteo
+            if acumulado >= objetivo and conteo:
+                if indice >= len(self.limites):
+                    return maximo
+                superior = self.limites[indice]
+                inferior = self.limites[indice - 1] if indice else LATENCIA_MINIMA
+                return min((inferior * superior) ** 0.5, maximo)
+        return maximo
+
+    def reiniciar(self):
+        self.conteos = [0] * len(self.conteos)
+        self.total = 0
+        self.suma = 0.0
+        self.maximo = 0.0
+
+    def resumen(self):
+        # Se lee cada campo una sola vez: otro hilo puede registrar o reiniciar mientras tanto
+        conteos = self.conteos
+        total = self.total
+        suma = self.suma
+        maximo = self.maximo
+        resumen = {"muestras": total}
+        if total:
+            resumen["media_ms"] = round(suma / total * 1000, 3)
+            resumen["max_ms"] = round(maximo * 1000, 3)
+            for p in PERCENTILES:
+                resumen[f"p{p}_ms"] = round(self._percentil(p, conteos, total, maximo) * 1000, 3)
+        return resumen
+
+# =============================================================================
+# Frecuencia de eventos
+# =============================================================================
+
+class MedidorFrecuencia:
+    """Frecuencia de un evento calculada sobre sus últimas `ventana` marcas de tiempo."""
+
+    def __init__(self, ventana=120, vigencia=2.0):
+        self._marcas = deque(maxlen=ventana)
+        self.vigencia = vigencia
+        self.total = 0
+
+    def marcar(self, instante=None):
+        self._marcas.append(time.perf_counter() if instante is None else instante)
+        self.total += 1
+
+    def frecuencia(self, ahora=None):
+        if len(self._marcas) < 2:
+            return 0.0
+        ahora = time.perf_counter() if ahora is None else ahora
+        # Sin eventos recientes la frecuencia es cero, no la del último tramo activo
+        if ahora - self._marcas[-1] > self.vigencia:
+            return 0.0
+        return (len(self._marcas) - 1) / max(self._marcas[-1] - self._marcas[0], 1e-9)
+
+# =============================================================================
+# Instrumentación del pipeline
+# =============================================================================
+
+class _Cronometro:
+    """Context manager reutilizable que mide una etapa. Cada etapa se mide desde un solo hilo."""
+
+    __slots__ = ("histograma", "_inicio")
+
+    def __init__(self, histograma):
+        self.histograma = histograma
+        self._inicio = 0.0
+
+    def __enter__(self):
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histograma.registrar(time.perf_counter() - self._inicio)
+        return False
+
+class Instrumentacion:
+    """
+    Registro central de histogramas por etapa, frecuencias y contadores.
+
+        with instrumentacion.medir("decodificar"):
+            imagen = frame.decodificar()
+        instrumentacion.marcar("captura")
+        instrumentacion.contadores["descartados"] = motor.frames_descartados
+
+    Las etapas y eventos nuevos se agregan desde los hilos de captura y
+    análisis mientras la interfaz toma instantáneas: el alta de entradas,
+    reiniciar() y la copia de los registros en instantanea() comparten un
+    lock. Registrar en una entrada existente no lo toma.
+    """
+
+    def __init__(self):
+        self.histogramas = {}
+        self.frecuencias = {}
+        self.contadores = {}
+        self._cronometros = {}
+        self._lock = threading.Lock()
+        self._inicio = time.perf_counter()
+
+    def histograma(self, etapa):
+        histograma = self.histogramas.get(etapa)
+        if histograma is None:
+            with self._lock:
+                histograma = self.histogramas.setdefault(etapa, HistogramaLatencia())
+        return histograma
+
+    def medir(self, etapa):
+        cronometro = self._cronometros.get(etapa)
+        if cronometro is None:
+            histograma = self.histograma(etapa)
+            with self._lock:
+                cronometro = self._cronometros.setdefault(etapa, _Cronometro(histograma))
+        return cronometro
+
+    def registrar(self, etapa, segundos):
+        self.histograma(etapa).registrar(segundos)
+
+    def marcar(self, evento, instante=None):
+        medidor = self.frecuencias.get(evento)
+        if medidor is None:
+            with self._lock:
+                medidor = self.frecuencias.setdefault(evento, MedidorFrecuencia())
+        medidor.marcar(instante)
+
+    def frecuencia(self, evento):
+        medidor = self.frecuencias.get(evento)
+        return medidor.frecuencia() if medidor is not None else 0.0
+
+    def reiniciar(self):
+        with self._lock:
+            for histograma in self.histogramas.values():
+                histograma.reiniciar()
+            self.frecuencias.clear()
+            self.contadores.clear()
+            self._inicio = time.perf_counter()
+
+    def instantanea(self):
+        with self._lock:
+            frecuencias = list(self.frecuencias.items())
+            histogramas = list(self.histogramas.items())
+            contadores = dict(self.contadores)
+        ahora = time.perf_counter()
+        return {
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "duracion_s": round(ahora - self._inicio, 1),
+            "fps": {evento: round(medidor.frecuencia(ahora), 2) for evento, medidor in frecuencias},
+            "eventos": {evento: medidor.total for evento, medidor in frecuencias},
+            "contadores": contadores,
+            "etapas": {etapa: histograma.resumen() for etapa, histograma in histogramas},
+        }
+
+    def texto_resumen(self, instantanea=None):
+        """Resumen de pocas líneas para mostrar sobre el video."""
+        datos = instantanea or self.instantanea()
+        lineas = [" | ".join(f"{evento}: {fps:.1f} fps" for evento, fps in datos["fps"].items())]
+        if datos["contadores"]:
+            lineas.append(" | ".join(f"{nombre}: {valor}" for nombre, valor in datos["contadores"].items()))
+        for etapa, resumen in datos["etapas"].items():
+            if resumen["muestras"]:
+                lineas.append(f"{etapa:<18} p50 {resumen['p50_ms']:7.2f} ms  p99 {resumen['p99_ms']:7.2f} ms")
+        return "\n".join(lineas)
+
+    def exportar(self, ruta):
+        """
+        Escribe una instantánea en `ruta`: JSON si termina en .json, texto en
+        otro caso. La escritura es atómica para que un lector nunca vea un
+        archivo a medias.
+        """
+        datos = self.instantanea()
+        temporal = ruta + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            if ruta.lower().endswith(".json"):
+                json.dump(datos, f, indent=2, ensure_ascii=False)
+            else:
+                f.write(f"{datos['fecha']} ({datos['duracion_s']} s)\n")
+                f.write(self.texto_resumen(datos) + "\n")
+        os.replace(temporal, ruta)
+        return datos
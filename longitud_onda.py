@@ -0,0 +1,144 @@
+"""
+===============================================================================
+Proyecto: Espectrofotómetro Digital En Tiempo Real Para Uso Didáctico
+Descripción:
+Calibración píxel → longitud de onda y detección de picos con refinamiento
+sub-píxel. A partir de dos o más líneas conocidas se ajusta un polinomio
+λ(x) sobre la posición X del frame completo; el arreglo de longitudes de onda
+de cada ROI se calcula una sola vez y se reutiliza mientras no cambien el ROI
+ni la calibración. La detección de picos es vectorizada y refina cada máximo
+con un ajuste parabólico o por centroide.
+
+Librerías:
+- NumPy: Ajuste polinomial y operaciones vectorizadas.
+===============================================================================
+"""
+
+import numpy as np
+
+# =============================================================================
+# Calibración en longitud de onda
+# =============================================================================
+
+class CalibracionLongitudOnda:
+    """
+    Relación entre la posición X (en píxeles del frame completo) y la longitud
+    de onda en nm. `puntos` es una lista de pares (píxel, nm).
+    """
+
+    def __init__(self):
+        self.puntos = []
+        self.coeficientes = None
+        self._cache_clave = None
+        self._cache_eje = None
+
+    @property
+    def calibrada(self):
+        return self.coeficientes is not None
+
+    def ajustar(self, puntos, grado=None):
+        """
+        Ajusta el polinomio con los puntos dados. Por defecto el grado es 1 con
+        dos puntos y 2 con tres o más.
+        """
+        puntos = sorted((float(p), float(nm)) for p, nm in puntos)
+        if len(puntos) < 2:
+            raise ValueError("Se necesitan al menos dos líneas conocidas para calibrar.")
+        if grado is None:
+            grado = 1 if len(puntos) == 2 else 2
+        grado = min(grado, len(puntos) - 1)
+        pixeles, nanometros = np.array(puntos).T
+        self.puntos = puntos
+        self.coeficientes = np.polyfit(pixeles, nanometros, grado)
+        self._cache_clave = None
+        return self.coeficientes
+
+    def limpiar(self):
+        self.puntos = []
+        self.coeficientes = None
+        self._cache_clave = None
+
+    def a_nm(self, pixeles):
+        """Convierte posiciones (posiblemente fraccionarias) del frame completo a nm."""
+        return np.polyval(self.coeficientes, pixeles)
+
+    def eje(self, origen_x, ancho):
+        """
+        Arreglo float32 de longitudes de onda para un ROI que empieza en
+        `origen_x` y tiene `ancho` columnas. Se guarda en caché y se devuelve el
+        mismo objeto mientras no cambien el ROI ni la calibración.
+        """
+        if not self.calibrada:
+            return None
+        clave = (origen_x, ancho)
+        if clave != self._cache_clave:
+            self._cache_eje = self.a_nm(origen_x + np.arange(ancho, dtype=np.float64)).astype(np.float32)
+            self._cache_clave = clave
+        return self._cache_eje
+
+# =============================================================================
+# Detección de picos
+# =============================================================================
+
+def detectar_picos(perfil, umbral_relativo=0.2, distancia=5, max_picos=10, metodo="parabolico", ventana=2):
+    """
+    Detecta los máximos locales de `perfil` y devuelve un arreglo con sus
+    posiciones sub-píxel (en columnas del perfil), ordenadas de izquierda a
+    derecha.
+
+    - `umbral_relativo`: altura mínima sobre el mínimo del perfil, como
+      fracción del rango (max - min).
+    - `distancia`: separación mínima entre picos, en columnas; se conserva
+      el más alto.
+    - `metodo`: "parabolico" (ajuste de parábola a tres puntos) o
+      "centroide" (centro de masa en ±`ventana` columnas).
+    """
+    y = np.asarray(perfil, dtype=np.float32)
+    if y.size < 3:
+        return np.empty(0, dtype=np.float64)
+    validos = np.isfinite(y)
+    if not validos.all():
+        y = np.where(validos, y, np.nanmin(y) if validos.any() else 0.0)
+
+    minimo, maximo = float(y.min()), float(y.max())
+    if maximo <= minimo:
+        return np.empty(0, dtype=np.float64)
+    centro = y[1:-1]
+    es_maximo = (centro > y[:-2]) & (centro >= y[2:]) & (centro >= minimo + umbral_relativo * (maximo - minimo))
+    indices = np.flatnonzero(es_maximo) + 1
+    if indices.size == 0:
+        return np.empty(0, dtype=np.float64)
+
+    # Supresión de no máximos: se recorren los candidatos de mayor a menor
+    orden = indices[np.argsort(y[indices])[::-1]]
+    elegidos = []
+    for indice in orden:
+        if all(abs(indice - otro) >= distancia for otro in elegidos):
+            elegidos.append(indice)
+            if len(elegidos) == max_picos:
+                break
+    indices = np.sort(np.array(elegidos))
+
+    if metodo == "centroide":
+        return refinar_centroide(y, indices, ventana)
+    return refinar_parabolico(y, indices)
+
+def refinar_parabolico(y, indices):
+    """Posición sub-píxel del vértice de la parábola que pasa por i-1, i, i+1."""
+    indices = np.clip(indices, 1, len(y) - 2)
+    izquierda, centro, derecha = y[indices - 1], y[indices], y[indices + 1]
+    denominador = izquierda - 2 * centro + derecha
+    delta = np.zeros(len(indices), dtype=np.float64)
+    np.divide(0.5 * (izquierda - derecha), denominador, out=delta, where=denominador != 0)
+    return indices + np.clip(delta, -0.5, 0.5)
+
+def refinar_centroide(y, indices, ventana=2):
+    """Centro de masa de cada pico en ±`ventana` columnas, sobre el mínimo local."""
+    desplazamientos = np.arange(-ventana, ventana + 1)
+    vecinos = np.clip(indices[:, None] + desplazamientos[None, :], 0, len(y) - 1)
+    pesos = y[vecinos].astype(np.float64)
+    pesos -= pesos.min(axis=1, keepdims=True)
+    total = pesos.sum(axis=1)
+    posiciones = indices.astype(np.float64)
+    np.divide((pesos * vecinos).sum(axis=1), total, out=posiciones, where=total > 0)
+    return posiciones
@@ -0,0 +1,497 @@
+"""
+===============================================================================
+Proyecto: Espectrofotómetro Digital En Tiempo Real Para Uso Didáctico
+Descripción:
+Gestor de varias cámaras simultáneas descritas en un archivo de configuración
+JSON. Un único bucle de asyncio, en un hilo en segundo plano, atiende una
+tarea por cámara: las ESP32-CAM se leen con cliente_mjpeg.ClienteMJPEGAsincrono
+y las fuentes sin cámara (grabaciones, carpetas, sintético) con un hilo
+auxiliar. Cada cámara tiene su propio buffer del último frame, ROI,
+promediado, calibración fotométrica y en longitud de onda, e instrumentación.
+
+El análisis de cada cámara corre en un pool de hilos con a lo sumo un frame
+en curso por cámara: si el análisis de una cámara no alcanza, sus frames
+intermedios se descartan sin frenar la recepción ni a las demás cámaras. Una
+cámara lenta o desconectada solo afecta a su propia tarea, que se reconecta
+sola.
+
+Formato de la configuración:
+    {
+      "timeout": 5.0,
+      "espera_reconexion": 2.0,
+      "camaras": [
+        {"nombre": "Cámara A", "fuente": "http://192.168.1.10:81/stream",
+         "recorte": [0, 200, 640, 280],
+         "promedio": {"modo": "exponencial", "alfa": 0.2},
+         "oscuro": "oscuro_a.jpg", "referencia": "referencia_a.jpg",
+         "longitud_onda": [[120, 436.6], [410, 546.1]]},
+        {"nombre": "Simulada", "fuente": "sintetico", "ritmo": "fijo", "fps": 15}
+      ]
+    }
+
+Uso:
+    python multicamara.py camaras_ejemplo.json
+    python multicamara.py camaras_ejemplo.json --sin-interfaz --segundos 10
+
+Librerías:
+- asyncio: Recepción concurrente de todas las cámaras.
+- concurrent.futures: Pool de hilos para el análisis.
+- NumPy: Alineación de los espectros en un eje común.
+===============================================================================
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from calibracion import CalibracionFotometrica
+from captura import BufferUltimoFrame
+from cliente_mjpeg import ClienteMJPEGAsincrono
+from fuentes import RITMOS, RITMO_TIEMPO_REAL, crear_fuente
+from instrumentacion import Instrumentacion
+from longitud_onda import CalibracionLongitudOnda
+from perfiles import EtapaAnalisis, FrameEspectral, cargar_perfiles_imagen
+from promediado import PromediadorTemporal
+
+TIMEOUT = 5.0
+ESPERA_RECONEXION = 2.0
+
+# Puntos del eje común de la vista comparativa
+PUNTOS_COMPARACION = 512
+
+ESTADO_DETENIDA = "detenida"
+ESTADO_CONECTANDO = "conectando"
+ESTADO_ACTIVA = "activa"
+ESTADO_ERROR = "error"
+
+MAGNITUDES = ("Intensidad", "Normalizada", "Transmitancia", "Absorbancia")
+
+# =============================================================================
+# Cámara
+# =============================================================================
+
+class Camara:
+    """
+    Estado independiente de una cámara: fuente, ROI (`recorte` en píxeles del
+    frame completo), buffer del último frame, promediado, calibraciones e
+    instrumentación. `ultimo` es una copia del último FrameEspectral, segura
+    para leerse desde otro hilo.
+    """
+
+    def __init__(self, nombre, fuente, recorte=None, promediador=None, ritmo=RITMO_TIEMPO_REAL, fps=30.0):
+        self.nombre = nombre
+        self.fuente = fuente
+        self.recorte = tuple(recorte) if recorte else None
+        self.ritmo = ritmo
+        self.fps = fps
+        self.buffer = BufferUltimoFrame()
+        self.etapa = EtapaAnalisis(orden="BGR", promediador=promediador)
+        self.calibracion = CalibracionFotometrica()
+        self.calibracion_lambda = CalibracionLongitudOnda()
+        self.instrumentacion = Instrumentacion()
+        self.estado = ESTADO_DETENIDA
+        self.error = None
+        self.ultimo = None
+        self.ancho_frame = None
+        self._lock = threading.Lock()
+        self._analizando = False
+        self._secuencia_analizada = 0
+        self._hubo_sesion = False
+        self._sesion_con_frames = False
+
+    @property
+    def es_camara(self):
+        return self.fuente.startswith(("http://", "https://"))
+
+    @property
+    def origen_x(self):
+        return self.recorte[0] if self.recorte else 0
+
+    def iniciar_sesion(self):
+        """Marca el inicio de un intento de conexión (llamado desde el bucle de asyncio)."""
+        self._sesion_con_frames = False
+
+    def recibir(self, frame, latencia=None):
+        """Publica un frame recibido (llamado desde el bucle de asyncio)."""
+        if not self._sesion_con_frames:
+            # Solo es reconexión si una sesión anterior ya había entregado frames
+            self._sesion_con_frames = True
+            if self._hubo_sesion:
+                self.instrumentacion.contadores["reconexiones"] = \
+                    self.instrumentacion.contadores.get("reconexiones", 0) + 1
+            self._hubo_sesion = True
+        self.buffer.publicar(frame, frame.marca_recepcion)
+        self.instrumentacion.marcar("recepcion")
+        if latencia is not None:
+            self.instrumentacion.registrar("latencia", latencia)
+
+    def reservar_analisis(self):
+        """Devuelve True si no hay un análisis en curso y lo marca como iniciado."""
+        with self._lock:
+            if self._analizando or self.buffer.secuencia <= self._secuencia_analizada:
+                return False
+            self._analizando = True
+            return True
+
+    def analizar(self):
+        """Decodifica y analiza el frame más reciente (llamado desde el pool de hilos)."""
+        try:
+            capturado = self.buffer.obtener_ultimo(self._secuencia_analizada)
+            if capturado is None:
+                return
+            with self.instrumentacion.medir("analisis"):
+                imagen = capturado.imagen
+                if imagen is None:
+                    return
+                self.ancho_frame = imagen.shape[1]
+                if self.recorte:
+                    x0, y0, x1, y1 = self.recorte
+                    imagen = imagen[y0:y1, x0:x1]
+                espectral = self.etapa.procesar(capturado.secuencia, imagen, capturado.marca_tiempo, self.recorte)
+                # El promediador reutiliza su buffer: se publica una copia
+                copia = FrameEspectral(espectral.secuencia, espectral.marca_tiempo,
+                                       espectral.perfiles.copy(), espectral.alto)
+            with self._lock:
+                self.ultimo = copia
+                self._secuencia_analizada = capturado.secuencia
+            self.instrumentacion.marcar("analisis")
+            self.instrumentacion.registrar("extremo_a_extremo", time.perf_counter() - capturado.marca_tiempo)
+        finally:
+            with self._lock:
+                self._analizando = False
+
+    def fijar_oscuro(self, perfiles=None):
+        """Toma como oscuro `perfiles` o, si es None, el último espectro analizado."""
+        perfiles = self._perfiles_actuales() if perfiles is None else perfiles
+        if perfiles is not None:
+            self.calibracion.fijar_oscuro(perfiles, roi=self.recorte)
+        return perfiles is not None
+
+    def fijar_referencia(self, perfiles=None):
+        perfiles = self._perfiles_actuales() if perfiles is None else perfiles
+        if perfiles is not None:
+            self.calibracion.fijar_referencia(perfiles, roi=self.recorte)
+        return perfiles is not None
+
+    def _perfiles_actuales(self):
+        with self._lock:
+            return None if self.ultimo is None else self.ultimo.perfiles
+
+    def espectro(self, magnitud="Intensidad"):
+        """
+        Devuelve (eje_nm o None, valores) de la luminancia del último frame en
+        la magnitud indicada, o None si aún no hay datos. Las magnitudes
+        calibradas son NaN mientras la cámara no tenga referencia para su ROI.
+        """
+        with self._lock:
+            ultimo = self.ultimo
+        if ultimo is None:
+            return None
+        gris = ultimo.perfiles[3]
+        if magnitud in ("Transmitancia", "Absorbancia"):
+            if not self.calibracion.valida_para(self.recorte, ultimo.ancho):
+                valores = np.full(ultimo.ancho, np.nan, dtype=np.float32)
+            elif magnitud == "Transmitancia":
+                valores = self.calibracion.transmitancia(ultimo.perfiles)[3].copy()
+            else:
+                valores = self.calibracion.absorbancia(ultimo.perfiles)[3].copy()
+        elif magnitud == "Normalizada":
+            maximo = np.nanmax(gris)
+            valores = gris / maximo if maximo > 0 else gris
+        else:
+            valores = gris
+        return self.calibracion_lambda.eje(self.origen_x, ultimo.ancho), valores
+
+    def resumen(self):
+        """Rendimiento y estado de la cámara para reportes y la vista comparativa."""
+        datos = self.instrumentacion.instantanea()
+        etapas = datos["etapas"]
+        return {
+            "nombre": self.nombre,
+            "estado": self.estado,
+            "error": self.error,
+            "fps_recepcion": datos["fps"].get("recepcion", 0.0),
+            "fps_analisis": datos["fps"].get("analisis", 0.0),
+            "recibidos": self.buffer.secuencia,
+            "descartados": self.buffer.frames_descartados,
+            "latencia": etapas.get("latencia", {}),
+            "analisis": etapas.get("analisis", {}),
+            "extremo_a_extremo": etapas.get("extremo_a_extremo", {}),
+            "reconexiones": datos["contadores"].get("reconexiones", 0),
+        }
+
+    def texto_resumen(self):
+        resumen = self.resumen()
+        texto = (f"{self.nombre} [{resumen['estado']}]  "
+                 f"{resumen['fps_recepcion']:.1f} fps recibidos, {resumen['fps_analisis']:.1f} fps analizados, "
+                 f"{resumen['descartados']} descartados")
+        for etapa in ("latencia", "extremo_a_extremo"):
+            if resumen[etapa].get("muestras"):
+                texto += f"  |  {etapa} p50 {resumen[etapa]['p50_ms']:.1f} ms p99 {resumen[etapa]['p99_ms']:.1f} ms"
+        if resumen["estado"] == ESTADO_ERROR and resumen["error"]:
+            texto += f"  |  {resumen['error']}"
+        return texto
+
+def _ruta_relativa(ruta, base):
+    return ruta if os.path.isabs(ruta) else os.path.join(base, ruta)
+
+def crear_camara(config, base="."):
+    """Crea una Camara a partir de una entrada de la configuración."""
+    if "fuente" not in config:
+        raise ValueError(f"La cámara {config.get('nombre', '?')} no indica su fuente.")
+    fuente = config["fuente"]
+    if not fuente.startswith(("http://", "https://", "sintetico")):
+        fuente = _ruta_relativa(fuente, base)
+    ritmo = config.get("ritmo", RITMO_TIEMPO_REAL)
+    if ritmo not in RITMOS:
+        raise ValueError(f"Ritmo de reproducción desconocido: {ritmo}")
+
+    promediador = PromediadorTemporal()
+    if "promedio" in config:
+        promediador.configurar(**config["promedio"])
+    recorte = config.get("recorte")
+    if recorte is not None and len(recorte) != 4:
+        raise ValueError(f"El recorte de {config.get('nombre', fuente)} debe ser [x0, y0, x1, y1].")
+
+    camara = Camara(config.get("nombre", fuente), fuente, recorte, promediador, ritmo, config.get("fps", 30.0))
+    if "oscuro" in config:
+        camara.fijar_oscuro(cargar_perfiles_imagen(_ruta_relativa(config["oscuro"], base), camara.recorte))
+    if "referencia" in config:
+        camara.fijar_referencia(cargar_perfiles_imagen(_ruta_relativa(config["referencia"], base), camara.recorte))
+    if "longitud_onda" in config:
+        camara.calibracion_lambda.ajustar(config["longitud_onda"])
+    return camara
+
+def cargar_configuracion(ruta):
+    """
+    Lee el archivo JSON de configuración y devuelve (camaras, opciones), con
+    opciones = {"timeout": ..., "espera_reconexion": ...}. Las rutas relativas
+    se resuelven respecto a la carpeta del archivo.
+    """
+    with open(ruta, encoding="utf-8") as f:
+        config = json.load(f)
+    if not config.get("camaras"):
+        raise ValueError("La configuración no contiene cámaras.")
+    base = os.path.dirname(os.path.abspath(ruta))
+    camaras = [crear_camara(entrada, base) for entrada in config["camaras"]]
+    nombres = [camara.nombre for camara in camaras]
+    if len(set(nombres)) != len(nombres):
+        raise ValueError("Los nombres de las cámaras deben ser distintos.")
+    opciones = {
+        "timeout": config.get("timeout", TIMEOUT),
+        "espera_reconexion": config.get("espera_reconexion", ESPERA_RECONEXION),
+    }
+    return camaras, opciones
+
+# =============================================================================
+# Gestor de cámaras
+# =============================================================================
+
+class GestorMulticamara:
+    """
+    Atiende todas las cámaras desde un bucle de asyncio en un hilo propio.
+
+        gestor = GestorMulticamara(camaras)
+        gestor.iniciar()
+        ...
+        gestor.detener()
+    """
+
+    def __init__(self, camaras, timeout=TIMEOUT, espera_reconexion=ESPERA_RECONEXION):
+        self.camaras = camaras
+        self.timeout = timeout
+        self.espera_reconexion = espera_reconexion
+        self._hilo = None
+        self._bucle = None
+        self._parar = None
+        self._ejecutor = None
+
+    @property
+    def activo(self):
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def iniciar(self):
+        if self.activo:
+            return
+        # Un hilo de análisis por cámara: ninguna espera a que termine otra
+        self._ejecutor = ThreadPoolExecutor(max_workers=len(self.camaras), thread_name_prefix="AnalisisCamara")
+        listo = threading.Event()
+        self._hilo = threading.Thread(target=lambda: asyncio.run(self._principal(listo)),
+                                      name="Multicamara", daemon=True)
+        self._hilo.start()
+        listo.wait()
+
+    def detener(self, timeout=2.0):
+        if self._bucle is not None and self._parar is not None:
+            self._bucle.call_soon_threadsafe(self._parar.set)
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+            self._hilo = None
+        if self._ejecutor is not None:
+            self._ejecutor.shutdown(wait=False)
+            self._ejecutor = None
+
+    def resumen(self):
+        return [camara.resumen() for camara in self.camaras]
+
+    async def _principal(self, listo):
+        self._bucle = asyncio.get_running_loop()
+        self._parar = asyncio.Event()
+        listo.set()
+        tareas = [asyncio.create_task(self._atender(camara)) for camara in self.camaras]
+        await self._parar.wait()
+        for tarea in tareas:
+            tarea.cancel()
+        await asyncio.gather(*tareas, return_exceptions=True)
+        for camara in self.camaras:
+            camara.estado = ESTADO_DETENIDA
+
+    def _despachar(self, camara):
+        if camara.reservar_analisis():
+            self._ejecutor.submit(camara.analizar)
+
+    async def _atender(self, camara):
+        """Recibe frames de una cámara y se reconecta ante cualquier fallo."""
+        while True:
+            camara.estado = ESTADO_CONECTANDO
+            camara.iniciar_sesion()
+            try:
+                if camara.es_camara:
+                    await self._recibir_stream(camara)
+                else:
+                    await self._recibir_fuente(camara)
+            except asyncio.CancelledError:
+                raise
+            except (OSError, ValueError, EOFError, asyncio.TimeoutError) as e:
+                camara.estado = ESTADO_ERROR
+                camara.error = str(e) or type(e).__name__
+                print(f"{camara.nombre}: {camara.error}. Reintentando en {self.espera_reconexion} s.")
+            await asyncio.sleep(self.espera_reconexion)
+
+    async def _recibir_stream(self, camara):
+        cliente = ClienteMJPEGAsincrono(camara.fuente, self.timeout)
+        try:
+            await cliente.conectar()
+            camara.estado = ESTADO_ACTIVA
+            camara.error = None
+            while True:
+                frame = await asyncio.wait_for(cliente.leer_parte(), self.timeout)
+                camara.recibir(frame, cliente.latencia(frame))
+                self._despachar(camara)
+        finally:
+            await cliente.cerrar()
+
+    async def _recibir_fuente(self, camara):
+        # Las fuentes offline esperan con time.sleep: se leen en un hilo auxiliar
+        fuente = await asyncio.to_thread(crear_fuente, camara.fuente, camara.ritmo, camara.fps)
+        try:
+            camara.estado = ESTADO_ACTIVA
+            camara.error = None
+            while True:
+                ok, frame = await asyncio.to_thread(fuente.read)
+                if not ok:
+                    raise EOFError("La fuente no entregó más frames.")
+                camara.recibir(frame, fuente.latencia(frame))
+                self._despachar(camara)
+        finally:
+            fuente.release()
+
+# =============================================================================
+# Alineación de espectros
+# =============================================================================
+
+class AlineadorEspectros:
+    """
+    Remuestrea los espectros de varias cámaras sobre un eje común para poder
+    superponerlos. Si todas las cámaras están calibradas en longitud de onda
+    el eje es la unión de sus rangos en nm; si no, la posición relativa (0-1)
+    dentro del ROI de cada cámara. El eje común se guarda en caché y se
+    devuelve el mismo arreglo mientras no cambien los rangos.
+    """
+
+    def __init__(self, puntos=PUNTOS_COMPARACION):
+        self.puntos = puntos
+        self._clave = None
+        self._eje = None
+        self._etiqueta = None
+
+    def _eje_comun(self, ejes):
+        if all(eje is not None for eje in ejes):
+            rangos = tuple((float(np.min(eje)), float(np.max(eje))) for eje in ejes)
+            clave = ("nm", min(r[0] for r in rangos), max(r[1] for r in rangos))
+            etiqueta = "Longitud de Onda (nm)"
+        else:
+            clave = ("relativa", 0.0, 1.0)
+            etiqueta = "Posición Relativa en el ROI"
+        if clave != self._clave:
+            self._eje = np.linspace(clave[1], clave[2], self.puntos, dtype=np.float32)
+            self._etiqueta = etiqueta
+            self._clave = clave
+        return self._clave[0] == "nm"
+
+    def alinear(self, espectros):
+        """
+        `espectros` es una lista con (eje_nm o None, valores) o None por
+        cámara. Devuelve (eje, etiqueta, lista de valores remuestreados); las
+        cámaras sin datos o fuera de su rango quedan en NaN.
+        """
+        disponibles = [espectro for espectro in espectros if espectro is not None]
+        if not disponibles:
+            return None, None, []
+        en_nm = self._eje_comun([eje for eje, _ in disponibles])
+
+        alineados = []
+        for espectro in espectros:
+            if espectro is None:
+                alineados.append(np.full(self.puntos, np.nan, dtype=np.float32))
+                continue
+            eje, valores = espectro
+            if en_nm:
+                x = eje
+                if x[-1] < x[0]:
+                    x, valores = x[::-1], valores[::-1]
+            else:
+                x = np.linspace(0.0, 1.0, len(valores), dtype=np.float32)
+            alineados.append(np.interp(self._eje, x, valores, left=np.nan, right=np.nan).astype(np.float32))
+        return self._eje, self._etiqueta, alineados
+
+# =============================================================================
+# Ejecución directa
+# =============================================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recibe y compara varias cámaras a la vez.")
+    parser.add_argument("configuracion", help="Archivo JSON con la lista de cámaras.")
+    parser.add_argument("--sin-interfaz", action="store_true", help="Solo reporta el rendimiento por cámara.")
+    parser.add_argument("--segundos", type=float, default=10.0, help="Duración sin interfaz.")
+    args = parser.parse_args()
+
+    try:
+        camaras, opciones = cargar_configuracion(args.configuracion)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    if args.sin_interfaz:
+        gestor = GestorMulticamara(camaras, **opciones)
+        gestor.iniciar()
+        inicio = time.perf_counter()
+        while time.perf_counter() - inicio < args.segundos:
+            time.sleep(1.0)
+            print("\n".join(camara.texto_resumen() for camara in camaras) + "\n")
+        gestor.detener()
+        print(json.dumps(gestor.resumen(), indent=2, ensure_ascii=False))
+    else:
+        from tkinter import Tk
+        from ventana_multicamara import abrir_ventana_multicamara
+
+        root = Tk()
+        root.withdraw()
+        ventana = abrir_ventana_multicamara(root, camaras, **opciones)
+        ventana.bind("<Destroy>", lambda event: event.widget is ventana and root.destroy())
+        root.mainloop()
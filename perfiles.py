@@ -0,0 +1,287 @@
+"""
+===============================================================================
+Proyecto: Espectrofotómetro Digital En Tiempo Real Para Uso Didáctico
+Descripción:
+Cálculo de los perfiles espectrales por columna (R, G, B y gris) de un frame.
+Cada frame se reduce una sola vez, en una única pasada vectorizada, a un
+FrameEspectral con arreglos float32 compactos que reutilizan todas las vistas
+(histograma, perfil de intensidad, etc.). PIL queda reservado para mostrar
+imágenes y para leer archivos; las imágenes grandes se reducen por bloques de
+filas a resolución completa (ver reducir_por_bloques() sobre la memoria que
+usa cada formato).
+
+Librerías:
+- NumPy: Reducción vectorizada por columnas.
+===============================================================================
+"""
+
+import numpy as np
+
+# Coeficientes de luminancia ITU-R 601-2, los mismos que usa PIL en convert('L')
+PESOS_GRIS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+# Filas que se convierten y suman a la vez al reducir imágenes de PIL
+FILAS_POR_BLOQUE = 256
+
+# Formatos de imagen aceptados por el procesamiento por lotes, las fuentes de
+# carpeta y los diálogos de archivo de las interfaces
+EXTENSIONES_IMAGEN = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff")
+TIPOS_IMAGEN = [("Imágenes", ";".join("*" + extension for extension in EXTENSIONES_IMAGEN))]
+
+# =============================================================================
+# Frame espectral
+# =============================================================================
+
+class FrameEspectral:
+    """
+    Resultado del análisis de un frame: perfiles promedio por columna de los
+    canales R, G, B y de la luminancia (gris), en un solo arreglo float32 de
+    forma (4, ancho).
+    """
+
+    __slots__ = ("secuencia", "marca_tiempo", "perfiles", "alto")
+
+    def __init__(self, secuencia, marca_tiempo, perfiles, alto):
+        self.secuencia = secuencia
+        self.marca_tiempo = marca_tiempo
+        self.perfiles = perfiles
+        self.alto = alto
+
+    @property
+    def ancho(self):
+        return self.perfiles.shape[1]
+
+    @property
+    def rojo(self):
+        return self.perfiles[0]
+
+    @property
+    def verde(self):
+        return self.perfiles[1]
+
+    @property
+    def azul(self):
+        return self.perfiles[2]
+
+    @property
+    def gris(self):
+        return self.perfiles[3]
+
+    @property
+    def intensidad(self):
+        """Promedio simple (R + G + B) / 3 por columna."""
+        return self.perfiles[:3].mean(axis=0)
+
+# =============================================================================
+# Cálculo de perfiles
+# =============================================================================
+
+def calcular_perfiles(imagen, orden="RGB"):
+    """
+    Reduce una imagen (alto, ancho, 3) de 8 bits a sus perfiles por columna.
+    Devuelve un arreglo float32 (4, ancho) con las filas R, G, B y gris. El
+    parámetro `orden` indica si los canales vienen como "RGB" (PIL) o "BGR"
+    (OpenCV), evitando una conversión de color previa.
+    """
+    if imagen.ndim == 2:
+        gris = imagen.mean(axis=0, dtype=np.float32)
+        return np.vstack([gris, gris, gris, gris])
+
+    medias = imagen[:, :, :3].mean(axis=0, dtype=np.float32)
+    if orden == "BGR":
+        medias = medias[:, ::-1]
+    perfiles = np.empty((4, medias.shape[0]), dtype=np.float32)
+    perfiles[:3] = medias.T
+    np.dot(medias, PESOS_GRIS, out=perfiles[3])
+    return perfiles
+
+# Modos crudos que se pueden leer directamente del archivo: (bytes por píxel, índices de R, G y B)
+MODOS_CRUDOS = {
+    "RGB": (3, [0, 1, 2]),
+    "BGR": (3, [2, 1, 0]),
+    "RGBA": (4, [0, 1, 2]),
+    "RGBX": (4, [0, 1, 2]),
+    "BGRA": (4, [2, 1, 0]),
+    "BGRX": (4, [2, 1, 0]),
+    "L": (1, [0, 0, 0]),
+}
+
+def _bloques_sin_compresion(imagen):
+    """
+    Para archivos sin compresión (TIFF de una o varias franjas o en mosaico,
+    BMP sin comprimir) devuelve (bloques, canales). `bloques` es la lista de
+    franjas o mosaicos del archivo como pares ((x0, y0, x1, y1), pixeles),
+    donde `pixeles` es una vista (alto, ancho, bytes por píxel) del archivo
+    mapeado en memoria, de arriba hacia abajo. Devuelve None si la imagen no
+    se puede leer así (compresión, planos separados, modos no crudos).
+    """
+    ruta = getattr(imagen, "filename", None)
+    mosaicos = getattr(imagen, "tile", None)
+    if not ruta or not mosaicos:
+        return None
+    ancho, alto = imagen.size
+    modo = None
+    area = 0
+    plan = []
+    for mosaico in mosaicos:
+        codec, extension, desplazamiento, argumentos = mosaico[:4]
+        if codec != "raw":
+            return None
+        if not isinstance(argumentos, tuple):
+            argumentos = (argumentos,)
+        modo_crudo, paso, orientacion = (argumentos + (0, 1))[:3]
+        if modo_crudo not in MODOS_CRUDOS or modo not in (None, modo_crudo):
+            return None
+        modo = modo_crudo
+        bx0, by0, bx1, by1 = extension
+        if not (0 <= bx0 < bx1 <= ancho and 0 <= by0 < by1 <= alto):
+            return None
+        area += (bx1 - bx0) * (by1 - by0)
+        plan.append(((bx0, by0, bx1, by1), desplazamiento, paso, orientacion))
+    if area != ancho * alto:
+        return None
+
+    bytes_pixel, canales = MODOS_CRUDOS[modo]
+    # Un solo mapa del archivo; cada franja o mosaico es una vista sobre él
+    archivo = np.memmap(ruta, dtype=np.uint8, mode="r")
+    bloques = []
+    for (bx0, by0, bx1, by1), desplazamiento, paso, orientacion in plan:
+        ancho_bloque, alto_bloque = bx1 - bx0, by1 - by0
+        paso = paso or ancho_bloque * bytes_pixel
+        fin = desplazamiento + paso * alto_bloque
+        if paso < ancho_bloque * bytes_pixel or fin > archivo.size:
+            return None
+        filas = archivo[desplazamiento:fin].reshape(alto_bloque, paso)[:, :ancho_bloque * bytes_pixel]
+        filas = filas.reshape(alto_bloque, ancho_bloque, bytes_pixel)
+        bloques.append(((bx0, by0, bx1, by1), filas[::-1] if orientacion < 0 else filas))
+    return bloques, canales
+
+def _rgb(imagen):
+    """Arreglo (alto, ancho, 3) de una imagen de PIL ya cargada; solo convierte los modos que lo requieren."""
+    if imagen.mode in ("RGB", "RGBA"):
+        return np.asarray(imagen)[:, :, :3]
+    if imagen.mode == "L":
+        return np.broadcast_to(np.asarray(imagen)[:, :, None], (imagen.height, imagen.width, 3))
+    return np.asarray(imagen.convert("RGB"))
+
+def reducir_por_bloques(imagen, recorte=None, filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Perfiles (4, ancho) de una imagen de PIL a resolución completa dentro de
+    `recorte` (x0, y0, x1, y1), sumando bloques de `filas_por_bloque` filas.
+
+    Si el archivo no tiene compresión (TIFF de una o varias franjas o en
+    mosaico, BMP sin comprimir) cada franja o mosaico que toca el recorte se
+    lee por bloques directamente del archivo mapeado en memoria, sin
+    decodificar la imagen completa. PIL no puede decodificar PNG ni JPEG por
+    franjas: en esos formatos la imagen se carga entera una vez, se toma con
+    un solo np.asarray y los bloques se suman sobre vistas, así que la
+    memoria es la de la imagen decodificada más su arreglo.
+    """
+    ancho_imagen, alto_imagen = imagen.size
+    x0, y0, x1, y1 = recorte if recorte else (0, 0, ancho_imagen, alto_imagen)
+    x0, x1 = max(0, int(x0)), min(ancho_imagen, int(x1))
+    y0, y1 = max(0, int(y0)), min(alto_imagen, int(y1))
+    if x1 <= x0 or y1 <= y0:
+        raise ValueError(f"Recorte vacío o fuera de la imagen: {recorte}")
+
+    mapa = _bloques_sin_compresion(imagen)
+    if mapa is not None:
+        bloques, canales = mapa
+    else:
+        imagen.load()
+        bloques, canales = [((0, 0, ancho_imagen, alto_imagen), _rgb(imagen))], [0, 1, 2]
+
+    suma = np.zeros((x1 - x0, bloques[0][1].shape[2]), dtype=np.float64)
+    for (bx0, by0, bx1, by1), pixeles in bloques:
+        ix0, ix1 = max(x0, bx0), min(x1, bx1)
+        iy0, iy1 = max(y0, by0), min(y1, by1)
+        if ix0 >= ix1 or iy0 >= iy1:
+            continue
+        for y in range(iy0, iy1, filas_por_bloque):
+            bloque = pixeles[y - by0:min(y + filas_por_bloque, iy1) - by0, ix0 - bx0:ix1 - bx0]
+            suma[ix0 - x0:ix1 - x0] += bloque.sum(axis=0, dtype=np.float64)
+
+    medias = (suma[:, canales] / (y1 - y0)).astype(np.float32)
+    perfiles = np.empty((4, medias.shape[0]), dtype=np.float32)
+    perfiles[:3] = medias.T
+    np.dot(medias, PESOS_GRIS, out=perfiles[3])
+    return perfiles
+
+def vista_previa(imagen, tamano_maximo=(500, 500)):
+    """
+    Copia reducida de `imagen` que cabe en `tamano_maximo`. Los archivos sin
+    compresión se submuestrean desde el mapa en memoria, sin decodificar la
+    imagen completa; los demás se decodifican una vez y la imagen queda
+    cargada para el análisis.
+    """
+    from PIL import Image
+
+    ancho, alto = imagen.size
+    escala = min(tamano_maximo[0] / ancho, tamano_maximo[1] / alto, 1.0)
+    tamano = (max(1, round(ancho * escala)), max(1, round(alto * escala)))
+    mapa = _bloques_sin_compresion(imagen)
+    if mapa is None:
+        return imagen.resize(tamano, Image.LANCZOS, reducing_gap=3.0)
+    bloques, canales = mapa
+    # Solo se leen las filas y columnas de la rejilla submuestreada, franja por franja
+    paso = max(1, int(1 / escala) // 2)
+    ys = np.arange(0, alto, paso)
+    xs = np.arange(0, ancho, paso)
+    muestra = np.empty((len(ys), len(xs), 3), dtype=np.uint8)
+    for (bx0, by0, bx1, by1), pixeles in bloques:
+        filas = np.flatnonzero((ys >= by0) & (ys < by1))
+        columnas = np.flatnonzero((xs >= bx0) & (xs < bx1))
+        if filas.size == 0 or columnas.size == 0:
+            continue
+        submuestra = pixeles[ys[filas[0]] - by0::paso, xs[columnas[0]] - bx0::paso]
+        muestra[filas[0]:filas[-1] + 1, columnas[0]:columnas[-1] + 1] = \
+            submuestra[:filas.size, :columnas.size][:, :, canales]
+    return Image.fromarray(muestra).resize(tamano, Image.LANCZOS)
+
+def cargar_perfiles_imagen(ruta, recorte=None):
+    """
+    Abre una imagen desde disco y devuelve sus perfiles (4, ancho) a
+    resolución completa. `recorte` es un rectángulo (x0, y0, x1, y1) opcional
+    en píxeles de la imagen.
+    """
+    from PIL import Image
+
+    with Image.open(ruta) as imagen:
+        return reducir_por_bloques(imagen, recorte)
+
+class EtapaAnalisis:
+    """
+    Etapa de análisis compartida por todas las vistas. Guarda el último
+    FrameEspectral calculado y lo devuelve sin recalcular mientras el número de
+    secuencia no cambie. Si se indica un `promediador`
+    (promediado.PromediadorTemporal), los perfiles se promedian en el tiempo
+    antes de entregarse.
+    """
+
+    def __init__(self, orden="BGR", promediador=None):
+        self.orden = orden
+        self.promediador = promediador
+        self.ultimo = None
+
+    def procesar(self, secuencia, imagen, marca_tiempo=None, roi=None):
+        if self.ultimo is not None and self.ultimo.secuencia == secuencia:
+            return self.ultimo
+        perfiles = calcular_perfiles(imagen, self.orden)
+        return self._registrar(secuencia, perfiles, imagen.shape[0], marca_tiempo, roi)
+
+    def publicar(self, secuencia, perfiles, alto, marca_tiempo=None, roi=None):
+        """Registra perfiles ya calculados (por ejemplo, recibidos de /profile)."""
+        if self.ultimo is not None and self.ultimo.secuencia == secuencia:
+            return self.ultimo
+        return self._registrar(secuencia, perfiles, alto, marca_tiempo, roi)
+
+    def _registrar(self, secuencia, perfiles, alto, marca_tiempo, roi):
+        if self.promediador is not None:
+            perfiles = self.promediador.agregar(perfiles, roi)
+        self.ultimo = FrameEspectral(secuencia, marca_tiempo, perfiles, alto)
+        return self.ultimo
+
+    def reiniciar(self):
+        self.ultimo = None
+        if self.promediador is not None:
+            self.promediador.reiniciar()
@@ -0,0 +1,157 @@
+"""
+===============================================================================
+Proyecto: Espectrofotómetro Digital En Tiempo Real Para Uso Didáctico
+Descripción:
+Planificador de las vistas de análisis en tiempo real. En lugar de que cada
+vista se redibuje con un `after` fijo, el planificador se activa cuando llega
+un frame con un número de secuencia nuevo, ejecuta solo las vistas visibles y
+ajusta el periodo de cada una según lo que tarda en dibujarse: si el dibujo se
+retrasa, la vista baja su frecuencia en lugar de acumular trabajo.
+
+Librerías:
+- time: Medición de la duración de cada dibujo.
+===============================================================================
+"""
+
+import math
+import time
+
+# =============================================================================
+# Vista planificada
+# =============================================================================
+
+class VistaPlanificada:
+    """
+    Estado de planificación de una vista: último frame dibujado, periodo
+    actual, duración media del dibujo y frecuencia efectiva medida.
+    """
+
+    def __init__(self, nombre, dibujar, visible, periodo_min):
+        self.nombre = nombre
+        self.dibujar = dibujar
+        self.visible = visible
+        self.periodo = periodo_min
+        self.secuencia = 0
+        self.proxima = 0.0
+        self.duracion = 0.0
+        self.frecuencia = 0.0
+        self._ultimo_dibujo = None
+
+    def registrar_dibujo(self, inicio, duracion, secuencia, periodo_min, periodo_max, carga):
+        self.secuencia = secuencia
+        self.duracion = duracion if self.duracion == 0.0 else 0.8 * self.duracion + 0.2 * duracion
+        self.periodo = min(periodo_max, max(periodo_min, self.duracion / carga))
+        self.proxima = inicio + self.periodo
+        if self._ultimo_dibujo is not None:
+            instantanea = 1.0 / max(inicio - self._ultimo_dibujo, 1e-6)
+            self.frecuencia = instantanea if self.frecuencia == 0.0 else 0.8 * self.frecuencia + 0.2 * instantanea
+        self._ultimo_dibujo = inicio
+
+    def pausar(self):
+        self.frecuencia = 0.0
+        self._ultimo_dibujo = None
+
+    def frecuencia_actual(self, ahora, periodo_max):
+        """Frecuencia efectiva, o 0 si la vista lleva demasiado sin dibujarse."""
+        if self._ultimo_dibujo is None or ahora - self._ultimo_dibujo > 2 * periodo_max:
+            return 0.0
+        return self.frecuencia
+
+# =============================================================================
+# Planificador
+# =============================================================================
+
+class PlanificadorVistas:
+    """
+    Planifica el dibujo de varias vistas sobre el bucle de eventos de Tkinter.
+
+    - `widget`: cualquier widget de Tk, usado para after/after_cancel.
+    - `periodo_min`/`periodo_max`: límites del periodo de cada vista (s).
+    - `carga`: fracción máxima del tiempo que una vista puede pasar dibujando;
+      el periodo nunca baja de duración_media / carga.
+    - `instrumentacion`: opcional; cada dibujo se registra como etapa
+      "grafica_<vista>" y cada pasada que dibuja algo como evento "analisis".
+    """
+
+    def __init__(self, widget, periodo_min=0.03, periodo_max=1.0, carga=0.5, instrumentacion=None):
+        self.widget = widget
+        self.instrumentacion = instrumentacion
+        self.periodo_min = periodo_min
+        self.periodo_max = periodo_max
+        self.carga = carga
+        self.vistas = []
+        self._secuencia = 0
+        self._tarea = None
+
+    def registrar(self, nombre, dibujar, visible=lambda: True):
+        vista = VistaPlanificada(nombre, dibujar, visible, self.periodo_min)
+        self.vistas.append(vista)
+        return vista
+
+    def notificar(self, secuencia):
+        """Avisa de que hay un frame nuevo disponible."""
+        if secuencia > self._secuencia:
+            self._secuencia = secuencia
+        self._programar()
+
+    def reiniciar(self):
+        """Olvida las secuencias dibujadas (por ejemplo, al reiniciar el stream)."""
+        self._secuencia = 0
+        for vista in self.vistas:
+            vista.secuencia = 0
+            vista.pausar()
+
+    def detener(self):
+        if self._tarea is not None:
+            self.widget.after_cancel(self._tarea)
+            self._tarea = None
+
+    def _pendientes(self):
+        for vista in self.vistas:
+            if vista.secuencia >= self._secuencia:
+                continue
+            if vista.visible():
+                yield vista
+            else:
+                vista.pausar()
+
+    def _programar(self):
+        if self._tarea is not None:
+            return
+        proximas = [vista.proxima for vista in self._pendientes()]
+        if not proximas:
+            return
+        espera = max(0.0, min(proximas) - time.perf_counter())
+        self._tarea = self.widget.after(math.ceil(espera * 1000), self._ejecutar)
+
+    def _ejecutar(self):
+        self._tarea = None
+        secuencia = self._secuencia
+        dibujadas = 0
+        for vista in list(self._pendientes()):
+            inicio = time.perf_counter()
+            if inicio < vista.proxima:
+                continue
+            try:
+                vista.dibujar()
+            except Exception as e:
+                print(f"Error al dibujar la vista {vista.nombre}: {e}")
+            duracion = time.perf_counter() - inicio
+            vista.registrar_dibujo(inicio, duracion, secuencia, self.periodo_min, self.periodo_max, self.carga)
+            if self.instrumentacion is not None:
+                self.instrumentacion.registrar("grafica_" + vista.nombre.lower(), duracion)
+            dibujadas += 1
+        if dibujadas and self.instrumentacion is not None:
+            self.instrumentacion.marcar("analisis")
+        self._programar()
+
+    def texto_estado(self):
+        ahora = time.perf_counter()
+        partes = []
+        for vista in self.vistas:
+            frecuencia = vista.frecuencia_actual(ahora, self.periodo_max)
+            if frecuencia > 0:
+                partes.append(f"{vista.nombre}: {frecuencia:.1f} Hz")
+            else:
+                partes.append(f"{vista.nombre}: en pausa")
+        return " | ".join(partes)
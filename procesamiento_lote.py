@@ -0,0 +1,296 @@
+"""
+===============================================================================
+Proyecto: Espectrofotómetro Digital En Tiempo Real Para Uso Didáctico
+Descripción:
+Extracción de perfiles espectrales por lotes, sin interfaz gráfica. Recibe un
+directorio o un patrón glob de imágenes, un recorte (ROI) opcional y, si se
+desea, imágenes de oscuro y de referencia. Los perfiles se calculan en paralelo
+con un pool de procesos y se escriben en una sola tabla CSV o NPZ.
+
+Las ejecuciones se pueden reanudar: las imágenes que ya aparecen en la tabla de
+salida se omiten. En CSV cada imagen se agrega y se vacía a disco en cuanto
+termina; en NPZ la tabla se reescribe de forma atómica cada cierto número de
+imágenes.
+
+Uso:
+    python procesamiento_lote.py Capturas -o perfiles.csv
+    python procesamiento_lote.py "Capturas/*.png" -o perfiles.npz \\
+        --recorte 0 200 1600 260 --referencia Capturas/referencia.png
+
+Librerías:
+- concurrent.futures: Pool de procesos.
+- NumPy: Perfiles y tabla NPZ.
+- Pillow (PIL): Lectura de imágenes (a través de perfiles.py).
+===============================================================================
+"""
+
+import argparse
+import csv
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from calibracion import CalibracionFotometrica
+from perfiles import cargar_perfiles_imagen, EXTENSIONES_IMAGEN
+
+CANALES = ("R", "G", "B", "gris")
+
+# =============================================================================
+# Entrada
+# =============================================================================
+
+def listar_imagenes(entradas):
+    """
+    Expande directorios y patrones glob en una lista ordenada y sin repetidos
+    de rutas de imágenes.
+    """
+    rutas = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            candidatas = [os.path.join(entrada, nombre) for nombre in os.listdir(entrada)]
+        else:
+            candidatas = glob.glob(entrada)
+        rutas.extend(ruta for ruta in candidatas
+                     if os.path.isfile(ruta) and ruta.lower().endswith(EXTENSIONES_IMAGEN))
+    return sorted(set(os.path.normpath(ruta) for ruta in rutas))
+
+def _procesar_imagen(tarea):
+    """Trabajo de cada proceso: devuelve (ruta, perfiles, error)."""
+    ruta, recorte = tarea
+    try:
+        return ruta, cargar_perfiles_imagen(ruta, recorte), None
+    except (OSError, ValueError) as e:
+        return ruta, None, str(e)
+
+# =============================================================================
+# Tablas de salida
+# =============================================================================
+
+class TablaCSV:
+    """
+    Tabla CSV con una fila por imagen y canal: archivo, canal, valores por
+    columna. Cada imagen se escribe completa y se vacía a disco, de modo que una
+    ejecución interrumpida pierde como mucho la imagen en curso.
+    """
+
+    def __init__(self, ruta, canales):
+        self.ruta = ruta
+        self.canales = canales
+        self._archivo = None
+        self._escritor = None
+
+    def procesados(self):
+        """Archivos con todas sus filas en la tabla."""
+        if not os.path.exists(self.ruta):
+            return set()
+        self._descartar_imagen_incompleta()
+        filas_por_archivo = {}
+        with open(self.ruta, newline="", encoding="utf-8") as f:
+            lector = csv.reader(f)
+            next(lector, None)
+            for fila in lector:
+                if len(fila) >= 2:
+                    filas_por_archivo.setdefault(fila[0], set()).add(fila[1])
+        return {archivo for archivo, canales in filas_por_archivo.items()
+                if canales.issuperset(self.canales)}
+
+    def _descartar_imagen_incompleta(self):
+        """
+        Si la ejecución anterior se cortó mientras escribía una imagen, se
+        recorta la tabla al inicio de esa imagen: primero la línea a medias y
+        luego las filas de canales ya escritas, que se volverán a calcular.
+        """
+        with open(self.ruta, "rb+") as f:
+            datos = f.read()
+            corte = datos.rfind(b"\n") + 1
+            lineas = datos[:corte].splitlines(keepends=True)
+            # Las filas de una imagen son consecutivas: solo la última puede estar incompleta
+            ultimo = None
+            canales = set()
+            for linea in reversed(lineas[1:]):
+                fila = next(csv.reader([linea.decode("utf-8")]), [])
+                if len(fila) < 2 or (ultimo is not None and fila[0] != ultimo):
+                    break
+                ultimo = fila[0]
+                canales.add(fila[1])
+                corte -= len(linea)
+            if ultimo is not None and canales.issuperset(self.canales):
+                corte = datos.rfind(b"\n") + 1
+            if corte < len(datos):
+                f.truncate(corte)
+
+    def abrir(self, ancho):
+        nueva = not os.path.exists(self.ruta) or os.path.getsize(self.ruta) == 0
+        self._archivo = open(self.ruta, "a", newline="", encoding="utf-8")
+        self._escritor = csv.writer(self._archivo)
+        if nueva:
+            self._escritor.writerow(["archivo", "canal"] + [f"x{i}" for i in range(ancho)])
+
+    def agregar(self, archivo, filas):
+        for canal, valores in zip(self.canales, filas):
+            self._escritor.writerow([archivo, canal] + [f"{v:.4f}" for v in valores])
+        self._archivo.flush()
+
+    def cerrar(self):
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
+
+class TablaNPZ:
+    """
+    Tabla NPZ con los arreglos `archivos` (N,), `perfiles` (N, 4, ancho) y,
+    si hay referencia, `absorbancia` (N, 4, ancho). Las imágenes de distinto
+    ancho se rellenan con NaN hasta el ancho máximo; `anchos` guarda el ancho
+    real de cada una.
+    """
+
+    def __init__(self, ruta, canales, guardar_cada=50):
+        self.ruta = ruta
+        self.canales = canales
+        self.guardar_cada = guardar_cada
+        self._archivos = []
+        self._filas = []
+        self._pendientes = 0
+
+    def procesados(self):
+        if not os.path.exists(self.ruta):
+            return set()
+        with np.load(self.ruta, allow_pickle=False) as datos:
+            archivos = [str(a) for a in datos["archivos"]]
+            anchos = datos["anchos"]
+            perfiles = datos["perfiles"]
+            absorbancia = datos["absorbancia"] if "absorbancia" in datos else None
+        if (absorbancia is not None) != (len(self.canales) > len(CANALES)):
+            raise ValueError(f"{self.ruta} se generó con otra calibración; use otro archivo de salida.")
+        for i, archivo in enumerate(archivos):
+            filas = perfiles[i, :, :anchos[i]]
+            if absorbancia is not None:
+                filas = np.vstack([filas, absorbancia[i, :, :anchos[i]]])
+            self._archivos.append(archivo)
+            self._filas.append(filas)
+        return set(self._archivos)
+
+    def abrir(self, ancho):
+        pass
+
+    def agregar(self, archivo, filas):
+        self._archivos.append(archivo)
+        self._filas.append(np.asarray(filas, dtype=np.float32))
+        self._pendientes += 1
+        if self._pendientes >= self.guardar_cada:
+            self._guardar()
+
+    def _guardar(self):
+        if not self._archivos:
+            return
+        ancho = max(filas.shape[1] for filas in self._filas)
+        tabla = np.full((len(self._filas), len(self.canales), ancho), np.nan, dtype=np.float32)
+        for i, filas in enumerate(self._filas):
+            tabla[i, :, :filas.shape[1]] = filas
+        arreglos = {
+            "archivos": np.array(self._archivos),
+            "anchos": np.array([filas.shape[1] for filas in self._filas]),
+            "perfiles": tabla[:, :len(CANALES)],
+        }
+        if len(self.canales) > len(CANALES):
+            arreglos["absorbancia"] = tabla[:, len(CANALES):]
+        # Escritura atómica: una interrupción nunca deja la tabla a medias
+        temporal = self.ruta + ".tmp.npz"
+        np.savez(temporal, **arreglos)
+        os.replace(temporal, self.ruta)
+        self._pendientes = 0
+
+    def cerrar(self):
+        if self._pendientes:
+            self._guardar()
+
+# =============================================================================
+# Procesamiento por lotes
+# =============================================================================
+
+def procesar_lote(rutas, salida, recorte=None, oscuro=None, referencia=None,
+                  trabajadores=None, guardar_cada=50):
+    """
+    Extrae los perfiles de `rutas` en paralelo y los agrega a la tabla
+    `salida` (.csv o .npz), omitiendo las imágenes ya procesadas. `oscuro` y
+    `referencia` son rutas opcionales de imágenes de calibración, recortadas
+    con el mismo `recorte`. Devuelve (procesadas, omitidas, fallidas).
+    """
+    calibracion = CalibracionFotometrica()
+    if oscuro:
+        calibracion.fijar_oscuro(cargar_perfiles_imagen(oscuro, recorte), recorte)
+    if referencia:
+        calibracion.fijar_referencia(cargar_perfiles_imagen(referencia, recorte), recorte)
+
+    canales = CANALES
+    if calibracion.calibrada:
+        canales = CANALES + tuple("A_" + canal for canal in CANALES)
+
+    if salida.lower().endswith(".npz"):
+        tabla = TablaNPZ(salida, canales, guardar_cada)
+    else:
+        tabla = TablaCSV(salida, canales)
+
+    hechos = tabla.procesados()
+    pendientes = [ruta for ruta in rutas if ruta not in hechos]
+    omitidas = len(rutas) - len(pendientes)
+    print(f"{len(rutas)} imágenes, {omitidas} ya procesadas, {len(pendientes)} pendientes.")
+    if not pendientes:
+        return 0, omitidas, 0
+
+    procesadas = fallidas = 0
+    inicio = time.perf_counter()
+    trabajadores = trabajadores or os.cpu_count() or 1
+    # Bloques de varias imágenes por envío para amortizar el costo de comunicación
+    bloque = max(1, min(16, len(pendientes) // (4 * trabajadores)))
+    tareas = [(ruta, recorte) for ruta in pendientes]
+    try:
+        with ProcessPoolExecutor(max_workers=trabajadores) as pool:
+            for ruta, perfiles, error in pool.map(_procesar_imagen, tareas, chunksize=bloque):
+                if error is not None:
+                    print(f"Error al procesar {ruta}: {error}")
+                    fallidas += 1
+                    continue
+                if calibracion.calibrada and not calibracion.valida_para(recorte, perfiles.shape[1]):
+                    print(f"Error al procesar {ruta}: tiene {perfiles.shape[1]} columnas y la referencia "
+                          f"{calibracion.ancho}.")
+                    fallidas += 1
+                    continue
+                if procesadas == 0:
+                    tabla.abrir(perfiles.shape[1])
+                filas = perfiles
+                if calibracion.calibrada:
+                    filas = np.vstack([perfiles, calibracion.absorbancia(perfiles)])
+                tabla.agregar(ruta, filas)
+                procesadas += 1
+    finally:
+        tabla.cerrar()
+
+    duracion = time.perf_counter() - inicio
+    print(f"{procesadas} imágenes procesadas en {duracion:.1f} s "
+          f"({procesadas / max(duracion, 1e-9):.1f} imágenes/s), {fallidas} con error.")
+    return procesadas, omitidas, fallidas
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extrae perfiles espectrales de un lote de imágenes.")
+    parser.add_argument("entradas", nargs="+", help="Directorios o patrones glob de imágenes.")
+    parser.add_argument("-o", "--salida", default="perfiles.csv", help="Tabla de salida (.csv o .npz).")
+    parser.add_argument("--recorte", type=int, nargs=4, metavar=("X0", "Y0", "X1", "Y1"),
+                        help="ROI en píxeles de la imagen.")
+    parser.add_argument("--oscuro", help="Imagen de oscuro.")
+    parser.add_argument("--referencia", help="Imagen de referencia (I0); agrega la absorbancia.")
+    parser.add_argument("--trabajadores", type=int, default=None, help="Procesos (por defecto, uno por núcleo).")
+    parser.add_argument("--guardar-cada", type=int, default=50, help="Imágenes entre guardados de la tabla NPZ.")
+    args = parser.parse_args()
+
+    rutas = listar_imagenes(args.entradas)
+    if not rutas:
+        parser.error("No se encontraron imágenes en las entradas indicadas.")
+    try:
+        procesar_lote(rutas, args.salida, tuple(args.recorte) if args.recorte else None,
+                      args.oscuro, args.referencia, args.trabajadores, args.guardar_cada)
+    except ValueError as e:
+        parser.error(str(e))
@@ -0,0 +1,123 @@
+"""
+===============================================================================
+Proyecto: Espectrofotómetro Digital En Tiempo Real Para Uso Didáctico
+Descripción:
+Promediado temporal de los perfiles espectrales para reducir el ruido de los
+espectros en vivo. Se ofrecen tres modos: promedio acumulado, media móvil
+exponencial y promedio de ventana (boxcar) de N frames. Todos trabajan sobre
+acumuladores float32 preasignados que se actualizan en sitio, sin crear
+arreglos nuevos por frame, y se reinician solos cuando cambia el ROI.
+
+Librerías:
+- NumPy: Acumuladores y operaciones en sitio.
+===============================================================================
+"""
+
+import numpy as np
+
+SIN_PROMEDIO = "ninguno"
+PROMEDIO_ACUMULADO = "acumulado"
+MEDIA_EXPONENCIAL = "exponencial"
+VENTANA_N_FRAMES = "ventana"
+
+MODOS_PROMEDIO = {
+    SIN_PROMEDIO: "Sin promedio",
+    PROMEDIO_ACUMULADO: "Promedio acumulado",
+    MEDIA_EXPONENCIAL: "Media exponencial",
+    VENTANA_N_FRAMES: "Ventana de N frames",
+}
+
+# =============================================================================
+# Promediador temporal
+# =============================================================================
+
+class PromediadorTemporal:
+    """
+    Aplica el promediado seleccionado a perfiles de forma (canales, ancho).
+
+    - `modo`: una de las constantes de MODOS_PROMEDIO.
+    - `n_frames`: tamaño de la ventana para el modo "ventana".
+    - `alfa`: peso del frame nuevo en la media exponencial (0 < alfa <= 1).
+    """
+
+    def __init__(self, modo=SIN_PROMEDIO, n_frames=10, alfa=0.2):
+        self.modo = modo
+        self.n_frames = n_frames
+        self.alfa = alfa
+        self.frames_promediados = 0
+        self._clave = None
+        self._forma = None
+        self._media = None
+        self._suma = None
+        self._ventana = None
+        self._temporal = None
+        self._indice = 0
+
+    def configurar(self, modo=None, n_frames=None, alfa=None):
+        """Cambia los parámetros y descarta lo acumulado."""
+        if modo is not None:
+            if modo not in MODOS_PROMEDIO:
+                raise ValueError(f"Modo de promediado desconocido: {modo}")
+            self.modo = modo
+        if n_frames is not None:
+            self.n_frames = max(1, int(n_frames))
+        if alfa is not None:
+            self.alfa = min(1.0, max(1e-3, float(alfa)))
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.frames_promediados = 0
+        self._clave = None
+        self._forma = None
+        self._indice = 0
+
+    def _preparar(self, forma, clave):
+        if forma == self._forma and clave == self._clave:
+            return
+        self._forma = forma
+        self._clave = clave
+        self.frames_promediados = 0
+        self._indice = 0
+        self._media = np.zeros(forma, dtype=np.float32)
+        self._temporal = np.empty(forma, dtype=np.float32)
+        if self.modo == VENTANA_N_FRAMES:
+            self._suma = np.zeros(forma, dtype=np.float32)
+            self._ventana = np.zeros((self.n_frames,) + forma, dtype=np.float32)
+        else:
+            self._suma = None
+            self._ventana = None
+
+    def agregar(self, perfiles, clave=None):
+        """
+        Incorpora un frame y devuelve el perfil promediado. El resultado es una
+        vista de un buffer interno que se sobrescribe con el siguiente frame.
+        `clave` identifica el ROI; si cambia, los acumuladores se reinician.
+        """
+        if self.modo == SIN_PROMEDIO:
+            return perfiles
+
+        self._preparar(perfiles.shape, clave)
+        self.frames_promediados += 1
+        media = self._media
+
+        if self.frames_promediados == 1 and self.modo != VENTANA_N_FRAMES:
+            media[...] = perfiles
+        elif self.modo == PROMEDIO_ACUMULADO:
+            np.subtract(perfiles, media, out=self._temporal)
+            self._temporal *= 1.0 / self.frames_promediados
+            media += self._temporal
+        elif self.modo == MEDIA_EXPONENCIAL:
+            np.subtract(perfiles, media, out=self._temporal)
+            self._temporal *= self.alfa
+            media += self._temporal
+        elif self.modo == VENTANA_N_FRAMES:
+            ranura = self._ventana[self._indice]
+            self._suma -= ranura
+            ranura[...] = perfiles
+            self._suma += ranura
+            self._indice = (self._indice + 1) % self.n_frames
+            # Deriva numérica del float32: se recalcula la suma en cada vuelta completa
+            if self._indice == 0:
+                self._ventana.sum(axis=0, out=self._suma)
+            np.multiply(self._suma, 1.0 / min(self.frames_promediados, self.n_frames), out=media)
+        return media
@@ -0,0 +1,346 @@
+"""
+===============================================================================
+Proyecto: Espectrofotómetro Digital En Tiempo Real Para Uso Didáctico
+Descripción:
+Publicación local de los espectros en vivo para otras herramientas del
+laboratorio (registradores, scripts de control). La interfaz codifica cada
+perfil una sola vez y lo reparte a todos los suscriptores conectados a
+http://127.0.0.1:8090/espectro, con el mismo formato multipart que /stream y
+/profile de la cámara, así que ningún programa externo necesita abrir su
+propia conexión con la ESP32-CAM.
+
+Cada suscriptor tiene una cola de pocas partes: si no la vacía a tiempo (la
+cola se llena o un envío tarda más que `timeout_envio`), se le desconecta en
+lugar de frenar la captura. Un GET a / devuelve en JSON la descripción del
+formato y el número de suscriptores.
+
+Formato de cada parte (little endian):
+- Cabecera de 28 bytes: magic "ESPC", versión (u8), canales (u8), banderas
+  (u8), reservado (u8), secuencia (u32), marca de tiempo (f64, segundos
+  Unix de la recepción del frame), x0, y0, ancho y alto del ROI (u16 cada uno).
+- Si la bandera NM está activa: eje de longitudes de onda, `ancho` float32.
+- Planos R, G, B y gris de `ancho` valores float32 (medias en 0-255).
+
+Banderas: 1 = eje en nm, 2 = oscuro capturado, 4 = referencia capturada,
+8 = franja enderezada.
+
+Uso:
+    python publicacion.py http://127.0.0.1:8090/espectro --segundos 10
+
+Librerías:
+- http.server: Servidor HTTP con un hilo por suscriptor.
+- cliente_mjpeg (módulo local): Lectura del stream multipart en los clientes.
+===============================================================================
+"""
+
+import argparse
+import json
+import queue
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from cliente_mjpeg import ClienteMJPEG
+
+PUERTO_PUBLICACION = 8090
+RUTA_ESPECTRO = "/espectro"
+
+# Partes pendientes por suscriptor antes de desconectarlo por lento
+CAPACIDAD_COLA = 8
+# Segundos máximos que puede bloquearse un envío a un suscriptor
+TIMEOUT_ENVIO = 2.0
+
+MAGIC_ESPECTRO = b"ESPC"
+VERSION_ESPECTRO = 1
+CABECERA_ESPECTRO = struct.Struct("<4sBBBBIdHHHH")
+
+BANDERA_NM = 1
+BANDERA_OSCURO = 2
+BANDERA_REFERENCIA = 4
+BANDERA_ENDEREZADO = 8
+
+PART_BOUNDARY = "espectrofotometro-espectro"
+CONTENT_TYPE = "multipart/x-mixed-replace;boundary=" + PART_BOUNDARY
+BOUNDARY = ("\r\n--" + PART_BOUNDARY + "\r\n").encode("ascii")
+CABECERA_PARTE = "Content-Type: application/octet-stream\r\nContent-Length: %u\r\nX-Timestamp: %.6f\r\n\r\n"
+
+# =============================================================================
+# Formato binario
+# =============================================================================
+
+class EspectroPublicado:
+    """
+    Espectro recibido de la publicación. `perfiles` es un arreglo float32
+    (4, ancho) con R, G, B y gris; `eje` son las longitudes de onda en nm o
+    None si la interfaz no tiene calibración en longitud de onda.
+    """
+
+    __slots__ = ("secuencia", "marca_tiempo", "perfiles", "eje", "roi", "alto", "banderas",
+                 "marca_dispositivo", "marca_recepcion")
+
+    def __init__(self, secuencia, marca_tiempo, perfiles, eje, roi, alto, banderas,
+                 marca_dispositivo=None, marca_recepcion=None):
+        self.secuencia = secuencia
+        self.marca_tiempo = marca_tiempo
+        self.perfiles = perfiles
+        self.eje = eje
+        self.roi = roi
+        self.alto = alto
+        self.banderas = banderas
+        self.marca_dispositivo = marca_dispositivo
+        self.marca_recepcion = marca_recepcion
+
+    @property
+    def gris(self):
+        return self.perfiles[3]
+
+    @property
+    def oscuro(self):
+        return bool(self.banderas & BANDERA_OSCURO)
+
+    @property
+    def referencia(self):
+        return bool(self.banderas & BANDERA_REFERENCIA)
+
+    @property
+    def enderezado(self):
+        return bool(self.banderas & BANDERA_ENDEREZADO)
+
+def codificar_espectro(secuencia, marca_tiempo, perfiles, roi=None, alto=1, eje=None,
+                       oscuro=False, referencia=False, enderezado=False):
+    """
+    Codifica perfiles (4, ancho) con su marca de tiempo (segundos Unix), el
+    ROI (x0, y0, x1, y1) del frame completo, el eje en nm opcional y el
+    estado de la calibración.
+    """
+    perfiles = np.asarray(perfiles, dtype="<f4")
+    canales, ancho = perfiles.shape
+    x0, y0 = (roi[0], roi[1]) if roi else (0, 0)
+    banderas = ((BANDERA_NM if eje is not None else 0) | (BANDERA_OSCURO if oscuro else 0)
+                | (BANDERA_REFERENCIA if referencia else 0) | (BANDERA_ENDEREZADO if enderezado else 0))
+    cabecera = CABECERA_ESPECTRO.pack(MAGIC_ESPECTRO, VERSION_ESPECTRO, canales, banderas, 0,
+                                      secuencia & 0xFFFFFFFF, marca_tiempo, x0, y0, ancho, alto)
+    if eje is None:
+        return cabecera + perfiles.tobytes()
+    return cabecera + np.asarray(eje, dtype="<f4").tobytes() + perfiles.tobytes()
+
+def decodificar_espectro(datos, marca_dispositivo=None, marca_recepcion=None):
+    """Convierte una parte binaria de /espectro en un EspectroPublicado."""
+    (magic, version, canales, banderas, _, secuencia, marca_tiempo,
+     x0, y0, ancho, alto) = CABECERA_ESPECTRO.unpack_from(datos)
+    if magic != MAGIC_ESPECTRO or version != VERSION_ESPECTRO:
+        raise ValueError("Parte de espectro con formato desconocido.")
+    desplazamiento = CABECERA_ESPECTRO.size
+    eje = None
+    if banderas & BANDERA_NM:
+        eje = np.frombuffer(datos, dtype="<f4", count=ancho, offset=desplazamiento)
+        desplazamiento += 4 * ancho
+    perfiles = np.frombuffer(datos, dtype="<f4", count=canales * ancho, offset=desplazamiento)
+    return EspectroPublicado(secuencia, marca_tiempo, perfiles.reshape(canales, ancho), eje,
+                             (x0, y0, x0 + ancho, y0 + alto), alto, banderas, marca_dispositivo, marca_recepcion)
+
+# =============================================================================
+# Servidor de publicación
+# =============================================================================
+
+class _Suscriptor:
+    __slots__ = ("direccion", "cola", "enviados")
+
+    def __init__(self, direccion, capacidad):
+        self.direccion = direccion
+        self.cola = queue.Queue(capacidad)
+        self.enviados = 0
+
+class _ManejadorPublicacion(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, formato, *args):
+        pass
+
+    def do_GET(self):
+        ruta = urlsplit(self.path).path
+        if ruta == RUTA_ESPECTRO:
+            self._transmitir()
+        elif ruta == "/":
+            self._describir()
+        else:
+            self.send_error(404)
+
+    def _describir(self):
+        servidor = self.server
+        cuerpo = json.dumps({
+            "espectro": RUTA_ESPECTRO,
+            "formato": {
+                "cabecera": CABECERA_ESPECTRO.format,
+                "campos": ["magic", "version", "canales", "banderas", "reservado", "secuencia",
+                           "marca_tiempo", "x0", "y0", "ancho", "alto"],
+                "banderas": {"nm": BANDERA_NM, "oscuro": BANDERA_OSCURO,
+                             "referencia": BANDERA_REFERENCIA, "enderezado": BANDERA_ENDEREZADO},
+                "datos": "eje float32[ancho] si nm, luego R, G, B, gris float32[ancho]",
+            },
+            "suscriptores": servidor.suscriptores,
+            "publicados": servidor.publicados,
+            "desconectados_lentos": servidor.desconectados_lentos,
+        }, ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _transmitir(self):
+        servidor = self.server
+        suscriptor = servidor.suscribir(self.client_address)
+        self.close_connection = True
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.end_headers()
+            # Un envío bloqueado más de timeout_envio (cliente que no lee) termina la suscripción
+            self.connection.settimeout(servidor.timeout_envio)
+            while not servidor.detenido.is_set():
+                elemento = suscriptor.cola.get()
+                if elemento is None:
+                    break
+                datos, marca = elemento
+                parte = BOUNDARY + (CABECERA_PARTE % (len(datos), marca)).encode("ascii") + datos
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(parte), parte))
+                suscriptor.enviados += 1
+        except OSError:
+            pass
+        finally:
+            servidor.desuscribir(suscriptor)
+
+class PublicadorEspectros(ThreadingHTTPServer):
+    """
+    Servidor local de espectros. `publicar()` se llama desde el pipeline con
+    cada parte ya codificada y nunca se bloquea: solo encola la parte para
+    cada suscriptor y desconecta a los que tienen la cola llena. Se puede usar
+    como context manager.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, puerto=PUERTO_PUBLICACION, host="127.0.0.1", capacidad=CAPACIDAD_COLA,
+                 timeout_envio=TIMEOUT_ENVIO):
+        super().__init__((host, puerto), _ManejadorPublicacion)
+        self.capacidad = capacidad
+        self.timeout_envio = timeout_envio
+        self.publicados = 0
+        self.desconectados_lentos = 0
+        self.detenido = threading.Event()
+        self._suscriptores = []
+        self._lock = threading.Lock()
+        self._hilo = None
+
+    @property
+    def url(self):
+        host, puerto = self.server_address[:2]
+        return f"http://{host}:{puerto}{RUTA_ESPECTRO}"
+
+    @property
+    def suscriptores(self):
+        return len(self._suscriptores)
+
+    def suscribir(self, direccion):
+        suscriptor = _Suscriptor(direccion, self.capacidad)
+        with self._lock:
+            self._suscriptores = self._suscriptores + [suscriptor]
+        print(f"Suscriptor conectado: {direccion[0]}:{direccion[1]}")
+        return suscriptor
+
+    def desuscribir(self, suscriptor):
+        with self._lock:
+            if suscriptor not in self._suscriptores:
+                return
+            self._suscriptores = [s for s in self._suscriptores if s is not suscriptor]
+        print(f"Suscriptor desconectado: {suscriptor.direccion[0]}:{suscriptor.direccion[1]} "
+              f"({suscriptor.enviados} espectros enviados)")
+
+    def publicar(self, datos, marca_tiempo):
+        # La lista se reemplaza en cada cambio, así que se puede recorrer sin el lock
+        for suscriptor in self._suscriptores:
+            try:
+                suscriptor.cola.put_nowait((datos, marca_tiempo))
+            except queue.Full:
+                self._descartar(suscriptor)
+        self.publicados += 1
+
+    def _descartar(self, suscriptor):
+        self.desconectados_lentos += 1
+        print(f"Suscriptor {suscriptor.direccion[0]}:{suscriptor.direccion[1]} demasiado lento: se desconecta.")
+        self.desuscribir(suscriptor)
+        self._despertar(suscriptor)
+
+    def _despertar(self, suscriptor):
+        # Vacía la cola y deja la marca de fin para que el hilo del suscriptor termine
+        try:
+            while True:
+                suscriptor.cola.get_nowait()
+        except queue.Empty:
+            pass
+        suscriptor.cola.put_nowait(None)
+
+    def iniciar(self):
+        self._hilo = threading.Thread(target=self.serve_forever, name="PublicadorEspectros", daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        self.detenido.set()
+        with self._lock:
+            suscriptores, self._suscriptores = self._suscriptores, []
+        for suscriptor in suscriptores:
+            self._despertar(suscriptor)
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.detener()
+
+# =============================================================================
+# Cliente
+# =============================================================================
+
+class ClienteEspectros(ClienteMJPEG):
+    """
+    Suscriptor de /espectro: cada parte se convierte en un EspectroPublicado.
+    Se usa igual que ClienteMJPEG (leer_parte() o read()).
+    """
+
+    def _crear_frame(self, datos, marca_dispositivo, marca_recepcion):
+        return decodificar_espectro(datos, marca_dispositivo, marca_recepcion)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Se suscribe a los espectros publicados por la interfaz.")
+    parser.add_argument("url", nargs="?", default=f"http://127.0.0.1:{PUERTO_PUBLICACION}{RUTA_ESPECTRO}")
+    parser.add_argument("--segundos", type=float, default=10.0)
+    args = parser.parse_args()
+
+    cliente = ClienteEspectros(args.url)
+    cliente.conectar()
+    inicio = time.perf_counter()
+    recibidos = 0
+    try:
+        while time.perf_counter() - inicio < args.segundos:
+            espectro = cliente.leer_parte()
+            recibidos += 1
+            retraso = time.time() - espectro.marca_tiempo
+            unidades = "nm" if espectro.eje is not None else "px"
+            print(f"#{espectro.secuencia}: {espectro.perfiles.shape[1]} columnas ({unidades}), "
+                  f"máximo {espectro.gris.max():.1f}, retraso {retraso * 1000:.0f} ms")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cliente.release()
+    transcurrido = time.perf_counter() - inicio
+    print(f"{recibidos} espectros en {transcurrido:.1f} s ({recibidos / transcurrido:.1f} por segundo)")
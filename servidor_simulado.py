@@ -0,0 +1,239 @@
+"""
+===============================================================================
+Proyecto: Espectrofotómetro Digital En Tiempo Real Para Uso Didáctico
+Descripción:
+Servidor HTTP local que imita los endpoints /stream y /profile de la
+ESP32-CAM. Reproduce el mismo formato que `stream_handler` y
+`profile_handler` en CameraWebServer/app_httpd.cpp (multipart/x-mixed-replace
+con Transfer-Encoding: chunked, cabeceras Content-Length y X-Timestamp por
+parte) usando espectros sintéticos, para probar los clientes sin una cámara
+física. También puede cortar las conexiones o dejar de enviar frames cada
+cierto tiempo, para probar la reconexión automática.
+
+Uso:
+    python servidor_simulado.py --puerto 8081 --fps 30
+    python servidor_simulado.py --cortar-cada 10 --congelar-cada 25 --duracion-congelado 6
+y en la interfaz usar la URL http://127.0.0.1:8081/stream
+
+Librerías:
+- http.server: Servidor HTTP local.
+- OpenCV (cv2) y NumPy: Generación y codificación de los frames sintéticos.
+===============================================================================
+"""
+
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import cv2
+import numpy as np
+
+from cliente_perfiles import codificar_perfil
+from perfiles import calcular_perfiles
+
+PART_BOUNDARY = "123456789000000000000987654321"
+STREAM_CONTENT_TYPE = "multipart/x-mixed-replace;boundary=" + PART_BOUNDARY
+STREAM_BOUNDARY = ("\r\n--" + PART_BOUNDARY + "\r\n").encode("ascii")
+STREAM_PART = "Content-Type: image/jpeg\r\nContent-Length: %u\r\nX-Timestamp: %d.%06d\r\n\r\n"
+PROFILE_PART = "Content-Type: application/octet-stream\r\nContent-Length: %u\r\nX-Timestamp: %d.%06d\r\n\r\n"
+
+# =============================================================================
+# Frames sintéticos
+# =============================================================================
+
+def generar_espectro_sintetico(ancho, alto, desplazamiento=0.0, ruido=4.0, rng=None):
+    """
+    Genera una imagen BGR con una franja horizontal de colores tipo espectro
+    de difracción y dos líneas de emisión que se desplazan con
+    `desplazamiento` (en píxeles).
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    x = np.arange(ancho, dtype=np.float32)
+    posicion = x / max(ancho - 1, 1)
+    tono = (posicion * 130).astype(np.uint8)
+    hsv = np.empty((1, ancho, 3), dtype=np.uint8)
+    hsv[..., 0] = 130 - tono
+    hsv[..., 1] = 255
+    hsv[..., 2] = 255
+    fila = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR).astype(np.float32)[0]
+
+    envolvente = 0.35 + 0.65 * np.exp(-0.5 * ((x - 0.5 * ancho) / (0.25 * ancho)) ** 2)
+    for centro, ancho_linea in ((0.3 * ancho + desplazamiento, 3.0), (0.7 * ancho + desplazamiento, 4.0)):
+        envolvente = envolvente + 0.8 * np.exp(-0.5 * ((x - centro) / ancho_linea) ** 2)
+    fila *= np.clip(envolvente, 0, 1.5)[:, None] / 1.5
+
+    y = np.arange(alto, dtype=np.float32)
+    franja = np.exp(-0.5 * ((y - 0.5 * alto) / (0.15 * alto)) ** 2)
+    imagen = franja[:, None, None] * fila[None, :, :]
+    if ruido:
+        imagen += rng.normal(0, ruido, imagen.shape).astype(np.float32)
+    return np.clip(imagen, 0, 255).astype(np.uint8)
+
+def generar_jpegs_sinteticos(ancho=640, alto=480, cantidad=30, calidad=80):
+    """Precodifica `cantidad` frames JPEG sintéticos para emitirlos en bucle."""
+    rng = np.random.default_rng(0)
+    jpegs = []
+    for i in range(cantidad):
+        desplazamiento = 10.0 * np.sin(2 * np.pi * i / cantidad)
+        imagen = generar_espectro_sintetico(ancho, alto, desplazamiento, rng=rng)
+        ok, datos = cv2.imencode(".jpg", imagen, [cv2.IMWRITE_JPEG_QUALITY, calidad])
+        if ok:
+            jpegs.append(datos.tobytes())
+    return jpegs
+
+def generar_perfiles_sinteticos(ancho=640, alto=480, cantidad=30, recorte=None):
+    """
+    Precalcula `cantidad` partes binarias de /profile a partir de espectros
+    sintéticos, aplicando el ROI (x0, y0, x1, y1) igual que el firmware.
+    """
+    x0, y0, x1, y1 = recorte if recorte else (0, 0, 0, 0)
+    x0 = min(max(x0, 0), ancho - 1)
+    y0 = min(max(y0, 0), alto - 1)
+    x1 = ancho if x1 <= x0 or x1 > ancho else x1
+    y1 = alto if y1 <= y0 or y1 > alto else y1
+
+    rng = np.random.default_rng(0)
+    partes = []
+    for i in range(cantidad):
+        desplazamiento = 10.0 * np.sin(2 * np.pi * i / cantidad)
+        imagen = generar_espectro_sintetico(ancho, alto, desplazamiento, rng=rng)
+        rgb = calcular_perfiles(imagen[y0:y1, x0:x1], "BGR")[:3]
+        partes.append(codificar_perfil(rgb, x0, y0, y1 - y0, (ancho, alto)))
+    return partes
+
+# =============================================================================
+# Servidor HTTP
+# =============================================================================
+
+class _ManejadorStream(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, formato, *args):
+        pass
+
+    def _enviar_fragmento(self, datos):
+        self.wfile.write(b"%x\r\n" % len(datos))
+        self.wfile.write(datos)
+        self.wfile.write(b"\r\n")
+
+    def do_GET(self):
+        servidor = self.server
+        ruta = urlsplit(self.path)
+        if ruta.path == "/stream":
+            partes, cabecera_parte = servidor.jpegs, STREAM_PART
+        elif ruta.path == "/profile":
+            consulta = {clave: int(valor[0]) for clave, valor in parse_qs(ruta.query).items()}
+            recorte = tuple(consulta.get(clave, 0) for clave in ("x0", "y0", "x1", "y1"))
+            partes = generar_perfiles_sinteticos(servidor.ancho, servidor.alto, recorte=recorte)
+            cabecera_parte = PROFILE_PART
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", STREAM_CONTENT_TYPE)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("X-Framerate", "60")
+        self.end_headers()
+
+        periodo = 1.0 / servidor.fps if servidor.fps else 0.0
+        inicio = time.monotonic()
+        ultimo_congelado = inicio
+        indice = 0
+        try:
+            while not servidor.detenido.is_set():
+                ahora = time.monotonic()
+                if servidor.cortar_cada and ahora - inicio >= servidor.cortar_cada:
+                    # Corte abrupto, sin el fragmento final del chunked
+                    self.close_connection = True
+                    return
+                if servidor.congelar_cada and ahora - ultimo_congelado >= servidor.congelar_cada:
+                    # La conexión sigue abierta pero no llegan frames, como un Wi-Fi degradado
+                    servidor.detenido.wait(servidor.duracion_congelado)
+                    ultimo_congelado = inicio = time.monotonic()
+                    indice = 0
+                datos = partes[indice % len(partes)]
+                marca = time.monotonic() - servidor.arranque
+                segundos = int(marca)
+                micros = int((marca - segundos) * 1e6)
+                self._enviar_fragmento(STREAM_BOUNDARY)
+                self._enviar_fragmento((cabecera_parte % (len(datos), segundos, micros)).encode("ascii"))
+                self._enviar_fragmento(datos)
+                self.wfile.flush()
+                indice += 1
+                if periodo:
+                    espera = inicio + indice * periodo - time.monotonic()
+                    if espera > 0:
+                        time.sleep(espera)
+        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+            self.close_connection = True
+
+class ServidorMJPEGSimulado(ThreadingHTTPServer):
+    """
+    Servidor que emite en bucle una lista de JPEG (/stream) o de perfiles
+    sintéticos (/profile) con el formato del firmware. Se puede usar como
+    context manager: arranca en un hilo y se detiene al salir del bloque.
+
+    - `cortar_cada`: segundos tras los que se cierra cada conexión.
+    - `congelar_cada` / `duracion_congelado`: cada cuántos segundos se deja
+      de enviar frames, y durante cuánto, sin cerrar la conexión.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, puerto=0, jpegs=None, fps=30.0, host="127.0.0.1", ancho=640, alto=480,
+                 cortar_cada=None, congelar_cada=None, duracion_congelado=5.0):
+        super().__init__((host, puerto), _ManejadorStream)
+        self.cortar_cada = cortar_cada
+        self.congelar_cada = congelar_cada
+        self.duracion_congelado = duracion_congelado
+        self.ancho = ancho
+        self.alto = alto
+        self.jpegs = jpegs if jpegs else generar_jpegs_sinteticos(ancho, alto)
+        self.fps = fps
+        self.arranque = time.monotonic()
+        self.detenido = threading.Event()
+        self._hilo = None
+
+    @property
+    def url(self):
+        host, puerto = self.server_address[:2]
+        return f"http://{host}:{puerto}/stream"
+
+    def iniciar(self):
+        self._hilo = threading.Thread(target=self.serve_forever, name="ServidorMJPEGSimulado", daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        self.detenido.set()
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.detener()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor MJPEG local que imita a la ESP32-CAM.")
+    parser.add_argument("--puerto", type=int, default=8081)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--ancho", type=int, default=640)
+    parser.add_argument("--alto", type=int, default=480)
+    parser.add_argument("--cortar-cada", type=float, help="Cierra cada conexión tras estos segundos.")
+    parser.add_argument("--congelar-cada", type=float, help="Deja de enviar frames cada estos segundos.")
+    parser.add_argument("--duracion-congelado", type=float, default=5.0, help="Segundos sin enviar frames.")
+    args = parser.parse_args()
+
+    servidor = ServidorMJPEGSimulado(args.puerto, fps=args.fps, ancho=args.ancho, alto=args.alto,
+                                     cortar_cada=args.cortar_cada, congelar_cada=args.congelar_cada,
+                                     duracion_congelado=args.duracion_congelado)
+    print(f"Sirviendo stream simulado en {servidor.url}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        servidor.server_close()
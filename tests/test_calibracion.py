@@ -0,0 +1,61 @@
+"""Pruebas de la calibración fotométrica (oscuro, referencia, T y A)."""
+
+import numpy as np
+import pytest
+
+from calibracion import CalibracionFotometrica
+
+def _perfiles(valores):
+    fila = np.asarray(valores, dtype=np.float32)
+    return np.tile(fila, (4, 1))
+
+def test_transmitancia_y_absorbancia_con_oscuro():
+    calibracion = CalibracionFotometrica()
+    calibracion.fijar_oscuro(_perfiles([10, 10, 10, 10]))
+    calibracion.fijar_referencia(_perfiles([210, 110, 60, 10.5]))
+    muestra = _perfiles([110, 20, 60, 10])
+
+    t = calibracion.transmitancia(muestra)
+    np.testing.assert_allclose(t[:, :3], _perfiles([0.5, 0.1, 1.0]), rtol=1e-6)
+    # Referencia sin señal (I0 - oscuro < SENAL_MINIMA): NaN en lugar de dividir entre cero
+    assert np.isnan(t[:, 3]).all()
+
+    a = calibracion.absorbancia(muestra)
+    np.testing.assert_allclose(a[:, :3], _perfiles([np.log10(2), 1.0, 0.0]), rtol=1e-5, atol=1e-6)
+    assert np.isnan(a[:, 3]).all()
+
+def test_absorbancia_nan_con_transmitancia_no_positiva():
+    calibracion = CalibracionFotometrica()
+    calibracion.fijar_oscuro(_perfiles([20, 20]))
+    calibracion.fijar_referencia(_perfiles([120, 120]))
+    a = calibracion.absorbancia(_perfiles([20, 5]))
+    assert np.isnan(a).all()
+
+def test_sin_referencia():
+    calibracion = CalibracionFotometrica()
+    calibracion.fijar_oscuro(_perfiles([1, 2, 3]))
+    assert not calibracion.calibrada
+    assert calibracion.transmitancia(_perfiles([1, 2, 3])) is None
+    assert calibracion.absorbancia(_perfiles([1, 2, 3])) is None
+
+def test_otro_roi_invalida_la_calibracion():
+    calibracion = CalibracionFotometrica()
+    calibracion.fijar_referencia(_perfiles([100] * 8), roi=(0, 0, 8, 4))
+    calibracion.fijar_oscuro(_perfiles([5] * 8), roi=(2, 0, 10, 4))
+    assert calibracion.referencia is None
+    assert not calibracion.valida_para((2, 0, 10, 4))
+
+def test_ancho_distinto_no_se_interpola():
+    calibracion = CalibracionFotometrica()
+    calibracion.fijar_referencia(_perfiles([100] * 8), roi=(0, 0, 8, 4))
+    assert calibracion.valida_para((0, 0, 8, 4), 8)
+    assert not calibracion.valida_para((0, 0, 8, 4), 6)
+    with pytest.raises(ValueError):
+        calibracion.absorbancia(_perfiles([50] * 6))
+
+def test_oscuro_de_otro_ancho_descarta_la_referencia():
+    calibracion = CalibracionFotometrica()
+    calibracion.fijar_referencia(_perfiles([100] * 8))
+    calibracion.fijar_oscuro(_perfiles([5] * 6))
+    assert not calibracion.calibrada
+    assert calibracion.ancho == 6
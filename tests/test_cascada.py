@@ -0,0 +1,64 @@
+"""
+Pruebas de la cascada: anillo de filas en orden cronológico con memoria
+fija, reinicio al cambiar el ROI, series por banda y lectura de bandas.
+"""
+
+import numpy as np
+import pytest
+
+from cascada import BufferCascada, columnas_banda, leer_bandas
+
+def test_anillo_en_orden_cronologico():
+    buffer = BufferCascada(filas=4, intervalo=1.0)
+    # Un frame por segundo: cada frame después del primero cierra una fila
+    cerradas = [buffer.agregar(np.full(3, float(t)), float(t)) for t in range(7)]
+    assert cerradas == [False] + [True] * 6
+    assert buffer.llenas == 4
+
+    datos = buffer._datos
+    filas, marcas = buffer.ordenar()
+    # La memoria no crece: se reutilizan los mismos arreglos
+    assert buffer._datos is datos and filas.shape == (4, 3)
+    np.testing.assert_array_equal(marcas, [3, 4, 5, 6])
+    # Con un frame por intervalo, cada fila (salvo la primera) es el frame que la cierra
+    np.testing.assert_allclose(filas[:, 0], [3, 4, 5, 6])
+
+def test_filas_vacias_y_promedio_del_intervalo():
+    buffer = BufferCascada(filas=3, intervalo=0.5)
+    for t in (0.0, 0.1, 0.2, 0.6):
+        buffer.agregar(np.array([t, 2 * t], dtype=np.float32), t)
+    filas, marcas = buffer.ordenar()
+    assert np.isnan(filas[:2]).all() and np.isnan(marcas[:2]).all()
+    np.testing.assert_allclose(filas[2], [0.225, 0.45], rtol=1e-6)
+    assert marcas[2] == 0.6
+
+def test_cambio_de_clave_o_ancho_reinicia():
+    buffer = BufferCascada(filas=3, intervalo=1.0)
+    for t in range(3):
+        buffer.agregar(np.ones(5), float(t), clave="roi1")
+    assert buffer.llenas == 2
+    buffer.agregar(np.ones(5), 3.0, clave="roi2")
+    assert buffer.llenas == 0 and buffer.clave == "roi2"
+    buffer.agregar(np.ones(8), 4.0, clave="roi2")
+    assert buffer.ancho == 8 and buffer.llenas == 0
+
+def test_series_por_banda():
+    buffer = BufferCascada(filas=2, intervalo=1.0)
+    perfil = np.arange(10, dtype=np.float32)
+    for t in range(3):
+        buffer.agregar(perfil * (t + 1), float(t))
+    serie_a, serie_b = buffer.series([(0, 2), (8, 10)])
+    np.testing.assert_allclose(serie_a, [0.75, 1.5])
+    np.testing.assert_allclose(serie_b, [12.75, 25.5])
+    assert BufferCascada().series([(0, 1)]) == []
+
+def test_leer_bandas():
+    assert leer_bandas("450-470; 532, 600-580", semiancho=5) == [(450, 470), (527, 537), (580, 600)]
+    with pytest.raises(ValueError):
+        leer_bandas("verde")
+
+def test_columnas_banda():
+    eje = np.linspace(400, 700, 31)
+    assert columnas_banda(eje, 450, 470) == (5, 8)
+    assert columnas_banda(eje[::-1], 450, 470) == (23, 26)
+    assert columnas_banda(eje, 800, 900) is None
@@ -0,0 +1,53 @@
+"""
+Pruebas de ClienteMJPEG contra servidor_simulado en un puerto efímero:
+Content-Length y marcas X-Timestamp de cada parte de /stream.
+"""
+
+import time
+
+import pytest
+
+from cliente_mjpeg import ClienteMJPEG
+from servidor_simulado import ServidorMJPEGSimulado
+
+ANCHO = 160
+ALTO = 120
+
+def test_stream_marcas_y_content_length():
+    with ServidorMJPEGSimulado(puerto=0, fps=60, ancho=ANCHO, alto=ALTO) as servidor:
+        cliente = ClienteMJPEG(servidor.url).conectar()
+        try:
+            frames = [cliente.leer_parte() for _ in range(10)]
+        finally:
+            cliente.release()
+        reloj_servidor = time.monotonic() - servidor.arranque
+
+    for i, frame in enumerate(frames):
+        # Content-Length delimita exactamente el JPEG enviado
+        assert bytes(frame.datos) == servidor.jpegs[i % len(servidor.jpegs)]
+    assert cliente.partes_recibidas == 10
+    assert cliente.bytes_recibidos == sum(len(frame.datos) for frame in frames)
+
+    marcas = [frame.marca_dispositivo for frame in frames]
+    assert all(0.0 <= marca <= reloj_servidor for marca in marcas)
+    assert all(b > a for a, b in zip(marcas, marcas[1:]))
+    assert cliente.desfase_reloj is not None
+    assert cliente.latencia(frames[-1], frames[-1].marca_recepcion) >= 0.0
+
+def test_frame_se_decodifica_una_vez():
+    with ServidorMJPEGSimulado(puerto=0, fps=60, ancho=ANCHO, alto=ALTO) as servidor:
+        cliente = ClienteMJPEG(servidor.url).conectar()
+        try:
+            frame = cliente.leer_parte()
+        finally:
+            cliente.release()
+    imagen = frame.decodificar()
+    assert imagen.shape == (ALTO, ANCHO, 3)
+    assert frame.decodificar() is imagen
+
+def test_leer_parte_sin_conectar_no_reconecta():
+    with ServidorMJPEGSimulado(puerto=0, ancho=ANCHO, alto=ALTO) as servidor:
+        cliente = ClienteMJPEG(servidor.url)
+        with pytest.raises(ConnectionError):
+            cliente.leer_parte()
+        assert not cliente.isOpened()
@@ -0,0 +1,47 @@
+"""
+Pruebas de /profile: formato binario de cliente_perfiles y decodificación de
+las partes que emite servidor_simulado en un puerto efímero.
+"""
+
+import numpy as np
+import pytest
+
+from cliente_perfiles import ClientePerfiles, codificar_perfil, decodificar_perfil, url_perfiles
+from servidor_simulado import ServidorMJPEGSimulado, generar_perfiles_sinteticos
+
+ANCHO = 160
+ALTO = 120
+
+def test_codificar_y_decodificar_perfil():
+    rgb = np.array([[0.0, 10.5, 255.0], [1.25, 2.5, 3.75], [100.0, 50.0, 25.0]], dtype=np.float32)
+    perfiles, roi, alto, tamano_frame = decodificar_perfil(codificar_perfil(rgb, 4, 7, 20, (640, 480)))
+    assert perfiles.shape == (4, 3)
+    np.testing.assert_allclose(perfiles[:3], rgb, atol=1 / 256)
+    assert roi == (4, 7, 7, 27)
+    assert alto == 20
+    assert tamano_frame == (640, 480)
+
+def test_perfil_con_formato_desconocido():
+    datos = bytearray(codificar_perfil(np.zeros((3, 4))))
+    datos[:4] = b"XXXX"
+    with pytest.raises(ValueError):
+        decodificar_perfil(bytes(datos))
+
+def test_perfiles_forma_y_roi():
+    recorte = (20, 30, 140, 90)
+    with ServidorMJPEGSimulado(puerto=0, fps=60, ancho=ANCHO, alto=ALTO) as servidor:
+        cliente = ClientePerfiles(url_perfiles(servidor.url, recorte)).conectar()
+        try:
+            frame = cliente.leer_parte()
+        finally:
+            cliente.release()
+
+    assert frame.perfiles.shape == (4, recorte[2] - recorte[0])
+    assert frame.perfiles.dtype == np.float32
+    assert frame.roi == recorte
+    assert frame.alto == recorte[3] - recorte[1]
+    assert frame.tamano_frame == (ANCHO, ALTO)
+    assert frame.marca_dispositivo is not None
+
+    esperados, _, _, _ = decodificar_perfil(generar_perfiles_sinteticos(ANCHO, ALTO, 1, recorte)[0])
+    np.testing.assert_allclose(frame.perfiles, esperados)
@@ -0,0 +1,62 @@
+"""
+Pruebas de MotorReconexion contra servidor_simulado en un puerto efímero:
+reconexión tras cortes y congelamientos, y conteo de reconexiones.
+"""
+
+import socket
+import time
+
+from cliente_mjpeg import ClienteMJPEG
+from conexion import ESTADO_CONECTADO, MotorReconexion
+from servidor_simulado import ServidorMJPEGSimulado
+
+ANCHO = 160
+ALTO = 120
+
+def esperar(condicion, timeout=5.0):
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        if condicion():
+            return True
+        time.sleep(0.02)
+    return condicion()
+
+def _motor(url, **opciones):
+    return MotorReconexion(lambda: ClienteMJPEG(url, timeout=2.0).conectar(),
+                           espera_inicial=0.05, espera_maxima=0.2, **opciones)
+
+def test_reconexion_tras_corte():
+    with ServidorMJPEGSimulado(puerto=0, fps=60, ancho=ANCHO, alto=ALTO, cortar_cada=0.3) as servidor:
+        motor = _motor(servidor.url)
+        motor.iniciar()
+        try:
+            assert esperar(lambda: motor.reconexiones >= 2 and motor.estado == ESTADO_CONECTADO)
+        finally:
+            motor.detener()
+    assert motor.conexiones >= 3
+    assert motor.errores_lectura >= 2
+
+def test_reconexion_tras_congelado():
+    with ServidorMJPEGSimulado(puerto=0, fps=60, ancho=ANCHO, alto=ALTO,
+                               congelar_cada=0.3, duracion_congelado=2.0) as servidor:
+        motor = _motor(servidor.url, limite_estancamiento=0.3)
+        motor.iniciar()
+        try:
+            assert esperar(lambda: motor.reconexiones >= 1 and motor.estado == ESTADO_CONECTADO)
+        finally:
+            motor.detener()
+    assert motor.estancamientos >= 1
+
+def test_fallos_iniciales_no_cuentan_como_reconexiones():
+    # Puerto libre sin servidor: todos los intentos fallan
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        puerto = s.getsockname()[1]
+    motor = _motor(f"http://127.0.0.1:{puerto}/stream")
+    motor.iniciar()
+    try:
+        assert esperar(lambda: motor._fallos_seguidos >= 3)
+    finally:
+        motor.detener()
+    assert motor.conexiones == 0
+    assert motor.reconexiones == 0
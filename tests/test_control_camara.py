@@ -0,0 +1,44 @@
+"""Pruebas del cálculo de la ventana del sensor para /resolution (sin cámara)."""
+
+import pytest
+
+from control_camara import ALINEACION_VENTANA, calcular_ventana_sensor, modo_sensor, url_control
+
+def test_modo_sensor():
+    assert modo_sensor((1600, 1200)) == (1600, 1200, 0)
+    assert modo_sensor((800, 600)) == (800, 600, 1)
+    assert modo_sensor((640, 480)) == (800, 600, 1)
+    assert modo_sensor((320, 240)) == (400, 296, 2)
+
+def test_url_control_usa_el_puerto_80():
+    assert url_control("http://192.168.4.1:81/stream") == "http://192.168.4.1"
+
+@pytest.mark.parametrize("recorte", [(0, 200, 800, 260), (13, 101, 517, 149), (1, 1, 3, 3)])
+def test_ventana_alineada_y_recorte_residual(recorte):
+    resolucion = (800, 600)
+    parametros, (salida_x, salida_y), (rx0, ry0, rx1, ry1) = calcular_ventana_sensor(recorte, resolucion)
+
+    for clave in ("offx", "offy", "tx", "ty", "ox", "oy"):
+        assert parametros[clave] % ALINEACION_VENTANA == 0
+    assert (salida_x, salida_y) == (parametros["ox"], parametros["oy"])
+    # Misma densidad de píxeles en el modo nativo: la ventana contiene al recorte
+    x0, y0, x1, y1 = recorte
+    assert parametros["offx"] <= x0 and parametros["offx"] + parametros["tx"] >= x1
+    assert parametros["offy"] <= y0 and parametros["offy"] + parametros["ty"] >= y1
+    # El recorte residual cae dentro del frame recibido y conserva el tamaño pedido
+    assert 0 <= rx0 < rx1 <= salida_x
+    assert 0 <= ry0 < ry1 <= salida_y
+    assert (rx1 - rx0, ry1 - ry0) == (x1 - x0, y1 - y0)
+    assert (parametros["offx"] + rx0, parametros["offy"] + ry0) == (x0, y0)
+
+def test_ventana_escalada_desde_un_frame_menor():
+    # Frame de 640x480 sobre el modo SVGA (800x600): la ventana se expresa en píxeles del modo
+    parametros, salida, residual = calcular_ventana_sensor((0, 0, 640, 480), (640, 480))
+    assert parametros["sx"] == 1
+    assert (parametros["tx"], parametros["ty"]) == (800, 600)
+    assert salida == (640, 480)
+    assert residual == (0, 0, 640, 480)
+
+def test_recorte_vacio():
+    with pytest.raises(ValueError):
+        calcular_ventana_sensor((100, 100, 100, 200), (800, 600))
@@ -0,0 +1,67 @@
+"""
+Pruebas de las fuentes offline: una sesión grabada con GrabadorMJPEG se
+reproduce con FuenteGrabacion, y las pausas de la grabación no disparan el
+vigilante de estancamiento de MotorReconexion.
+"""
+
+import time
+
+from cliente_mjpeg import FrameJPEG
+from conexion import ESTADO_CONECTADO, MotorReconexion
+from fuentes import RITMO_MAXIMO, RITMO_TIEMPO_REAL, FuenteGrabacion
+from grabacion import GrabadorMJPEG
+
+def _grabar(ruta_base, marcas):
+    grabador = GrabadorMJPEG(ruta_base)
+    grabador.iniciar()
+    partes = []
+    for secuencia, marca in enumerate(marcas, start=1):
+        # Basta con bytes distintos por frame: la fuente no los decodifica
+        datos = b"\xff\xd8" + secuencia.to_bytes(4, "little") * 50 + b"\xff\xd9"
+        partes.append(datos)
+        assert grabador.agregar_frame(secuencia, FrameJPEG(datos, marca, time.perf_counter()))
+    grabador.detener()
+    assert grabador.error is None and grabador.escritos == len(marcas)
+    return grabador.ruta, partes
+
+def test_grabacion_se_reproduce_igual(tmp_path):
+    ruta, partes = _grabar(str(tmp_path / "sesion"), [0.1 * i for i in range(40)])
+    fuente = FuenteGrabacion(ruta, RITMO_MAXIMO, bucle=False).conectar()
+    try:
+        leidas = []
+        while True:
+            ok, frame = fuente.read()
+            if not ok:
+                break
+            leidas.append(frame.datos)
+    finally:
+        fuente.release()
+    assert leidas == partes
+
+def test_bucle_continua_las_marcas(tmp_path):
+    ruta, partes = _grabar(str(tmp_path / "sesion"), [0.1 * i for i in range(5)])
+    fuente = FuenteGrabacion(ruta, RITMO_MAXIMO, bucle=True).conectar()
+    frames = [fuente.read()[1] for _ in range(2 * len(partes))]
+    fuente.release()
+    assert [frame.datos for frame in frames] == partes * 2
+    marcas = [frame.marca_dispositivo for frame in frames]
+    assert all(b > a for a, b in zip(marcas, marcas[1:]))
+
+def test_pausa_de_la_grabacion_no_es_estancamiento(tmp_path):
+    # Pausa de 0.6 s entre el tercer y el cuarto frame, más que el límite del vigilante
+    marcas = [0.0, 0.05, 0.1, 0.7, 0.75, 0.8]
+    ruta, partes = _grabar(str(tmp_path / "sesion"), marcas)
+    motor = MotorReconexion(lambda: FuenteGrabacion(ruta, RITMO_TIEMPO_REAL).conectar(),
+                            limite_estancamiento=None, espera_inicial=0.05)
+    recibidos = []
+    motor.observadores.append(lambda secuencia, frame: recibidos.append(frame.datos))
+    motor.iniciar()
+    try:
+        limite = time.monotonic() + 5.0
+        while len(recibidos) < len(partes) and time.monotonic() < limite:
+            time.sleep(0.02)
+        assert motor.estado == ESTADO_CONECTADO
+    finally:
+        motor.detener()
+    assert recibidos[:len(partes)] == partes
+    assert motor.estancamientos == 0 and motor.conexiones == 1
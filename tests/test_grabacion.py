@@ -0,0 +1,76 @@
+"""
+Pruebas de GrabadorPerfiles: serie espectral leída con memmap, segmentos por
+cambio de ROI y una sola decodificación por frame JPEG compartido con la
+interfaz.
+"""
+
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from cliente_mjpeg import FrameJPEG
+from cliente_perfiles import FramePerfil
+from grabacion import GrabadorPerfiles, abrir_serie_espectral, leer_cabecera_serie
+from perfiles import calcular_perfiles
+from servidor_simulado import generar_jpegs_sinteticos
+
+def _frames(cantidad=6):
+    return [FrameJPEG(datos, 0.1 * i, time.perf_counter())
+            for i, datos in enumerate(generar_jpegs_sinteticos(64, 48, cantidad))]
+
+def test_serie_de_perfiles(tmp_path):
+    frames = _frames()
+    recorte = (8, 10, 56, 30)
+    grabador = GrabadorPerfiles(str(tmp_path / "sesion"), recorte_para=lambda imagen: (recorte, recorte))
+    grabador.iniciar()
+    for secuencia, frame in enumerate(frames, start=1):
+        assert grabador.agregar_frame(secuencia, frame)
+    grabador.detener()
+    assert grabador.error is None and grabador.escritos == len(frames)
+
+    ruta, = grabador.segmentos
+    cabecera = leer_cabecera_serie(ruta)
+    assert cabecera["registros"] == len(frames) and not cabecera["enderezado"]
+    serie, roi = abrir_serie_espectral(ruta)
+    assert roi == recorte
+    np.testing.assert_array_equal(serie["secuencia"], np.arange(1, len(frames) + 1))
+    np.testing.assert_allclose(serie["marca_dispositivo"], [0.1 * i for i in range(len(frames))])
+    x0, y0, x1, y1 = recorte
+    for registro, frame in zip(serie, frames):
+        esperado = calcular_perfiles(frame.decodificar()[y0:y1, x0:x1], "BGR")
+        np.testing.assert_allclose(registro["perfiles"], esperado, rtol=1e-6)
+
+def test_cambio_de_roi_abre_segmento(tmp_path):
+    grabador = GrabadorPerfiles(str(tmp_path / "sesion"))
+    grabador.iniciar()
+    for secuencia in range(1, 5):
+        x0 = 0 if secuencia <= 2 else 10
+        perfiles = np.full((4, 20), secuencia, dtype=np.float32)
+        grabador.agregar_frame(secuencia, FramePerfil(perfiles, (x0, 5), 8, (64, 48)))
+    grabador.detener()
+    assert grabador.escritos == 4
+    assert [leer_cabecera_serie(ruta)["roi"] for ruta in grabador.segmentos] == [(0, 5, 20, 13), (10, 5, 30, 13)]
+    serie, _ = abrir_serie_espectral(grabador.segmentos[1])
+    np.testing.assert_array_equal(serie["secuencia"], [3, 4])
+
+def test_decodificacion_compartida(monkeypatch):
+    llamadas = []
+    original = cv2.imdecode
+
+    def imdecode_lento(*args):
+        llamadas.append(threading.get_ident())
+        time.sleep(0.05)
+        return original(*args)
+
+    monkeypatch.setattr(cv2, "imdecode", imdecode_lento)
+    frame = _frames(1)[0]
+    imagenes = []
+    hilos = [threading.Thread(target=lambda: imagenes.append(frame.decodificar())) for _ in range(4)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert len(llamadas) == 1
+    assert all(imagen is imagenes[0] for imagen in imagenes)
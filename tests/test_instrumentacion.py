@@ -0,0 +1,44 @@
+"""Pruebas de instrumentacion: percentiles y instantáneas con hilos concurrentes."""
+
+import threading
+import time
+
+from instrumentacion import HistogramaLatencia, Instrumentacion
+
+def test_percentiles_del_histograma():
+    histograma = HistogramaLatencia()
+    for _ in range(99):
+        histograma.registrar(0.001)
+    histograma.registrar(0.5)
+    resumen = histograma.resumen()
+    assert resumen["muestras"] == 100
+    # Error relativo de la cubeta menor al 13 %
+    assert abs(resumen["p50_ms"] - 1.0) < 0.13
+    assert resumen["max_ms"] == 500.0
+    histograma.reiniciar()
+    assert histograma.percentil(50) is None
+    assert histograma.resumen() == {"muestras": 0}
+
+def test_instantanea_con_altas_y_reinicios_concurrentes():
+    instrumentacion = Instrumentacion()
+    fin = time.monotonic() + 1.0
+    errores = []
+
+    def productor():
+        i = 0
+        while time.monotonic() < fin:
+            i += 1
+            instrumentacion.marcar(f"evento{i % 40}")
+            instrumentacion.registrar(f"etapa{i % 40}", 1e-3)
+
+    hilo = threading.Thread(target=productor)
+    hilo.start()
+    while time.monotonic() < fin:
+        instrumentacion.reiniciar()
+        try:
+            instrumentacion.texto_resumen()
+        except Exception as e:
+            errores.append(e)
+            break
+    hilo.join()
+    assert not errores
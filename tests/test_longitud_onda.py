@@ -0,0 +1,61 @@
+"""Pruebas de la calibración píxel → nm y de la detección de picos sub-píxel."""
+
+import numpy as np
+import pytest
+
+from longitud_onda import CalibracionLongitudOnda, detectar_picos
+
+def _gaussianas(centros, ancho=200, sigma=2.0, alturas=None):
+    x = np.arange(ancho, dtype=np.float64)
+    alturas = alturas or [100.0] * len(centros)
+    return sum(h * np.exp(-0.5 * ((x - c) / sigma) ** 2) for c, h in zip(centros, alturas)) + 5.0
+
+def test_ajuste_lineal_con_dos_lineas():
+    calibracion = CalibracionLongitudOnda()
+    calibracion.ajustar([(400, 546.1), (100, 435.8)])
+    assert calibracion.puntos == [(100.0, 435.8), (400.0, 546.1)]
+    assert len(calibracion.coeficientes) == 2
+    np.testing.assert_allclose(calibracion.a_nm([100, 400]), [435.8, 546.1])
+
+def test_ajuste_cuadratico_recupera_el_polinomio():
+    coeficientes = (2e-5, 0.35, 380.0)
+    pixeles = (50.0, 300.0, 620.0, 900.0)
+    calibracion = CalibracionLongitudOnda()
+    calibracion.ajustar([(p, np.polyval(coeficientes, p)) for p in pixeles])
+    np.testing.assert_allclose(calibracion.coeficientes, coeficientes, rtol=1e-6)
+
+def test_se_necesitan_dos_lineas():
+    with pytest.raises(ValueError):
+        CalibracionLongitudOnda().ajustar([(100, 500)])
+
+def test_eje_en_cache_por_roi():
+    calibracion = CalibracionLongitudOnda()
+    assert calibracion.eje(0, 10) is None
+    calibracion.ajustar([(0, 400), (1000, 700)])
+    eje = calibracion.eje(200, 50)
+    assert eje.dtype == np.float32 and eje.shape == (50,)
+    np.testing.assert_allclose(eje[[0, -1]], [460.0, 474.7], rtol=1e-6)
+    assert calibracion.eje(200, 50) is eje
+    assert calibracion.eje(210, 50) is not eje
+    calibracion.limpiar()
+    assert calibracion.eje(210, 50) is None
+
+@pytest.mark.parametrize("metodo", ["parabolico", "centroide"])
+def test_picos_sub_pixel(metodo):
+    centros = [40.3, 97.75, 151.5]
+    picos = detectar_picos(_gaussianas(centros), metodo=metodo)
+    np.testing.assert_allclose(picos, centros, atol=0.1)
+
+def test_picos_umbral_y_distancia():
+    perfil = _gaussianas([50.0, 54.0, 120.0], sigma=1.0, alturas=[100.0, 60.0, 10.0])
+    # El pico de 54 está a menos de `distancia` del de 50 y el de 120 no supera el umbral
+    np.testing.assert_allclose(detectar_picos(perfil, umbral_relativo=0.2, distancia=5), [50.0], atol=0.1)
+    assert len(detectar_picos(perfil, umbral_relativo=0.2, distancia=3)) == 2
+    assert len(detectar_picos(perfil, umbral_relativo=0.05, distancia=3)) == 3
+
+def test_picos_en_perfiles_sin_senal():
+    assert detectar_picos(np.full(50, 7.0)).size == 0
+    assert detectar_picos([1.0, 2.0]).size == 0
+    perfil = _gaussianas([60.0])
+    perfil[10] = np.nan
+    np.testing.assert_allclose(detectar_picos(perfil), [60.0], atol=0.1)
@@ -0,0 +1,116 @@
+"""
+Pruebas de la reducción por columnas: calcular_perfiles y la lectura por
+franjas o mosaicos de archivos sin compresión en reducir_por_bloques.
+"""
+
+import struct
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from perfiles import _bloques_sin_compresion, calcular_perfiles, reducir_por_bloques, vista_previa
+
+def _escribir_tiff(ruta, pixeles, filas_por_franja=None, mosaico=None):
+    """
+    TIFF RGB sin compresión con varias franjas (`filas_por_franja`) o en
+    mosaicos (`mosaico` = (ancho, alto), múltiplos de 16), como los que
+    escriben los programas de adquisición. Los bloques se guardan en orden
+    inverso para que no queden contiguos en el archivo.
+    """
+    alto, ancho, _ = pixeles.shape
+    bloques = []
+    if mosaico:
+        ancho_mosaico, alto_mosaico = mosaico
+        for y in range(0, alto, alto_mosaico):
+            for x in range(0, ancho, ancho_mosaico):
+                bloque = np.zeros((alto_mosaico, ancho_mosaico, 3), dtype=np.uint8)
+                parte = pixeles[y:y + alto_mosaico, x:x + ancho_mosaico]
+                bloque[:parte.shape[0], :parte.shape[1]] = parte
+                bloques.append(bloque.tobytes())
+    else:
+        for y in range(0, alto, filas_por_franja):
+            bloques.append(pixeles[y:y + filas_por_franja].tobytes())
+
+    datos = bytearray(b"II*\0\0\0\0\0")
+    desplazamientos = [0] * len(bloques)
+    for i in reversed(range(len(bloques))):
+        desplazamientos[i] = len(datos)
+        datos += bloques[i]
+    etiquetas = [(256, 4, [ancho]), (257, 4, [alto]), (258, 3, [8, 8, 8]), (259, 3, [1]), (262, 3, [2]),
+                 (277, 3, [3]), (284, 3, [1])]
+    if mosaico:
+        etiquetas += [(322, 4, [mosaico[0]]), (323, 4, [mosaico[1]]), (324, 4, desplazamientos),
+                      (325, 4, [len(b) for b in bloques])]
+    else:
+        etiquetas += [(273, 4, desplazamientos), (278, 4, [filas_por_franja]),
+                      (279, 4, [len(b) for b in bloques])]
+    etiquetas.sort()
+
+    externos = bytearray()
+    inicio_ifd = len(datos)
+    inicio_externos = inicio_ifd + 2 + 12 * len(etiquetas) + 4
+    ifd = struct.pack("<H", len(etiquetas))
+    for codigo, tipo, valores in etiquetas:
+        formato = "<%d%s" % (len(valores), "H" if tipo == 3 else "I")
+        contenido = struct.pack(formato, *valores)
+        if len(contenido) <= 4:
+            ifd += struct.pack("<HHI", codigo, tipo, len(valores)) + contenido.ljust(4, b"\0")
+        else:
+            ifd += struct.pack("<HHII", codigo, tipo, len(valores), inicio_externos + len(externos))
+            externos += contenido
+    datos += ifd + b"\0\0\0\0" + externos
+    datos[4:8] = struct.pack("<I", inicio_ifd)
+    with open(ruta, "wb") as f:
+        f.write(datos)
+
+@pytest.fixture
+def pixeles():
+    rng = np.random.default_rng(3)
+    return rng.integers(0, 256, (100, 70, 3), dtype=np.uint8)
+
+def test_calcular_perfiles_rgb_y_bgr(pixeles):
+    perfiles = calcular_perfiles(pixeles, "RGB")
+    assert perfiles.shape == (4, 70) and perfiles.dtype == np.float32
+    np.testing.assert_allclose(perfiles[:3], pixeles.mean(axis=0).T, rtol=1e-5)
+    np.testing.assert_allclose(perfiles[3], pixeles.mean(axis=0) @ [0.299, 0.587, 0.114], rtol=1e-5)
+    np.testing.assert_array_equal(calcular_perfiles(pixeles[:, :, ::-1], "BGR"), perfiles)
+
+@pytest.mark.parametrize("opciones", [{"filas_por_franja": 7}, {"mosaico": (32, 16)}])
+def test_tiff_por_franjas_o_mosaicos_sin_decodificar(tmp_path, pixeles, opciones):
+    ruta = str(tmp_path / "captura.tif")
+    _escribir_tiff(ruta, pixeles, **opciones)
+    recorte = (5, 11, 66, 93)
+    x0, y0, x1, y1 = recorte
+    esperado = calcular_perfiles(pixeles[y0:y1, x0:x1])
+
+    with Image.open(ruta) as imagen:
+        assert len(imagen.tile) > 1
+        bloques, _ = _bloques_sin_compresion(imagen)
+        assert len(bloques) == len(imagen.tile)
+        perfiles = reducir_por_bloques(imagen, recorte, filas_por_bloque=5)
+        # La imagen nunca se decodificó en memoria
+        assert imagen.tile
+        np.testing.assert_allclose(perfiles, esperado, rtol=1e-5)
+        np.testing.assert_allclose(reducir_por_bloques(imagen), calcular_perfiles(pixeles), rtol=1e-5)
+        previa = vista_previa(imagen, (35, 50))
+        assert previa.size == (35, 50)
+
+    with Image.open(ruta) as imagen:
+        np.testing.assert_array_equal(np.asarray(imagen), pixeles)
+
+@pytest.mark.parametrize("formato", ["png", "bmp", "jpeg"])
+def test_otros_formatos(tmp_path, pixeles, formato):
+    ruta = str(tmp_path / f"captura.{formato}")
+    Image.fromarray(pixeles).save(ruta)
+    with Image.open(ruta) as imagen:
+        decodificada = np.asarray(imagen.convert("RGB"))
+    with Image.open(ruta) as imagen:
+        perfiles = reducir_por_bloques(imagen, (5, 11, 66, 93), filas_por_bloque=5)
+    np.testing.assert_allclose(perfiles, calcular_perfiles(decodificada[11:93, 5:66]), rtol=1e-5)
+
+def test_recorte_vacio(tmp_path, pixeles):
+    ruta = str(tmp_path / "captura.png")
+    Image.fromarray(pixeles).save(ruta)
+    with Image.open(ruta) as imagen, pytest.raises(ValueError):
+        reducir_por_bloques(imagen, (50, 10, 50, 20))
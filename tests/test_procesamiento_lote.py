@@ -0,0 +1,66 @@
+"""Pruebas del procesamiento por lotes: listado, tablas CSV/NPZ y reanudación."""
+
+import csv
+import os
+
+import numpy as np
+from PIL import Image
+
+from perfiles import cargar_perfiles_imagen
+from procesamiento_lote import listar_imagenes, procesar_lote
+
+def _guardar(ruta, valor, ancho=24, alto=6):
+    datos = np.full((alto, ancho, 3), valor, dtype=np.uint8)
+    datos[:, ::3, 0] = 255 - valor
+    Image.fromarray(datos).save(ruta)
+    return str(ruta)
+
+def _lote(directorio, cantidad, ancho=24):
+    return [_guardar(directorio / f"img_{i:02d}.png", 20 + 10 * i, ancho) for i in range(cantidad)]
+
+def test_listar_imagenes(tmp_path):
+    for nombre in ("a.png", "b.TIFF", "c.tif", "d.jpg", "notas.txt"):
+        (tmp_path / nombre).write_bytes(b"")
+    nombres = [os.path.basename(ruta) for ruta in listar_imagenes([str(tmp_path), str(tmp_path / "*.png")])]
+    assert nombres == ["a.png", "b.TIFF", "c.tif", "d.jpg"]
+
+def test_csv_se_reanuda_y_descarta_la_linea_cortada(tmp_path):
+    rutas = _lote(tmp_path, 4)
+    salida = str(tmp_path / "perfiles.csv")
+    assert procesar_lote(rutas[:3], salida, trabajadores=1) == (3, 0, 0)
+
+    # Simula una ejecución cortada a media línea de la última imagen
+    with open(salida, "rb+") as f:
+        f.truncate(os.path.getsize(salida) - 10)
+    assert procesar_lote(rutas, salida, trabajadores=1) == (2, 2, 0)
+
+    with open(salida, newline="", encoding="utf-8") as f:
+        filas = list(csv.reader(f))
+    assert filas[0][:3] == ["archivo", "canal", "x0"]
+    por_archivo = {}
+    for fila in filas[1:]:
+        por_archivo.setdefault(fila[0], []).append(fila)
+    assert sorted(por_archivo) == sorted(rutas)
+    assert all(len(filas_archivo) == 4 for filas_archivo in por_archivo.values())
+    esperado = cargar_perfiles_imagen(rutas[3])
+    gris = next(fila for fila in por_archivo[rutas[3]] if fila[1] == "gris")
+    np.testing.assert_allclose([float(v) for v in gris[2:]], esperado[3], atol=1e-4)
+
+def test_npz_con_calibracion_y_reanudacion(tmp_path):
+    rutas = _lote(tmp_path, 3)
+    referencia = _guardar(tmp_path / "referencia.png", 250)
+    salida = str(tmp_path / "perfiles.npz")
+    assert procesar_lote(rutas[:2], salida, referencia=referencia, trabajadores=1, guardar_cada=1) == (2, 0, 0)
+    assert procesar_lote(rutas, salida, referencia=referencia, trabajadores=1) == (1, 2, 0)
+
+    with np.load(salida) as datos:
+        assert [str(a) for a in datos["archivos"]] == rutas
+        assert datos["perfiles"].shape == (3, 4, 24)
+        assert datos["absorbancia"].shape == (3, 4, 24)
+        assert np.isfinite(datos["absorbancia"][:, 3]).all()
+
+def test_imagen_de_otro_ancho_que_la_referencia_falla(tmp_path):
+    rutas = _lote(tmp_path, 2) + [_guardar(tmp_path / "ancha.png", 90, ancho=30)]
+    referencia = _guardar(tmp_path / "referencia.png", 250)
+    salida = str(tmp_path / "perfiles.csv")
+    assert procesar_lote(rutas, salida, referencia=referencia, trabajadores=1) == (2, 0, 1)
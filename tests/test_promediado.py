@@ -0,0 +1,59 @@
+"""Pruebas del promediado temporal de perfiles."""
+
+import numpy as np
+import pytest
+
+from promediado import (MEDIA_EXPONENCIAL, PROMEDIO_ACUMULADO, SIN_PROMEDIO, VENTANA_N_FRAMES,
+                        PromediadorTemporal)
+
+def _frames(cantidad, forma=(4, 16), semilla=0):
+    rng = np.random.default_rng(semilla)
+    return [rng.uniform(0, 255, forma).astype(np.float32) for _ in range(cantidad)]
+
+def test_sin_promedio_devuelve_el_mismo_arreglo():
+    promediador = PromediadorTemporal(SIN_PROMEDIO)
+    frame = _frames(1)[0]
+    assert promediador.agregar(frame) is frame
+
+def test_promedio_acumulado():
+    promediador = PromediadorTemporal(PROMEDIO_ACUMULADO)
+    frames = _frames(25)
+    for frame in frames:
+        resultado = promediador.agregar(frame)
+    np.testing.assert_allclose(resultado, np.mean(frames, axis=0), rtol=1e-4)
+    assert promediador.frames_promediados == 25
+
+def test_media_exponencial():
+    promediador = PromediadorTemporal(MEDIA_EXPONENCIAL, alfa=0.25)
+    frames = _frames(10)
+    esperado = frames[0].astype(np.float64)
+    promediador.agregar(frames[0])
+    for frame in frames[1:]:
+        resultado = promediador.agregar(frame)
+        esperado += 0.25 * (frame - esperado)
+    np.testing.assert_allclose(resultado, esperado, rtol=1e-4)
+
+def test_ventana_de_n_frames():
+    promediador = PromediadorTemporal(VENTANA_N_FRAMES, n_frames=4)
+    frames = _frames(11)
+    for i, frame in enumerate(frames):
+        resultado = promediador.agregar(frame)
+        np.testing.assert_allclose(resultado, np.mean(frames[max(0, i - 3):i + 1], axis=0), rtol=1e-4)
+
+def test_resultado_reutiliza_el_buffer_interno():
+    promediador = PromediadorTemporal(PROMEDIO_ACUMULADO)
+    frames = _frames(3)
+    primero = promediador.agregar(frames[0])
+    assert promediador.agregar(frames[1]) is primero
+
+def test_cambio_de_roi_reinicia():
+    promediador = PromediadorTemporal(PROMEDIO_ACUMULADO)
+    a, b = _frames(2)
+    promediador.agregar(a, clave=(0, 0, 16, 10))
+    resultado = promediador.agregar(b, clave=(5, 0, 21, 10))
+    np.testing.assert_array_equal(resultado, b)
+    assert promediador.frames_promediados == 1
+
+def test_modo_desconocido():
+    with pytest.raises(ValueError):
+        PromediadorTemporal().configurar(modo="mediana")
@@ -0,0 +1,57 @@
+"""
+Pruebas de la publicación de espectros: formato binario ESPC y entrega a un
+suscriptor de /espectro en un puerto efímero.
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from publicacion import ClienteEspectros, PublicadorEspectros, codificar_espectro, decodificar_espectro
+
+def _perfiles(ancho=50):
+    return np.random.default_rng(1).uniform(0, 255, (4, ancho)).astype(np.float32)
+
+def test_codificar_y_decodificar_con_eje():
+    perfiles = _perfiles()
+    eje = np.linspace(400, 700, 50)
+    datos = codificar_espectro(2 ** 32 + 7, 1700000000.25, perfiles, roi=(10, 20, 60, 40), alto=20,
+                               eje=eje, referencia=True, enderezado=True)
+    espectro = decodificar_espectro(datos, marca_dispositivo=1.5)
+    # La secuencia viaja en 32 bits
+    assert espectro.secuencia == 7
+    assert espectro.marca_tiempo == 1700000000.25 and espectro.marca_dispositivo == 1.5
+    assert espectro.roi == (10, 20, 60, 40) and espectro.alto == 20
+    np.testing.assert_array_equal(espectro.perfiles, perfiles)
+    np.testing.assert_allclose(espectro.eje, eje, rtol=1e-6)
+    assert espectro.referencia and espectro.enderezado and not espectro.oscuro
+
+def test_codificar_sin_eje():
+    perfiles = _perfiles(8)
+    espectro = decodificar_espectro(codificar_espectro(3, 0.0, perfiles, oscuro=True))
+    assert espectro.eje is None and espectro.oscuro and not espectro.referencia
+    assert espectro.roi == (0, 0, 8, 1)
+    np.testing.assert_array_equal(espectro.gris, perfiles[3])
+
+def test_formato_desconocido():
+    datos = bytearray(codificar_espectro(1, 0.0, _perfiles(4)))
+    datos[:4] = b"XXXX"
+    with pytest.raises(ValueError):
+        decodificar_espectro(bytes(datos))
+
+def test_suscriptor_recibe_lo_publicado():
+    perfiles = _perfiles()
+    with PublicadorEspectros(puerto=0) as publicador:
+        cliente = ClienteEspectros(publicador.url, timeout=2.0).conectar()
+        try:
+            limite = time.monotonic() + 2.0
+            while publicador.suscriptores == 0 and time.monotonic() < limite:
+                time.sleep(0.01)
+            for secuencia in range(1, 4):
+                publicador.publicar(codificar_espectro(secuencia, time.time(), perfiles * secuencia), time.time())
+            espectros = [cliente.leer_parte() for _ in range(3)]
+        finally:
+            cliente.release()
+    assert [espectro.secuencia for espectro in espectros] == [1, 2, 3]
+    np.testing.assert_array_equal(espectros[2].perfiles, perfiles * 3)
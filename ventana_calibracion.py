@@ -0,0 +1,77 @@
+"""
+===============================================================================
+Proyecto: Espectrofotómetro Digital En Tiempo Real Para Uso Didáctico
+Descripción:
+Ventana de Tkinter compartida por ambas interfaces para capturar los puntos
+de la calibración en longitud de onda. Se precargan las posiciones de los
+picos detectados y el usuario escribe, junto a cada una, la longitud de onda
+conocida de esa línea (por ejemplo, a partir de `espectro_Difraccion.png`).
+
+Librerías:
+- Tkinter: Ventana de diálogo.
+===============================================================================
+"""
+
+from tkinter import Toplevel, Label, Text, Button, Frame, messagebox
+
+# =============================================================================
+# Diálogo de calibración
+# =============================================================================
+
+def _leer_puntos(texto):
+    puntos = []
+    for numero, linea in enumerate(texto.splitlines(), start=1):
+        campos = linea.replace(",", " ").split()
+        if not campos or campos[0].startswith("#"):
+            continue
+        if len(campos) < 2 or campos[1] == "?":
+            continue
+        try:
+            puntos.append((float(campos[0]), float(campos[1])))
+        except ValueError:
+            raise ValueError(f"Línea {numero} no válida: '{linea}'")
+    return puntos
+
+def abrir_dialogo_longitud_onda(padre, calibracion, picos_sugeridos=(), al_aplicar=None):
+    """
+    Abre el diálogo de calibración. `picos_sugeridos` son posiciones en
+    píxeles del frame completo; `al_aplicar` se llama sin argumentos después
+    de un ajuste exitoso o de borrar la calibración.
+    """
+    ventana = Toplevel(padre)
+    ventana.title("Calibración en Longitud de Onda")
+
+    Label(ventana, justify="left", text=(
+        "Escriba una línea por pico: posición en píxeles y longitud de onda en nm.\n"
+        "Los picos detectados aparecen con '?' en lugar de la longitud de onda;\n"
+        "reemplácelo en al menos dos picos conocidos.")).pack(padx=10, pady=5)
+
+    cuadro = Text(ventana, width=40, height=12)
+    cuadro.pack(padx=10, pady=5)
+    lineas = [f"{pixel:.2f} {nm:.2f}" for pixel, nm in calibracion.puntos]
+    lineas += [f"{pico:.2f} ?" for pico in picos_sugeridos]
+    cuadro.insert("1.0", "\n".join(lineas))
+
+    def aplicar():
+        try:
+            coeficientes = calibracion.ajustar(_leer_puntos(cuadro.get("1.0", "end")))
+        except ValueError as e:
+            messagebox.showerror("Calibración", str(e), parent=ventana)
+            return
+        print(f"Calibración en longitud de onda: coeficientes {coeficientes}")
+        if al_aplicar:
+            al_aplicar()
+        ventana.destroy()
+
+    def borrar():
+        calibracion.limpiar()
+        print("Calibración en longitud de onda eliminada.")
+        if al_aplicar:
+            al_aplicar()
+        ventana.destroy()
+
+    botones = Frame(ventana)
+    botones.pack(pady=5)
+    Button(botones, text="Aplicar", command=aplicar).pack(side="left", padx=5)
+    Button(botones, text="Borrar Calibración", command=borrar).pack(side="left", padx=5)
+    return ventana
@@ -0,0 +1,121 @@
+"""
+===============================================================================
+Proyecto: Espectrofotómetro Digital En Tiempo Real Para Uso Didáctico
+Descripción:
+Vista comparativa de varias cámaras. Los espectros de todas las cámaras del
+gestor multicámara se superponen en una sola gráfica, alineados sobre un eje
+común (nm si todas están calibradas en longitud de onda, posición relativa
+si no). Debajo se muestra el rendimiento de cada cámara: fps recibidos y
+analizados, frames descartados y latencias.
+
+Librerías:
+- Tkinter: Ventana y controles.
+- Matplotlib: Gráfica superpuesta con blitting.
+===============================================================================
+"""
+
+from tkinter import Toplevel, Label, Button, Frame, StringVar, ttk, messagebox
+
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+from graficas import GraficaEnVivo
+from multicamara import MAGNITUDES, AlineadorEspectros, GestorMulticamara
+
+PERIODO_GRAFICA_MS = 100
+PERIODO_ESTADO_MS = 500
+
+LIMITES_MAGNITUD = {
+    "Intensidad": (0, 255),
+    "Normalizada": (0, 1.05),
+    "Transmitancia": (0, 1.2),
+    "Absorbancia": (-0.2, 2.0),
+}
+
+# =============================================================================
+# Ventana comparativa
+# =============================================================================
+
+def abrir_ventana_multicamara(padre, camaras, **opciones):
+    """
+    Inicia un GestorMulticamara con `camaras` y abre la vista comparativa.
+    Al cerrar la ventana se detienen todas las cámaras. `opciones` se pasan
+    al gestor (timeout, espera_reconexion).
+    """
+    gestor = GestorMulticamara(camaras, **opciones)
+    gestor.iniciar()
+    alineador = AlineadorEspectros()
+    tareas = {}
+
+    ventana = Toplevel(padre)
+    ventana.title("Comparación Multicámara")
+    ventana.geometry("900x650")
+
+    controles = Frame(ventana)
+    controles.pack(fill="x", side="top")
+    Label(controles, text="Magnitud:").pack(side="left", padx=5)
+    magnitud = StringVar(value=MAGNITUDES[0])
+    combo_magnitud = ttk.Combobox(controles, textvariable=magnitud, values=MAGNITUDES, state="readonly", width=14)
+    combo_magnitud.pack(side="left", padx=5)
+
+    Label(controles, text="Cámara:").pack(side="left", padx=5)
+    nombres = [camara.nombre for camara in camaras]
+    seleccion = StringVar(value=nombres[0])
+    ttk.Combobox(controles, textvariable=seleccion, values=nombres, state="readonly", width=18).pack(side="left", padx=5)
+
+    def camara_seleccionada():
+        return camaras[nombres.index(seleccion.get())]
+
+    def capturar(tipo):
+        camara = camara_seleccionada()
+        fijar = camara.fijar_oscuro if tipo == "oscuro" else camara.fijar_referencia
+        if not fijar():
+            messagebox.showwarning("Multicámara", f"{camara.nombre} aún no tiene espectros.", parent=ventana)
+
+    Button(controles, text="Capturar Oscuro", command=lambda: capturar("oscuro")).pack(side="left", padx=5)
+    Button(controles, text="Capturar Referencia", command=lambda: capturar("referencia")).pack(side="left", padx=5)
+    Button(controles, text="Borrar Calibración",
+           command=lambda: camara_seleccionada().calibracion.limpiar()).pack(side="left", padx=5)
+
+    fig, ax = plt.subplots(figsize=(8, 5))
+    canvas = FigureCanvasTkAgg(fig, master=ventana)
+    canvas.get_tk_widget().pack(fill="both", expand=True)
+    colores = plt.rcParams["axes.prop_cycle"].by_key()["color"]
+    grafica = GraficaEnVivo(
+        fig, ax, canvas,
+        [(colores[i % len(colores)], camara.nombre) for i, camara in enumerate(camaras)],
+        "Comparación de Espectros", "Posición Relativa en el ROI", magnitud.get(),
+        limites_y=LIMITES_MAGNITUD[magnitud.get()])
+
+    label_estado = Label(ventana, text="", anchor="w", justify="left", font=("Courier", 9))
+    label_estado.pack(fill="x", side="bottom")
+
+    def cambiar_magnitud(event=None):
+        ax.set_ylabel(magnitud.get())
+        grafica.establecer_limites_y(LIMITES_MAGNITUD[magnitud.get()])
+        canvas.draw()
+
+    combo_magnitud.bind("<<ComboboxSelected>>", cambiar_magnitud)
+
+    def actualizar_grafica():
+        eje, etiqueta, valores = alineador.alinear([camara.espectro(magnitud.get()) for camara in camaras])
+        if eje is not None:
+            grafica.actualizar(valores, eje, etiqueta)
+        tareas["grafica"] = ventana.after(PERIODO_GRAFICA_MS, actualizar_grafica)
+
+    def actualizar_estado():
+        label_estado.config(text="\n".join(camara.texto_resumen() for camara in camaras))
+        tareas["estado"] = ventana.after(PERIODO_ESTADO_MS, actualizar_estado)
+
+    def on_close():
+        for tarea in tareas.values():
+            ventana.after_cancel(tarea)
+        gestor.detener()
+        grafica.desconectar()
+        plt.close(fig)
+        ventana.destroy()
+
+    ventana.protocol("WM_DELETE_WINDOW", on_close)
+    actualizar_grafica()
+    actualizar_estado()
+    return ventana